@@ -0,0 +1,148 @@
+"""Admission control for database-bound routes.
+
+Requests to the tasks and batch APIs are admitted against separate
+concurrency budgets for reads (GET/HEAD) and writes (everything else). When
+a budget is used up, requests wait in a bounded FIFO queue; if the queue is
+full, or a request has waited longer than its deadline, it is rejected at
+once with 503 and ``Retry-After`` instead of piling up in the threadpool
+behind a busy SQLite database. A slot is held until the response, including
+any streamed body, has been sent.
+
+Settings (environment variables):
+    ADMISSION_CONTROL           set to 0 to disable (default: enabled)
+    ADMISSION_READ_LIMIT        concurrent reads (default: 16)
+    ADMISSION_WRITE_LIMIT       concurrent writes (default: 4)
+    ADMISSION_QUEUE_SIZE        waiting requests per class (default: 64)
+    ADMISSION_QUEUE_TIMEOUT_MS  longest wait for a slot (default: 1000)
+    ADMISSION_RETRY_AFTER       Retry-After seconds on rejection (default: 1)
+"""
+
+import asyncio
+import json
+import os
+from collections import deque
+from time import perf_counter
+from typing import Deque, Optional, Sequence
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .metrics import ADMISSION_ACTIVE, ADMISSION_QUEUE_DEPTH, ADMISSION_SHED, ADMISSION_WAIT
+
+ADMISSION_CONTROL = os.getenv("ADMISSION_CONTROL", "1").lower() not in ("0", "false", "no")
+ADMISSION_READ_LIMIT = int(os.getenv("ADMISSION_READ_LIMIT", "16"))
+ADMISSION_WRITE_LIMIT = int(os.getenv("ADMISSION_WRITE_LIMIT", "4"))
+ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", "64"))
+ADMISSION_QUEUE_TIMEOUT_MS = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_MS", "1000"))
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", "1"))
+
+# Path prefixes whose requests go through admission control
+ADMITTED_PREFIXES = ("/api/v1/tasks", "/api/v1/lists", "/api/v1/batch")
+
+READ_METHODS = frozenset({"GET", "HEAD"})
+
+
+class Limiter:
+    """A concurrency budget with a bounded FIFO queue of waiters."""
+
+    def __init__(self, name: str, limit: int, queue_size: int, timeout: float) -> None:
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.active = 0
+        self.waiters: Deque["asyncio.Future[None]"] = deque()
+        ADMISSION_ACTIVE.labels(name).set_function(lambda: self.active)
+        ADMISSION_QUEUE_DEPTH.labels(name).set_function(lambda: len(self.waiters))
+
+    async def acquire(self) -> Optional[str]:
+        """Take a slot, waiting if needed. Returns the reason if shed."""
+        if self.active < self.limit and not self.waiters:
+            self.active += 1
+            return None
+        if len(self.waiters) >= self.queue_size:
+            return "queue_full"
+
+        waiter: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        start = perf_counter()
+        try:
+            await asyncio.wait_for(waiter, self.timeout)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot arrived as the deadline passed; hand it on
+                self.release()
+            return "deadline"
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            if waiter in self.waiters:
+                self.waiters.remove(waiter)
+        ADMISSION_WAIT.labels(self.name).observe(perf_counter() - start)
+        return None
+
+    def release(self) -> None:
+        """Free a slot, handing it straight to the next live waiter if any."""
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying read and write budgets to database-bound routes."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        read_limit: int = ADMISSION_READ_LIMIT,
+        write_limit: int = ADMISSION_WRITE_LIMIT,
+        queue_size: int = ADMISSION_QUEUE_SIZE,
+        queue_timeout_ms: float = ADMISSION_QUEUE_TIMEOUT_MS,
+        retry_after: int = ADMISSION_RETRY_AFTER,
+        prefixes: Sequence[str] = ADMITTED_PREFIXES,
+    ) -> None:
+        self.app = app
+        timeout = queue_timeout_ms / 1000
+        self.read = Limiter("read", read_limit, queue_size, timeout)
+        self.write = Limiter("write", write_limit, queue_size, timeout)
+        self.retry_after = retry_after
+        self.prefixes = tuple(prefixes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] == "OPTIONS"
+            or not scope["path"].startswith(self.prefixes)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.read if scope["method"] in READ_METHODS else self.write
+        reason = await limiter.acquire()
+        if reason is not None:
+            ADMISSION_SHED.labels(limiter.name, reason).inc()
+            await self._reject(send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
+
+    async def _reject(self, send: Send) -> None:
+        body = json.dumps({"detail": "Server busy, retry later"}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(self.retry_after).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,157 @@
+"""Archive tier for completed tasks.
+
+Completed tasks are moved from ``tasks`` into ``archived_tasks`` so that the
+hot table, and every list, position and reorder query against it, only holds
+active work. Tasks are archived on demand through the API or, when
+``ARCHIVE_AFTER_DAYS`` is set, by a background sweeper that runs every
+``ARCHIVE_SWEEP_INTERVAL`` seconds. A task's age is measured from its last
+update, which for a completed task is normally when it was completed.
+"""
+
+import asyncio
+import base64
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import DateTime, and_, delete, insert, literal, or_, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from .models import ArchivedTask, Task, utcnow
+
+logger = logging.getLogger(__name__)
+
+# Unset or empty disables the background sweeper
+ARCHIVE_AFTER_DAYS = os.getenv("ARCHIVE_AFTER_DAYS", "")
+ARCHIVE_SWEEP_INTERVAL = float(os.getenv("ARCHIVE_SWEEP_INTERVAL", "3600"))
+
+# Tasks moved per transaction, so the write lock is held only briefly
+ARCHIVE_BATCH_SIZE = 1000
+
+ARCHIVED_COLUMNS = (
+    "id",
+    "owner_id",
+    "title",
+    "description",
+    "is_complete",
+    "deadline",
+    "created_at",
+    "updated_at",
+)
+
+
+def _naive_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=None)
+
+
+def archive_completed(
+    db: Session,
+    older_than_days: float = 0,
+    task_ids: Optional[Sequence[str]] = None,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+    owner_id: Optional[str] = None,
+) -> int:
+    """Move completed tasks last updated before the cutoff to the archive.
+
+    When task_ids is given only those tasks are considered; any that are not
+    complete are left alone. When owner_id is given only that owner's tasks
+    are considered. Returns the number of tasks archived.
+
+    Each batch's IDs are chosen before its transaction starts, so the move
+    checks the conditions again: a task un-completed or edited in between
+    stays where it is.
+    """
+    cutoff = _naive_utc(utcnow()) - timedelta(days=older_than_days)
+    conditions = [Task.is_complete.is_(True), Task.updated_at <= cutoff]
+    if owner_id is not None:
+        conditions.append(Task.owner_id == owner_id)
+    if task_ids is not None:
+        conditions.append(Task.id.in_(task_ids))
+
+    archived = 0
+    while True:
+        ids = db.scalars(select(Task.id).where(*conditions).limit(batch_size)).all()
+        if not ids:
+            return archived
+        archived_at = literal(_naive_utc(utcnow()), DateTime)
+        columns = [getattr(Task, name) for name in ARCHIVED_COLUMNS]
+        batch = [Task.id.in_(ids), *conditions]
+        db.execute(
+            insert(ArchivedTask).from_select(
+                [*ARCHIVED_COLUMNS, "archived_at"],
+                select(*columns, archived_at).where(*batch),
+            )
+        )
+        # The insert took the write lock, so this deletes the rows it copied
+        deleted = db.execute(delete(Task).where(*batch))
+        db.commit()
+        archived += deleted.rowcount
+
+
+def encode_cursor(task: ArchivedTask) -> str:
+    """Encode the position after task in archive order as an opaque cursor."""
+    raw = json.dumps([task.archived_at.isoformat(), task.id]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode a cursor into (archived_at, id); raises ValueError if malformed."""
+    try:
+        archived_at, task_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(archived_at), str(task_id)
+    except (TypeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def archive_page(
+    db: Session, owner_id: str, limit: int, cursor: Optional[str] = None
+) -> Tuple[List[ArchivedTask], Optional[str]]:
+    """Return up to limit of an owner's archived tasks after cursor and the next cursor.
+
+    Pages are keyed on (owner_id, archived_at, id), newest first, so each page
+    is one index range scan however deep into the archive it is.
+    """
+    query = (
+        select(ArchivedTask)
+        .where(ArchivedTask.owner_id == owner_id)
+        .order_by(ArchivedTask.archived_at.desc(), ArchivedTask.id.desc())
+    )
+    if cursor is not None:
+        archived_at, task_id = decode_cursor(cursor)
+        query = query.where(
+            or_(
+                ArchivedTask.archived_at < archived_at,
+                and_(ArchivedTask.archived_at == archived_at, ArchivedTask.id < task_id),
+            )
+        )
+    rows = list(db.scalars(query.limit(limit + 1)))
+    if len(rows) > limit:
+        return rows[:limit], encode_cursor(rows[limit - 1])
+    return rows, None
+
+
+def sweep(sessions: Callable[[], Session], older_than_days: float) -> int:
+    """Archive every completed task older than older_than_days."""
+    with sessions() as db:
+        return archive_completed(db, older_than_days)
+
+
+async def run_sweeper(
+    sessions: Callable[[], Session],
+    older_than_days: float,
+    interval: float = ARCHIVE_SWEEP_INTERVAL,
+) -> None:
+    """Sweep periodically until cancelled."""
+    while True:
+        try:
+            archived = await run_in_threadpool(sweep, sessions, older_than_days)
+            if archived:
+                logger.info("Archived %d completed tasks", archived)
+        except SQLAlchemyError:
+            # Usually another worker sweeping at the same time; retry next round
+            logger.exception("Archive sweep failed")
+        await asyncio.sleep(interval)
@@ -0,0 +1,194 @@
+"""Online snapshots of the SQLite database.
+
+Uses the SQLite online backup API, which copies the database a few pages at
+a time. Each step only holds a read lock briefly, and the copy pauses between
+steps, so the application keeps serving writes while a snapshot is taken.
+A write from another connection makes the backup start over; after
+``BACKUP_MAX_RESTARTS`` restarts it gives up with ``BackupRestartsExceeded``
+rather than chasing a busy database forever. Restores go through the same
+API in the other direction, so running workers never see a half-written file.
+
+Usage:
+    python -m app.backup snapshot [DEST] [--compress]
+    python -m app.backup restore SRC
+"""
+
+import argparse
+import gzip
+import os
+import shutil
+import sqlite3
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy.engine import make_url
+
+from .database import DATABASE_URL
+
+# Pages copied per backup step (4 MiB at the default 4 KiB page size) and the
+# pause between steps that lets writers in
+BACKUP_PAGES_PER_STEP = int(os.getenv("BACKUP_PAGES_PER_STEP", "1024"))
+BACKUP_STEP_SLEEP = float(os.getenv("BACKUP_STEP_SLEEP", "0.005"))
+
+# Times a backup may start over because the source was written to
+BACKUP_MAX_RESTARTS = int(os.getenv("BACKUP_MAX_RESTARTS", "10"))
+
+COPY_BUFFER_BYTES = 1024 * 1024
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+def database_path(url: str = DATABASE_URL) -> Path:
+    """Return the file path of a SQLite database URL."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "sqlite" or parsed.database in (None, "", ":memory:"):
+        raise ValueError(f"Snapshots require a file-backed SQLite database, got {url!r}")
+    return Path(parsed.database)
+
+
+def default_snapshot_path(source: Path, compress: bool) -> Path:
+    """Return a timestamped snapshot path in a backups directory next to source."""
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    suffix = ".db.gz" if compress else ".db"
+    return source.parent / "backups" / f"{source.stem}-{stamp}{suffix}"
+
+
+class BackupRestartsExceeded(sqlite3.OperationalError):
+    """The source was written to so often that the backup kept starting over."""
+
+
+def _copy(source: Path, dest: Path, pages: int, sleep: float, max_restarts: int) -> None:
+    """Copy one SQLite database into another with the online backup API.
+
+    sqlite3 only sleeps when a step finds the database busy, so the pause
+    between steps is taken in the progress callback. A step that leaves as
+    many pages to copy as the one before means the backup started over.
+    """
+    restarts = 0
+    last_remaining: Optional[int] = None
+
+    def progress(status: int, remaining: int, total: int) -> None:
+        nonlocal restarts, last_remaining
+        if last_remaining is not None and remaining >= last_remaining:
+            restarts += 1
+            if restarts > max_restarts:
+                raise BackupRestartsExceeded(
+                    f"Backup of {source} restarted {restarts} times because the database "
+                    "kept changing; retry when it is less busy or copy more pages per step"
+                )
+        last_remaining = remaining
+        if remaining and sleep > 0:
+            time.sleep(sleep)
+
+    src = sqlite3.connect(source)
+    dst = sqlite3.connect(dest)
+    try:
+        src.backup(dst, pages=pages, progress=progress, sleep=sleep)
+    finally:
+        dst.close()
+        src.close()
+
+
+def create_snapshot(
+    source: Path,
+    dest: Path,
+    compress: bool = False,
+    pages: int = BACKUP_PAGES_PER_STEP,
+    sleep: float = BACKUP_STEP_SLEEP,
+    max_restarts: int = BACKUP_MAX_RESTARTS,
+) -> Path:
+    """Write a consistent snapshot of source to dest, optionally gzip-compressed.
+
+    The snapshot is built in a temporary file and renamed into place, so dest
+    only ever holds a complete snapshot.
+    """
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    staging = dest.with_name(f".{dest.name}.tmp")
+    try:
+        if compress:
+            raw = dest.with_name(f".{dest.name}.raw")
+            try:
+                _copy(source, raw, pages, sleep, max_restarts)
+                with open(raw, "rb") as src, gzip.open(staging, "wb", compresslevel=6) as dst:
+                    shutil.copyfileobj(src, dst, COPY_BUFFER_BYTES)
+            finally:
+                raw.unlink(missing_ok=True)
+        else:
+            _copy(source, staging, pages, sleep, max_restarts)
+        os.replace(staging, dest)
+    finally:
+        staging.unlink(missing_ok=True)
+    return dest
+
+
+def restore_snapshot(
+    snapshot: Path,
+    dest: Path,
+    pages: int = BACKUP_PAGES_PER_STEP,
+    sleep: float = BACKUP_STEP_SLEEP,
+    max_restarts: int = BACKUP_MAX_RESTARTS,
+) -> None:
+    """Replace the contents of dest with a snapshot taken by create_snapshot.
+
+    Compressed snapshots are detected by their gzip header and unpacked first.
+    The snapshot is checked with ``PRAGMA integrity_check`` before anything in
+    dest is touched.
+    """
+    unpacked: Optional[Path] = None
+    source = snapshot
+    try:
+        with open(snapshot, "rb") as header:
+            compressed = header.read(len(GZIP_MAGIC)) == GZIP_MAGIC
+        if compressed:
+            unpacked = dest.with_name(f".{dest.name}.restore")
+            with gzip.open(snapshot, "rb") as src, open(unpacked, "wb") as dst:
+                shutil.copyfileobj(src, dst, COPY_BUFFER_BYTES)
+            source = unpacked
+
+        check = sqlite3.connect(source)
+        try:
+            result = check.execute("PRAGMA integrity_check").fetchone()[0]
+        finally:
+            check.close()
+        if result != "ok":
+            raise ValueError(f"Snapshot {snapshot} failed integrity check: {result}")
+
+        _copy(source, dest, pages, sleep, max_restarts)
+    finally:
+        if unpacked is not None:
+            unpacked.unlink(missing_ok=True)
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(
+        prog="python -m app.backup", description="Snapshot or restore the database."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    snapshot = commands.add_parser("snapshot", help="take a snapshot of the live database")
+    snapshot.add_argument("dest", nargs="?", type=Path, help="snapshot file (default: timestamped)")
+    snapshot.add_argument("--compress", action="store_true", help="gzip the snapshot")
+
+    restore = commands.add_parser("restore", help="restore the live database from a snapshot")
+    restore.add_argument("snapshot", type=Path, help="snapshot file (.db or .db.gz)")
+
+    args = parser.parse_args(argv)
+    try:
+        database = database_path()
+        if args.command == "snapshot":
+            dest = args.dest or default_snapshot_path(database, args.compress)
+            print(create_snapshot(database, dest, compress=args.compress))
+        else:
+            restore_snapshot(args.snapshot, database)
+            print(f"Restored {database} from {args.snapshot}")
+    except (ValueError, OSError, sqlite3.Error) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""Single-flight coalescing of concurrent identical reads.
+
+When many clients ask for the same list at the same moment, after a deploy
+or a wave of reconnects, each request would otherwise run the same query
+and encode the same JSON. Instead, the first request for a key runs the
+read and the requests that arrive while it is in flight wait for it and
+share its encoded response body.
+
+The key is the route, its parameters, the owner and the owner's current
+revision (see ``app.models.OwnerRevision``). Each request reads the
+revision first, a single primary key lookup, so a request arriving after a
+write has committed never joins a read that started before it. Nothing is
+kept once the read completes: this only merges reads that overlap in time,
+within one worker process.
+
+Reads in a session that may hold its own uncommitted writes, like a batch,
+see data no other request can, so such sessions opt out with
+``exclude_session``.
+
+Settings (environment variables):
+    COALESCE_READS    share concurrent identical reads (default: on)
+"""
+
+import os
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+from sqlalchemy import bindparam, select
+from sqlalchemy.orm import Session
+
+from .compression import mark_cacheable
+from .metrics import COALESCED_READS
+from .models import OwnerRevision
+from .responses import JSON, Encoding, encoded_response
+
+COALESCE_READS = os.getenv("COALESCE_READS", "1").lower() not in ("0", "false", "no")
+
+OWNER_REVISION = select(OwnerRevision.revision).where(
+    OwnerRevision.owner_id == bindparam("owner_id")
+)
+
+
+def current_revision(db: Session, owner_id: str) -> Optional[int]:
+    """Return the owner's data revision; 0 until their first write.
+
+    Returns None where the database does not maintain revisions (only
+    SQLite has the triggers), so nothing can be cached against them.
+    """
+    if db.get_bind().dialect.name != "sqlite":
+        return None
+    return db.scalar(OWNER_REVISION, {"owner_id": owner_id}) or 0
+
+
+class _Call:
+    """A read in flight and, once done, its outcome."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; concurrent callers share it.
+
+    Sync route handlers run in the threadpool, so callers are threads and
+    followers block on an event until the leader finishes.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Return fn(), or the result of the in-flight call with the same key."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            COALESCED_READS.labels("follower").inc()
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        COALESCED_READS.labels("leader").inc()
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+reads = SingleFlight()
+
+
+def exclude_session(db: Session) -> None:
+    """Never share reads made through this session with other requests."""
+    db.info["private_reads"] = True
+
+
+def reads_are_private(db: Session) -> bool:
+    """Whether reads through this session may see its own uncommitted writes."""
+    return db.info.get("private_reads", False)
+
+
+def coalesced(
+    db: Session,
+    owner_id: str,
+    key: Hashable,
+    encode: Callable[[Optional[int]], bytes],
+    enabled: Optional[bool] = None,
+    encoding: Encoding = JSON,
+) -> Response:
+    """Run encode and return its body, sharing it with concurrent equal reads.
+
+    key identifies the route and its parameters; the owner, their current
+    revision and the response encoding are added to it, and encode is
+    passed the revision.
+    Errors raised by encode, such as 404s, are raised in every request that
+    shared the call. Without revisions (on databases other than SQLite) a
+    request could join a read that started before its own write committed,
+    so reads are never shared there.
+    """
+    if enabled is None:
+        enabled = COALESCE_READS and not reads_are_private(db)
+    revision = current_revision(db, owner_id)
+    if revision is None:
+        enabled = False
+    if enabled:
+        body = reads.do((key, owner_id, revision, encoding.name), lambda: encode(revision))
+    else:
+        body = encode(revision)
+    if revision is not None and not reads_are_private(db):
+        # The same key and revision always produce this body, so it is
+        # only compressed once (see app.compression)
+        mark_cacheable((key, owner_id, revision, encoding.name))
+    return encoded_response(body, encoding=encoding)
+
+
+def coalesced_json(
+    db: Session,
+    owner_id: str,
+    key: Hashable,
+    adapter: TypeAdapter,
+    load: Callable[[], Any],
+    enabled: Optional[bool] = None,
+) -> Response:
+    """Like ``coalesced``, encoding the result of load for a response model."""
+    return coalesced(db, owner_id, key, lambda revision: JSON.encode(adapter, load()), enabled)
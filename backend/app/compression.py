@@ -0,0 +1,274 @@
+"""Response compression, with compressed list bodies cached by revision.
+
+Without it only clients behind the nginx proxy get compressed responses;
+API clients talking to the backend directly, and the hop from nginx to the
+backend, carry plain JSON. The middleware compresses responses with the
+best coding the client accepts: zstd or brotli when their optional packages
+are installed, gzip otherwise.
+
+- Bodies smaller than ``COMPRESSION_MIN_SIZE`` are sent as they are; the
+  framing would cost more than it saves.
+- Only text, JSON, NDJSON and MessagePack responses are compressed, and
+  never one that already has a ``Content-Encoding``, like a gzipped export.
+- Streaming responses are compressed chunk by chunk, flushing each chunk so
+  clients see rows as soon as they are sent.
+- List responses are the same bytes for every request until the owner's
+  data changes. ``app.coalescing`` tags them with their read key, which
+  includes the owner's revision, and their compressed bodies are kept in
+  an LRU of ``COMPRESSED_CACHE_SIZE`` entries, so an unchanged list is
+  compressed once rather than on every request.
+
+Settings (environment variables):
+    COMPRESSION             compress responses (default: on)
+    COMPRESSION_MIN_SIZE    smallest body compressed, in bytes (default: 1024)
+    COMPRESSED_CACHE_SIZE   compressed list bodies kept per process (default: 1000)
+"""
+
+import gzip
+import os
+import zlib
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .metrics import COMPRESSED_RESPONSES, COMPRESSION_CACHE
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstd is optional
+    zstandard = None
+
+COMPRESSION = os.getenv("COMPRESSION", "1").lower() not in ("0", "false", "no")
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSED_CACHE_SIZE = int(os.getenv("COMPRESSED_CACHE_SIZE", "1000"))
+
+# Levels that favour speed, since every response is compressed on the fly
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+ZSTD_LEVEL = 3
+
+COMPRESSIBLE_TYPES = frozenset(
+    {"application/json", "application/x-ndjson", "application/msgpack"}
+)
+
+# Compresses the next chunk of a stream; the flag marks the last chunk
+StreamCompressor = Callable[[bytes, bool], bytes]
+
+
+@dataclass(frozen=True)
+class Codec:
+    """A content coding: one-shot compression and a streaming compressor factory."""
+
+    name: str
+    compress: Callable[[bytes], bytes]
+    stream: Callable[[], StreamCompressor]
+
+
+def _gzip_stream() -> StreamCompressor:
+    compressor = zlib.compressobj(GZIP_LEVEL, wbits=31)
+
+    def compress(data: bytes, final: bool) -> bytes:
+        flush = zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH
+        return compressor.compress(data) + compressor.flush(flush)
+
+    return compress
+
+
+def _brotli_stream() -> StreamCompressor:
+    compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(data: bytes, final: bool) -> bytes:
+        return compressor.process(data) + (compressor.finish() if final else compressor.flush())
+
+    return compress
+
+
+def _zstd_stream() -> StreamCompressor:
+    compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+
+    def compress(data: bytes, final: bool) -> bytes:
+        flush = (
+            zstandard.COMPRESSOBJ_FLUSH_FINISH if final else zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        )
+        return compressor.compress(data) + compressor.flush(flush)
+
+    return compress
+
+
+def _codecs() -> Dict[str, Codec]:
+    """Available codings, in order of preference when the client accepts several."""
+    codecs: Dict[str, Codec] = {}
+    if zstandard is not None:
+        zstd = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+        codecs["zstd"] = Codec("zstd", zstd.compress, _zstd_stream)
+    if brotli is not None:
+        codecs["br"] = Codec(
+            "br", lambda body: brotli.compress(body, quality=BROTLI_QUALITY), _brotli_stream
+        )
+    codecs["gzip"] = Codec(
+        "gzip", lambda body: gzip.compress(body, GZIP_LEVEL, mtime=0), _gzip_stream
+    )
+    return codecs
+
+
+CODECS = _codecs()
+
+
+def accepted_codec(accept_encoding: Optional[str]) -> Optional[Codec]:
+    """Pick the client's most preferred available coding, or None for identity."""
+    if not accept_encoding:
+        return None
+    qualities: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, *params = (part.strip() for part in item.split(";"))
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding:
+            qualities[coding.lower()] = quality
+    wildcard = qualities.get("*", 0.0)
+    best: Optional[Codec] = None
+    best_quality = 0.0
+    for name, codec in CODECS.items():
+        quality = qualities.get(name, wildcard)
+        if quality > best_quality:
+            best, best_quality = codec, quality
+    return best
+
+
+@dataclass
+class ResponseTag:
+    """What the handler knows about its response body, filled in while it runs."""
+
+    key: Optional[Hashable] = None
+
+
+current_tag: ContextVar[Optional[ResponseTag]] = ContextVar("response_tag", default=None)
+
+
+def mark_cacheable(key: Hashable) -> None:
+    """Record that the current response body is the same for every request with this key."""
+    tag = current_tag.get()
+    if tag is not None:
+        tag.key = key
+
+
+class CompressedCache:
+    """An LRU of compressed bodies by response key and coding.
+
+    Only used from the event loop, so it needs no locking.
+    """
+
+    def __init__(self, max_entries: int = COMPRESSED_CACHE_SIZE) -> None:
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[Tuple[Hashable, str], bytes]" = OrderedDict()
+
+    def compress(self, key: Hashable, codec: Codec, body: bytes) -> bytes:
+        """Return the compressed body, compressing it only the first time."""
+        entry = (key, codec.name)
+        compressed = self.entries.get(entry)
+        if compressed is not None:
+            self.entries.move_to_end(entry)
+            COMPRESSION_CACHE.labels("hit").inc()
+            return compressed
+        COMPRESSION_CACHE.labels("miss").inc()
+        compressed = codec.compress(body)
+        self.entries[entry] = compressed
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return compressed
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+
+def _is_compressible(headers: MutableHeaders) -> bool:
+    if "content-encoding" in headers:
+        return False
+    media_type = headers.get("content-type", "").split(";")[0].strip().lower()
+    return media_type.startswith("text/") or media_type in COMPRESSIBLE_TYPES
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing responses for clients that accept it."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = COMPRESSION_MIN_SIZE,
+        cache: Optional[CompressedCache] = None,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.cache = cache if cache is not None else CompressedCache()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        codec = None
+        if scope["type"] == "http" and scope["method"] != "HEAD":
+            codec = accepted_codec(Headers(scope=scope).get("accept-encoding"))
+        if codec is None:
+            await self.app(scope, receive, send)
+            return
+
+        tag = ResponseTag()
+        start: Optional[Message] = None
+        stream: Optional[StreamCompressor] = None
+        passthrough = False
+
+        async def compressing_send(message: Message) -> None:
+            nonlocal start, stream, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+            if stream is not None:
+                final = not message.get("more_body", False)
+                await send({**message, "body": stream(message.get("body", b""), final)})
+                return
+
+            headers = MutableHeaders(raw=list(start["headers"]))
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if not _is_compressible(headers) or (not more_body and len(body) < self.minimum_size):
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            headers["content-encoding"] = codec.name
+            headers.add_vary_header("Accept-Encoding")
+            COMPRESSED_RESPONSES.labels(codec.name).inc()
+            if more_body:
+                del headers["content-length"]
+                stream = codec.stream()
+                body = stream(body, False)
+            elif tag.key is not None and start["status"] == 200:
+                body = self.cache.compress(tag.key, codec, body)
+            else:
+                body = codec.compress(body)
+            if not more_body:
+                headers["content-length"] = str(len(body))
+            await send({**start, "headers": headers.raw})
+            await send({**message, "body": body})
+
+        token = current_tag.set(tag)
+        try:
+            await self.app(scope, receive, compressing_send)
+        finally:
+            current_tag.reset(token)
@@ -3,15 +3,20 @@
 import os
 from typing import Generator
 
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, create_engine, event
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 
 # Database URL from environment or default to SQLite
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./tasks.db")
 
+# Compiled SQL statements kept per engine; every distinct statement shape
+# (including each IN-list length bucket) takes one entry
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "500"))
+
 # Create engine with connection pool settings
 engine_args = {
     "pool_pre_ping": True,  # Verify connection before use
+    "query_cache_size": QUERY_CACHE_SIZE,
 }
 
 # SQLite-specific settings
@@ -24,6 +29,38 @@ else:
 
 engine = create_engine(DATABASE_URL, **engine_args)
 
+
+def enable_sqlite_transactions(target: Engine) -> None:
+    """Let a connection opt in to SQLAlchemy, not pysqlite, starting its transactions.
+
+    pysqlite only emits BEGIN before DML, so a SAVEPOINT issued first starts
+    (and its RELEASE commits) a transaction of its own. A connection with
+    the ``sqlite_begin`` execution option, such as ``BEGIN IMMEDIATE``,
+    turns that off and emits its own BEGIN, so savepoints nest inside it.
+
+    Other connections keep pysqlite's behaviour. Their reads run outside a
+    transaction and the write lock is taken by the first write. An explicit
+    deferred BEGIN there would hold a read lock from the first SELECT, and
+    two requests that read before writing would then deadlock on the lock
+    upgrade, one failing at once with "database is locked".
+    """
+
+    @event.listens_for(target, "begin")
+    def _emit_begin(connection) -> None:
+        dbapi_connection = connection.connection.dbapi_connection
+        begin = connection.get_execution_options().get("sqlite_begin")
+        if begin is None:
+            # Restore pysqlite's implicit BEGIN for a pooled connection
+            # that last ran an explicit transaction
+            dbapi_connection.isolation_level = ""
+            return
+        dbapi_connection.isolation_level = None
+        connection.exec_driver_sql(begin)
+
+
+if engine.dialect.name == "sqlite":
+    enable_sqlite_transactions(engine)
+
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
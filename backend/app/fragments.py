@@ -0,0 +1,154 @@
+"""Pre-encoded JSON fragments for assembling task lists.
+
+Listing a list's tasks would otherwise validate and encode every task on
+every request, even when one task changed since the last time. Instead,
+each task's encoded ``TaskResponse`` is kept as a fragment, and a list
+response is the fragments of its tasks joined in position order.
+
+- A fragment is tagged with a stamp of its row, ``(updated_at, position)``,
+  and is only used while the row still has that stamp. Every write changes
+  ``updated_at``, so fragments never outlive the data they encode, even when
+  another worker made the change.
+- Writes in the tasks router store the fragments of the tasks they changed,
+  so the next list read encodes nothing.
+- Each list also keeps a snapshot of its ordered ``(id, stamp)`` pairs,
+  tagged with the owner's revision (see ``app.models.OwnerRevision``). While
+  the revision is unchanged, a list read needs no query beyond the revision
+  lookup; after a change, one query for the stamps finds the tasks to
+  re-encode.
+
+Fragments are kept per response encoding (see ``app.responses``); JSON
+and MessagePack arrays can both be assembled by joining their items.
+
+Both maps are LRUs held per process.
+
+Settings (environment variables):
+    TASK_FRAGMENT_CACHE_SIZE    fragments kept per process (default: 100000)
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+from pydantic import TypeAdapter
+
+from .metrics import TASK_FRAGMENTS
+from .models import Task
+from .responses import ENCODINGS, JSON, Encoding
+from .schemas import TaskResponse
+
+TASK_FRAGMENT_CACHE_SIZE = int(os.getenv("TASK_FRAGMENT_CACHE_SIZE", "100000"))
+
+# Lists whose ordering snapshot is kept
+LIST_SNAPSHOT_CACHE_SIZE = 10_000
+
+TASK_ADAPTER = TypeAdapter(TaskResponse)
+
+Stamp = Tuple[datetime, int]
+
+
+def stamp_of(task: Task) -> Stamp:
+    """The values that change whenever a task's encoded form may change."""
+    return (task.updated_at, task.position)
+
+
+def encode_task(task: Task, encoding: Encoding = JSON) -> bytes:
+    """Encode one task as its ``TaskResponse``."""
+    return encoding.encode(TASK_ADAPTER, task)
+
+
+@dataclass(frozen=True)
+class ListSnapshot:
+    """A list's tasks, in order, as of an owner revision."""
+
+    revision: int
+    stamps: Tuple[Tuple[str, Stamp], ...]
+
+
+class FragmentCache:
+    """Encoded tasks by ID, each valid only for the stamp it was stored with."""
+
+    def __init__(
+        self,
+        max_fragments: int = TASK_FRAGMENT_CACHE_SIZE,
+        max_snapshots: int = LIST_SNAPSHOT_CACHE_SIZE,
+    ) -> None:
+        self.max_fragments = max_fragments
+        self.max_snapshots = max_snapshots
+        self._lock = threading.Lock()
+        self._fragments: "OrderedDict[Tuple[str, str], Tuple[Stamp, bytes]]" = OrderedDict()
+        self._snapshots: "OrderedDict[Hashable, ListSnapshot]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._fragments)
+
+    def store(self, tasks: Iterable[Task], encoding: Encoding = JSON) -> Dict[str, bytes]:
+        """Encode tasks, keep their fragments and return them by ID."""
+        encoded = {task.id: (stamp_of(task), encode_task(task, encoding)) for task in tasks}
+        with self._lock:
+            for task_id, entry in encoded.items():
+                key = (encoding.name, task_id)
+                self._fragments[key] = entry
+                self._fragments.move_to_end(key)
+            while len(self._fragments) > self.max_fragments:
+                self._fragments.popitem(last=False)
+        return {task_id: fragment for task_id, (_, fragment) in encoded.items()}
+
+    def fragment(self, task: Task, encoding: Encoding = JSON) -> bytes:
+        """Return a task's fragment, encoding and storing it unless it is current."""
+        (found,) = self.lookup([(task.id, stamp_of(task))], encoding)
+        return found if found is not None else self.store([task], encoding)[task.id]
+
+    def discard(self, task_id: str) -> None:
+        """Forget a deleted task's fragments."""
+        with self._lock:
+            for encoding in ENCODINGS:
+                self._fragments.pop((encoding.name, task_id), None)
+
+    def lookup(
+        self, stamps: Sequence[Tuple[str, Stamp]], encoding: Encoding = JSON
+    ) -> List[Optional[bytes]]:
+        """Return the fragment for each (id, stamp), or None where it is stale or missing."""
+        found: List[Optional[bytes]] = []
+        with self._lock:
+            for task_id, stamp in stamps:
+                key = (encoding.name, task_id)
+                entry = self._fragments.get(key)
+                if entry is not None and entry[0] == stamp:
+                    self._fragments.move_to_end(key)
+                    found.append(entry[1])
+                else:
+                    found.append(None)
+        misses = found.count(None)
+        TASK_FRAGMENTS.labels("hit").inc(len(found) - misses)
+        TASK_FRAGMENTS.labels("miss").inc(misses)
+        return found
+
+    def snapshot(self, key: Hashable, revision: int) -> Optional[ListSnapshot]:
+        """Return the list's ordering if it was taken at this revision."""
+        with self._lock:
+            snapshot = self._snapshots.get(key)
+            if snapshot is None or snapshot.revision != revision:
+                return None
+            self._snapshots.move_to_end(key)
+            return snapshot
+
+    def save_snapshot(self, key: Hashable, snapshot: ListSnapshot) -> None:
+        """Remember a list's ordering as of a revision."""
+        with self._lock:
+            self._snapshots[key] = snapshot
+            self._snapshots.move_to_end(key)
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+
+    def clear(self) -> None:
+        """Forget every fragment and snapshot."""
+        with self._lock:
+            self._fragments.clear()
+            self._snapshots.clear()
+
+
+fragments = FragmentCache()
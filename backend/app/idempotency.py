@@ -0,0 +1,239 @@
+"""Idempotency keys for task creation, reorder and batch requests.
+
+A client that times out and retries cannot tell whether its first attempt
+was applied. Sending the same ``Idempotency-Key`` header on every attempt
+makes the retry safe: the first completed response is stored and replayed
+for later requests with that key, marked with ``Idempotent-Replayed: true``,
+without running the handler or touching the database again.
+
+- Keys are scoped to the request owner, method and path, so two owners can
+  use the same key independently.
+- The stored response is tied to a hash of the request body and to the
+  response encoding negotiated from ``Accept`` (see ``app.negotiation``).
+  Reusing a key with a different body, or asking for a different encoding,
+  is rejected with 422 rather than replaying a body in the wrong format or
+  running the request a second time.
+- While the first request is still running, a duplicate gets 409 with
+  ``Retry-After`` rather than running concurrently.
+- Only final outcomes are stored. 409 position conflicts and 5xx errors
+  are retryable, so they release the key and the next attempt runs again.
+
+Responses are kept in memory per process, in an LRU bounded by
+``IDEMPOTENCY_MAX_KEYS`` and expiring after ``IDEMPOTENCY_TTL`` seconds.
+
+Settings (environment variables):
+    IDEMPOTENCY_TTL         seconds a stored response is replayed (default: 86400)
+    IDEMPOTENCY_MAX_KEYS    responses kept per process (default: 10000)
+"""
+
+import hashlib
+import json
+import os
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from time import monotonic
+from typing import List, Optional, Pattern, Sequence, Tuple
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .negotiation import negotiated_encoding
+from .owners import owner_id_for
+from .responses import ENCODINGS
+
+IDEMPOTENCY_TTL = float(os.getenv("IDEMPOTENCY_TTL", "86400"))
+IDEMPOTENCY_MAX_KEYS = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "10000"))
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+REPLAYED_HEADER = b"idempotent-replayed"
+MAX_KEY_LENGTH = 255
+
+# (method, path) pairs that honour Idempotency-Key
+IDEMPOTENT_ROUTES: Sequence[Tuple[str, Pattern[str]]] = (
+    ("POST", re.compile(r"^/api/v1/tasks/?$")),
+    ("PUT", re.compile(r"^/api/v1/tasks/reorder$")),
+    ("POST", re.compile(r"^/api/v1/lists/?$")),
+    ("POST", re.compile(r"^/api/v1/lists/[^/]+/tasks$")),
+    ("PUT", re.compile(r"^/api/v1/lists/[^/]+/tasks/reorder$")),
+    ("POST", re.compile(r"^/api/v1/batch/?$")),
+)
+
+# Statuses that a retry might change, so they are not replayed
+RETRYABLE_STATUSES = frozenset({409, 429})
+
+# Owner, method, path, Idempotency-Key and response encoding
+Key = Tuple[str, str, str, str, str]
+
+
+@dataclass
+class StoredResponse:
+    """A request in progress or its completed response."""
+
+    fingerprint: str
+    expires_at: float
+    status: Optional[int] = None
+    headers: List[Tuple[bytes, bytes]] = field(default_factory=list)
+    body: bytes = b""
+
+    @property
+    def complete(self) -> bool:
+        return self.status is not None
+
+
+class IdempotencyStore:
+    """An in-memory LRU of responses by key, with per-entry expiry.
+
+    Only used from the event loop, so it needs no locking.
+    """
+
+    def __init__(
+        self, max_keys: int = IDEMPOTENCY_MAX_KEYS, ttl: float = IDEMPOTENCY_TTL
+    ) -> None:
+        self.max_keys = max_keys
+        self.ttl = ttl
+        self.entries: "OrderedDict[Key, StoredResponse]" = OrderedDict()
+
+    def get(self, key: Key) -> Optional[StoredResponse]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= monotonic():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return entry
+
+    def reserve(self, key: Key, fingerprint: str) -> StoredResponse:
+        """Record that a request with this key has started."""
+        entry = StoredResponse(fingerprint=fingerprint, expires_at=monotonic() + self.ttl)
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_keys:
+            self.entries.popitem(last=False)
+        return entry
+
+    def release(self, key: Key, entry: StoredResponse) -> None:
+        """Forget a reservation whose request did not reach a final outcome."""
+        if self.entries.get(key) is entry:
+            del self.entries[key]
+
+
+def _is_idempotent_route(method: str, path: str) -> bool:
+    return any(method == m and pattern.match(path) for m, pattern in IDEMPOTENT_ROUTES)
+
+
+async def _send_json(send: Send, status: int, detail: str, retry_after: bool = False) -> None:
+    headers = [(b"content-type", b"application/json")]
+    if retry_after:
+        headers.append((b"retry-after", b"1"))
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": json.dumps({"detail": detail}).encode()})
+
+
+class IdempotencyMiddleware:
+    """ASGI middleware replaying stored responses for repeated Idempotency-Keys."""
+
+    def __init__(self, app: ASGIApp, store: Optional[IdempotencyStore] = None) -> None:
+        self.app = app
+        self.store = store or IdempotencyStore()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not _is_idempotent_route(scope["method"], scope["path"]):
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        idempotency_key = headers.get(IDEMPOTENCY_HEADER)
+        if idempotency_key is None:
+            await self.app(scope, receive, send)
+            return
+        if not idempotency_key or len(idempotency_key) > MAX_KEY_LENGTH:
+            await _send_json(send, 400, "Invalid Idempotency-Key")
+            return
+
+        # The body is needed for the fingerprint; these requests are small JSON
+        messages: List[Message] = []
+        digest = hashlib.sha256()
+        while True:
+            message = await receive()
+            messages.append(message)
+            if message["type"] != "http.request":
+                break
+            digest.update(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        fingerprint = digest.hexdigest()
+
+        encoding = negotiated_encoding(scope).name
+        key = (
+            owner_id_for(headers.get("authorization")),
+            scope["method"],
+            scope["path"].rstrip("/"),
+            idempotency_key,
+            encoding,
+        )
+        entry = self.store.get(key)
+        if entry is None and any(
+            self.store.get((*key[:-1], other.name)) is not None
+            for other in ENCODINGS
+            if other.name != encoding
+        ):
+            await _send_json(
+                send, 422, "Idempotency-Key was already used with a different Accept header"
+            )
+            return
+        if entry is not None:
+            if entry.fingerprint != fingerprint:
+                await _send_json(
+                    send, 422, "Idempotency-Key was already used with a different request body"
+                )
+            elif not entry.complete:
+                await _send_json(
+                    send, 409, "A request with this Idempotency-Key is in progress",
+                    retry_after=True,
+                )
+            else:
+                await send(
+                    {
+                        "type": "http.response.start",
+                        "status": entry.status,
+                        "headers": [*entry.headers, (REPLAYED_HEADER, b"true")],
+                    }
+                )
+                await send({"type": "http.response.body", "body": entry.body})
+            return
+
+        entry = self.store.reserve(key, fingerprint)
+        pending = iter(messages)
+
+        async def replay_receive() -> Message:
+            message = next(pending, None)
+            return message if message is not None else await receive()
+
+        status: Optional[int] = None
+        response_headers: List[Tuple[bytes, bytes]] = []
+        body: List[bytes] = []
+        finished = False
+
+        async def capture_send(message: Message) -> None:
+            nonlocal status, response_headers, finished
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                response_headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                body.append(message.get("body", b""))
+                finished = not message.get("more_body", False)
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, capture_send)
+        finally:
+            if not finished or status is None or status >= 500 or status in RETRYABLE_STATUSES:
+                self.store.release(key, entry)
+            else:
+                entry.headers = [
+                    (name, value) for name, value in response_headers if name != b"content-length"
+                ]
+                entry.headers.append((b"content-length", str(sum(map(len, body))).encode()))
+                entry.body = b"".join(body)
+                entry.status = status
@@ -1,23 +1,48 @@
 """FastAPI application entry point."""
 
+import asyncio
 import os
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.exc import OperationalError
 
-from .database import Base, engine
-from .routers import tasks
+from . import (
+    admission,
+    archive,
+    compression,
+    idempotency,
+    metrics,
+    migrations,
+    negotiation,
+    profiling,
+    readiness,
+    slow_queries,
+    sql_timing,
+)
+from .database import SessionLocal, engine
+from .routers import batch, lists, tasks
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """Handle application startup and shutdown events."""
-    # Startup: Create database tables
-    Base.metadata.create_all(bind=engine)
+    # Startup: check the schema version; DDL only runs when it is out of date
+    migrations.ensure_schema(engine)
+    # Background archiving of old completed tasks is opt-in
+    sweeper = None
+    if archive.ARCHIVE_AFTER_DAYS:
+        sweeper = asyncio.create_task(
+            archive.run_sweeper(SessionLocal, float(archive.ARCHIVE_AFTER_DAYS))
+        )
     yield
-    # Shutdown: Dispose of connection pool
+    # Shutdown: stop the sweeper and dispose of connection pool
+    if sweeper is not None:
+        sweeper.cancel()
     engine.dispose()
 
 
@@ -28,6 +53,23 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Content negotiation is innermost: only handlers see translated MessagePack
+# bodies, and middleware rejections are plain JSON
+app.add_middleware(negotiation.NegotiationMiddleware)
+
+# Admission control sits inside CORS so rejections still carry CORS headers
+if admission.ADMISSION_CONTROL:
+    app.add_middleware(admission.AdmissionMiddleware)
+
+# Replays of idempotent requests are answered before admission control, so
+# a retry of completed work never waits for a database slot
+app.add_middleware(idempotency.IdempotencyMiddleware)
+
+# Compression sits outside idempotency, so stored responses are replayed
+# in whatever coding the retrying client accepts
+if compression.COMPRESSION:
+    app.add_middleware(compression.CompressionMiddleware)
+
 # Configure CORS from environment with sensible defaults
 ALLOWED_ORIGINS = os.getenv(
     "ALLOWED_ORIGINS", "http://localhost:5173,http://localhost"
@@ -38,14 +80,73 @@ app.add_middleware(
     allow_origins=ALLOWED_ORIGINS,
     allow_credentials=True,
     allow_methods=["GET", "POST", "PATCH", "PUT", "DELETE", "OPTIONS"],
-    allow_headers=["Content-Type", "Authorization"],
+    allow_headers=["Accept", "Content-Type", "Authorization", "Idempotency-Key"],
+    expose_headers=["Idempotent-Replayed"],
 )
 
+# Per-request SQL timing is opt-in so it costs nothing when disabled
+if sql_timing.SQL_TIMING_ENABLED:
+    app.add_middleware(sql_timing.ServerTimingMiddleware)
+    sql_timing.instrument_engine(engine)
+
+# Slow statement log is opt-in via SLOW_QUERY_MS
+if slow_queries.SLOW_QUERY_MS:
+    app.add_middleware(slow_queries.SlowQueryMiddleware)
+    slow_queries.instrument_engine(engine, float(slow_queries.SLOW_QUERY_MS))
+    if slow_queries.SLOW_QUERY_LOG:
+        slow_queries.configure_log_file(slow_queries.SLOW_QUERY_LOG)
+
+# Request metrics wrap everything, so they include time spent in CORS handling
+app.add_middleware(metrics.MetricsMiddleware)
+metrics.instrument_engine(engine)
+metrics.instrument_pool(engine, SessionLocal)
+
+# On-demand profiling needs both the switch and a token
+if profiling.PROFILING_ENABLED and profiling.PROFILING_TOKEN:
+    app.add_middleware(profiling.ProfilingMiddleware)
+
+readiness_probe = readiness.ReadinessProbe(engine)
+
 # Include routers
 app.include_router(tasks.router)
+app.include_router(lists.router)
+app.include_router(batch.router)
+
+
+@app.exception_handler(OperationalError)
+async def database_locked_handler(request: Request, exc: OperationalError) -> JSONResponse:
+    """Report SQLite lock contention as a retryable 503 rather than a bare 500.
+
+    Writers queue for the lock (see ``enable_sqlite_transactions``), so this
+    only fires when one waits longer than the busy timeout.
+    """
+    if "database is locked" not in str(exc.orig):
+        raise exc
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Database is locked"},
+        headers={"Retry-After": "1"},
+    )
 
 
 @app.get("/health")
 async def health_check() -> dict:
     """Health check endpoint."""
     return {"status": "healthy"}
+
+
+@app.get("/ready")
+async def readiness_check() -> JSONResponse:
+    """Readiness endpoint: 503 when the database is slow, failing or saturated."""
+    result = readiness_probe.cached() or await run_in_threadpool(readiness_probe.check)
+    return JSONResponse(
+        status_code=200 if result.ready else 503, content=result.as_dict()
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint() -> PlainTextResponse:
+    """Prometheus metrics endpoint."""
+    return PlainTextResponse(
+        metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4"
+    )
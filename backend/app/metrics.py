@@ -0,0 +1,414 @@
+"""Prometheus-format metrics.
+
+A small, dependency-free metrics registry rendered in the Prometheus text
+exposition format at ``/metrics``. Histograms use fixed bucket bounds chosen
+up front, so recording an observation is a bisect and two additions under an
+uncontended per-series lock.
+"""
+
+import threading
+from bisect import bisect_left
+from time import perf_counter
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from weakref import WeakSet
+
+from sqlalchemy import Engine, event
+from sqlalchemy.engine.interfaces import CacheStats
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Request latency buckets in seconds
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Route label for requests that did not match any route, so that arbitrary
+# paths cannot create unbounded label sets
+UNMATCHED_ROUTE = "<unmatched>"
+
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the text exposition format."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value, keeping integral values free of a decimal point."""
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Registry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self) -> None:
+        self._metrics: List["_Metric"] = []
+
+    def register(self, metric: "_Metric") -> None:
+        """Add a metric to the registry."""
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+                series = f"{name}{{{label_text}}}" if label_text else name
+                lines.append(f"{series} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class _Metric:
+    """Base class for labelled metrics."""
+
+    kind = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry: Optional[Registry] = REGISTRY,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+        if not self.labelnames:
+            # Unlabelled metrics are reported from the start, even at zero
+            self.labels()
+
+    def _new_child(self) -> object:
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """Return the series for the given label values, creating it if needed."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _series(self) -> Iterator[Tuple[Dict[str, str], object]]:
+        for values, child in list(self._children.items()):
+            yield dict(zip(self.labelnames, values)), child
+
+    def samples(self) -> Iterator[Sample]:
+        raise NotImplementedError
+
+
+class _Value:
+    """A single float guarded by a lock."""
+
+    def __init__(self) -> None:
+        self._value = 0.0
+        self._lock = threading.Lock()
+        self._function: Optional[Callable[[], float]] = None
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increase the value by amount."""
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        """Decrease the value by amount."""
+        with self._lock:
+            self._value -= amount
+
+    def set(self, value: float) -> None:
+        """Set the value."""
+        self._value = value
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Read the value from function at collection time instead."""
+        self._function = function
+
+    def get(self) -> float:
+        """Return the current value."""
+        return self._function() if self._function else self._value
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increment the unlabelled counter."""
+        self.labels().inc(amount)
+
+    def samples(self) -> Iterator[Sample]:
+        for labels, child in self._series():
+            yield f"{self.name}_total", labels, child.get()
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, or be read from a callback."""
+
+    kind = "gauge"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increment the unlabelled gauge."""
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        """Decrement the unlabelled gauge."""
+        self.labels().dec(amount)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Read the unlabelled gauge from function at collection time."""
+        self.labels().set_function(function)
+
+    def samples(self) -> Iterator[Sample]:
+        for labels, child in self._series():
+            yield self.name, labels, child.get()
+
+
+class _HistogramValue:
+    """Bucket counts, sum and count for one histogram series."""
+
+    def __init__(self, bounds: Tuple[float, ...]) -> None:
+        self.bounds = bounds
+        # One slot per bound plus the +Inf bucket; counts are not cumulative
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        """Record one observation."""
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class Histogram(_Metric):
+    """Distribution of observations over fixed buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        registry: Optional[Registry] = REGISTRY,
+    ) -> None:
+        self.bounds = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.bounds)
+
+    def observe(self, value: float) -> None:
+        """Record an observation on the unlabelled histogram."""
+        self.labels().observe(value)
+
+    def samples(self) -> Iterator[Sample]:
+        for labels, child in self._series():
+            with child._lock:
+                counts, total = list(child.counts), child.sum
+            cumulative = 0
+            for bound, count in zip(self.bounds + (float("inf"),), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, cumulative
+
+
+REQUESTS = Counter(
+    "http_requests",
+    "HTTP requests by method, route template and status code.",
+    ("method", "route", "status"),
+)
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by method and route template.",
+    ("method", "route"),
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being processed.",
+)
+DB_STATEMENTS = Counter(
+    "db_statements",
+    "SQL statements executed, by statement type.",
+    ("type",),
+)
+DB_COMPILED_CACHE = Counter(
+    "db_compiled_cache_lookups",
+    "SQL statement compilations by compiled cache outcome (hit, miss or uncached).",
+    ("result",),
+)
+DB_COMPILED_CACHE_ENTRIES = Gauge(
+    "db_compiled_cache_entries",
+    "Compiled statements currently held in the engine's cache.",
+)
+DB_POOL_SIZE = Gauge("db_pool_size", "Configured connection pool size.")
+DB_POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections currently checked out.")
+DB_POOL_OVERFLOW = Gauge("db_pool_overflow", "Connections open beyond the pool size.")
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds",
+    "Time a session waited to obtain a database connection.",
+)
+COALESCED_READS = Counter(
+    "coalesced_reads",
+    "Reads that ran a query (leader) or shared one already in flight (follower).",
+    ("role",),
+)
+TASK_FRAGMENTS = Counter(
+    "task_fragment_lookups",
+    "Pre-encoded task fragments found current (hit) or re-encoded (miss) for list reads.",
+    ("result",),
+)
+COMPRESSED_RESPONSES = Counter(
+    "compressed_responses",
+    "Responses compressed by the backend, by content coding.",
+    ("coding",),
+)
+COMPRESSION_CACHE = Counter(
+    "compressed_response_cache_lookups",
+    "Cacheable responses whose compressed body was reused (hit) or compressed (miss).",
+    ("result",),
+)
+ADMISSION_ACTIVE = Gauge(
+    "admission_active_requests",
+    "Requests admitted and running, by request class (read or write).",
+    ("class",),
+)
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "admission_queue_depth",
+    "Requests waiting for admission, by request class.",
+    ("class",),
+)
+ADMISSION_WAIT = Histogram(
+    "admission_wait_seconds",
+    "Time admitted requests spent waiting in the queue, by request class.",
+    ("class",),
+)
+ADMISSION_SHED = Counter(
+    "admission_shed_requests",
+    "Requests rejected with 503 by admission control, by class and reason.",
+    ("class", "reason"),
+)
+
+_instrumented_engines: "WeakSet[Engine]" = WeakSet()
+
+# Compiled cache outcome labels; textual SQL and DDL have no cache key
+CACHE_RESULTS = {
+    CacheStats.CACHE_HIT: "hit",
+    CacheStats.CACHE_MISS: "miss",
+    CacheStats.CACHING_DISABLED: "uncached",
+    CacheStats.NO_CACHE_KEY: "uncached",
+    CacheStats.NO_DIALECT_SUPPORT: "uncached",
+}
+
+
+def _statement_type(statement: str) -> str:
+    """Return the leading SQL keyword of a statement."""
+    keyword = statement.lstrip()[:8].split(None, 1)
+    return keyword[0].upper() if keyword else "OTHER"
+
+
+def instrument_engine(target: Engine) -> None:
+    """Count statements and compiled cache lookups on an engine.
+
+    Safe to call more than once.
+    """
+    if target in _instrumented_engines:
+        return
+    _instrumented_engines.add(target)
+
+    cache = getattr(target, "_compiled_cache", None)
+    if cache is not None:
+        DB_COMPILED_CACHE_ENTRIES.set_function(lambda: len(cache))
+
+    @event.listens_for(target, "before_cursor_execute")
+    def _count_statement(conn, cursor, statement, parameters, context, executemany) -> None:
+        DB_STATEMENTS.labels(_statement_type(statement)).inc()
+        if context is not None:
+            DB_COMPILED_CACHE.labels(CACHE_RESULTS.get(context.cache_hit, "uncached")).inc()
+
+
+def instrument_pool(target: Engine, sessions: sessionmaker) -> None:
+    """Publish pool gauges for an engine and connection wait time for sessions.
+
+    Wait time is measured from the start of a session transaction until its
+    connection has been checked out and begun.
+    """
+    pool = target.pool
+    for gauge, attribute in (
+        (DB_POOL_SIZE, "size"),
+        (DB_POOL_CHECKED_OUT, "checkedout"),
+        (DB_POOL_OVERFLOW, "overflow"),
+    ):
+        reading = getattr(pool, attribute, None)
+        if reading is not None:
+            gauge.set_function(lambda reading=reading: max(reading(), 0))
+
+    @event.listens_for(sessions, "after_transaction_create")
+    def _start_wait(session: Session, transaction) -> None:
+        if transaction.parent is None:
+            session.info["pool_wait_start"] = perf_counter()
+
+    @event.listens_for(sessions, "after_begin")
+    def _end_wait(session: Session, transaction, connection) -> None:
+        start = session.info.pop("pool_wait_start", None)
+        if start is not None:
+            DB_POOL_WAIT.observe(perf_counter() - start)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request counts, latency and concurrency.
+
+    Requests are labelled with the matched route template (for example
+    ``/api/v1/tasks/{task_id}``) rather than the raw path.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = perf_counter() - start
+            REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")
+            template = getattr(route, "path", None) or UNMATCHED_ROUTE
+            method = scope["method"]
+            REQUEST_DURATION.labels(method, template).observe(elapsed)
+            REQUESTS.labels(method, template, str(status_code)).inc()
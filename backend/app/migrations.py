@@ -0,0 +1,343 @@
+"""Schema versioning and in-app migrations.
+
+The schema version is kept in a one-row ``schema_version`` table. At startup
+the application reads it with a single query and, when it matches
+``HEAD_VERSION``, runs no DDL at all. Otherwise the schema is brought up to
+date inside one transaction that, on SQLite, takes the write lock first, so
+workers booting together wait for one another instead of racing:
+
+- a new database gets the current models with ``create_all`` and is stamped
+  at ``HEAD_VERSION``;
+- a database created before versioning (``tasks`` exists, no version) is
+  stamped at version 1 and upgraded from there;
+- otherwise each pending migration in ``MIGRATIONS`` is applied in order.
+
+Set ``AUTO_MIGRATE=0`` to make startup refuse to run against an out of date
+schema and apply migrations explicitly instead.
+
+Task ID storage (see ``app.ids``) is not part of the version: converting an
+existing database between text and binary IDs rebuilds every table holding
+IDs and is done explicitly, with the application stopped, before changing
+``ID_STORAGE``. Startup refuses to run when the two disagree.
+
+Usage:
+    python -m app.migrations upgrade
+    python -m app.migrations current
+    python -m app.migrations convert-ids binary|text
+"""
+
+import argparse
+import logging
+import os
+import sys
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import Connection, Engine, LargeBinary, MetaData, Table, inspect, select, text
+from sqlalchemy.exc import SQLAlchemyError
+
+from .database import Base, engine
+from .ids import ID_STORAGE, id_type
+from .models import (
+    ANONYMOUS_OWNER,
+    DEFAULT_LIST_ID,
+    ArchivedTask,
+    OwnerRevision,
+    Task,
+    TaskList,
+    create_revision_triggers,
+)
+
+logger = logging.getLogger(__name__)
+
+AUTO_MIGRATE = os.getenv("AUTO_MIGRATE", "1").lower() not in ("0", "false", "no")
+
+VERSION_TABLE = "schema_version"
+
+# Rows copied per batch when rebuilding a table
+CONVERT_BATCH_SIZE = 10_000
+
+
+@dataclass(frozen=True)
+class Migration:
+    """One schema change, applied on a connection inside a transaction."""
+
+    version: int
+    description: str
+    upgrade: Callable[[Connection], None]
+
+
+def add_column(conn: Connection, table: str, column: str, ddl: str) -> None:
+    """Add a column described by ddl (type and constraints) if it is missing."""
+    existing = {c["name"] for c in inspect(conn).get_columns(table)}
+    if column not in existing:
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+
+def create_index(conn: Connection, name: str, table: str, columns: str) -> None:
+    """Create an index on a comma-separated column list if it does not exist."""
+    conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})"))
+
+
+def _baseline(conn: Connection) -> None:
+    """The tasks table as created before schema versioning."""
+
+
+def _create_archive(conn: Connection) -> None:
+    ArchivedTask.__table__.create(conn, checkfirst=True)
+
+
+def _create_task_lists(conn: Connection) -> None:
+    # Creating the table also inserts the default list
+    storage = stored_id_storage(conn)
+    TaskList.__table__.create(conn, checkfirst=True)
+    if stored_id_storage(conn, TaskList.__tablename__) != storage:
+        _rebuild(conn, TaskList.__table__, storage)
+    # SQLite cannot add a foreign key or swap the unique index in place
+    _rebuild(conn, Task.__table__, storage, defaults={"list_id": DEFAULT_LIST_ID})
+
+
+def _add_owners(conn: Connection) -> None:
+    # Existing rows belong to the anonymous owner; rebuilt rather than altered
+    # because SQLite cannot change a unique constraint in place
+    storage = stored_id_storage(conn)
+    for table in (TaskList.__table__, Task.__table__, ArchivedTask.__table__):
+        _rebuild(conn, table, storage, defaults={"owner_id": ANONYMOUS_OWNER})
+
+
+def _create_owner_revisions(conn: Connection) -> None:
+    # Existing owners get a first revision, so revision 0 always means no data
+    OwnerRevision.__table__.create(conn, checkfirst=True)
+    conn.execute(
+        text(
+            "INSERT OR IGNORE INTO owner_revisions (owner_id, revision) "
+            "SELECT owner_id, 1 FROM tasks UNION SELECT owner_id, 1 FROM task_lists"
+        )
+    )
+    create_revision_triggers(conn)
+
+
+def _create_due_index(conn: Connection) -> None:
+    (index,) = (i for i in Task.__table__.indexes if i.name == "ix_tasks_owner_id_deadline_id")
+    index.create(conn, checkfirst=True)
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "baseline tasks table", _baseline),
+    Migration(2, "archived_tasks table", _create_archive),
+    Migration(3, "task lists", _create_task_lists),
+    Migration(4, "task owners", _add_owners),
+    Migration(5, "owner revisions", _create_owner_revisions),
+    Migration(6, "due tasks index", _create_due_index),
+]
+
+# Tables holding task or list IDs and their ID columns, rebuilt by convert_ids
+ID_TABLES = (TaskList.__table__, Task.__table__, ArchivedTask.__table__)
+ID_COLUMNS = {
+    TaskList.__tablename__: ("id",),
+    Task.__tablename__: ("id", "list_id"),
+    ArchivedTask.__tablename__: ("id",),
+}
+
+HEAD_VERSION = MIGRATIONS[-1].version
+
+
+def current_version(conn: Connection) -> Optional[int]:
+    """Return the recorded schema version, or None if it is not recorded."""
+    try:
+        return conn.execute(text(f"SELECT version FROM {VERSION_TABLE}")).scalar()
+    except SQLAlchemyError:
+        # The table does not exist yet; clear the failed statement
+        conn.rollback()
+        return None
+
+
+def stored_id_storage(conn: Connection, table: str = Task.__tablename__) -> Optional[str]:
+    """Return how a table stores task IDs ("text" or "binary"), or None if absent."""
+    if not inspect(conn).has_table(table):
+        return None
+    columns = inspect(conn).get_columns(table)
+    id_column = next(c for c in columns if c["name"] == "id")
+    return "binary" if isinstance(id_column["type"], LargeBinary) else "text"
+
+
+def _begin_exclusive(target: Engine, conn: Connection) -> Connection:
+    """Make the connection's next transaction take the write lock up front."""
+    if target.dialect.name == "sqlite":
+        return conn.execution_options(sqlite_begin="BEGIN IMMEDIATE")
+    return conn
+
+
+def _stamp(conn: Connection, version: int) -> None:
+    conn.execute(text(f"DELETE FROM {VERSION_TABLE}"))
+    conn.execute(text(f"INSERT INTO {VERSION_TABLE} (version) VALUES (:v)"), {"v": version})
+
+
+def upgrade(target: Engine = engine) -> int:
+    """Bring the schema up to HEAD_VERSION and return the version applied from."""
+    with target.connect() as conn:
+        # Take the write lock up front so concurrent upgrades serialise
+        conn = _begin_exclusive(target, conn)
+        with conn.begin():
+            conn.execute(
+                text(f"CREATE TABLE IF NOT EXISTS {VERSION_TABLE} (version INTEGER NOT NULL)")
+            )
+            version = conn.execute(text(f"SELECT version FROM {VERSION_TABLE}")).scalar()
+            start = version or 0
+            if version is None and not inspect(conn).has_table("tasks"):
+                logger.info("Creating schema at version %d", HEAD_VERSION)
+                Base.metadata.create_all(bind=conn)
+                _stamp(conn, HEAD_VERSION)
+                return start
+            if version is None:
+                version = 1
+            for migration in MIGRATIONS:
+                if migration.version > version:
+                    logger.info(
+                        "Applying migration %d: %s", migration.version, migration.description
+                    )
+                    migration.upgrade(conn)
+                    version = migration.version
+            _stamp(conn, version)
+            return start
+
+
+def _canonical_id(value: object) -> str:
+    if isinstance(value, bytes):
+        return str(uuid.UUID(bytes=value))
+    return str(value)
+
+
+def _rebuild(
+    conn: Connection,
+    source: Table,
+    storage: str,
+    defaults: Optional[Dict[str, Any]] = None,
+) -> int:
+    """Copy a table into a new one built from its model, then swap them.
+
+    ID columns are stored as storage, and columns the old table lacks are
+    filled from defaults. Returns the number of rows copied.
+    """
+    old = Table(source.name, MetaData(), autoload_with=conn)
+    metadata = MetaData()
+    # Referenced tables must be in the same metadata to emit foreign keys
+    for foreign_key in source.foreign_keys:
+        foreign_key.column.table.to_metadata(metadata)
+    new = source.to_metadata(metadata, name=f"{source.name}_converting")
+    id_columns = ID_COLUMNS.get(source.name, ("id",))
+    for name in id_columns:
+        new.c[name].type = id_type(storage)
+    # Index names are global in SQLite; recreate them after the rename
+    new.indexes.clear()
+    new.create(conn)
+
+    copied = 0
+    rows = conn.execute(select(old)).mappings()
+    while batch := rows.fetchmany(CONVERT_BATCH_SIZE):
+        records = [{**(defaults or {}), **row} for row in batch]
+        for record in records:
+            for name in id_columns:
+                record[name] = _canonical_id(record[name])
+        conn.execute(new.insert(), records)
+        copied += len(batch)
+        logger.info("Copied %d %s rows with %s IDs", copied, source.name, storage)
+
+    # Dropping the table drops its triggers too; recreate them as they were
+    triggers = []
+    if conn.dialect.name == "sqlite":
+        triggers = conn.execute(
+            text("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = :t"),
+            {"t": source.name},
+        ).scalars().all()
+    conn.execute(text(f"DROP TABLE {source.name}"))
+    conn.execute(text(f"ALTER TABLE {new.name} RENAME TO {source.name}"))
+    for index in source.indexes:
+        index.create(conn)
+    for trigger in triggers:
+        conn.execute(text(trigger))
+    return copied
+
+
+def convert_ids(target: Engine, storage: str) -> int:
+    """Rebuild every table holding IDs with IDs stored as storage.
+
+    Each table is copied in batches into a new table, which then replaces the
+    old one, all in one transaction holding the write lock. Tables are
+    rebuilt from the current models, so the schema must be at HEAD_VERSION.
+    Returns the number of rows converted.
+    """
+    with target.connect() as conn:
+        conn = _begin_exclusive(target, conn)
+        with conn.begin():
+            version = current_version(conn)
+            if version != HEAD_VERSION:
+                raise RuntimeError(
+                    f"Database schema version {version} is not {HEAD_VERSION}; "
+                    "run 'python -m app.migrations upgrade' first"
+                )
+            converted = 0
+            for source in ID_TABLES:
+                current = stored_id_storage(conn, source.name)
+                if current is not None and current != storage:
+                    converted += _rebuild(conn, source, storage)
+            return converted
+
+
+def ensure_schema(target: Engine = engine, auto_migrate: bool = AUTO_MIGRATE) -> None:
+    """Check the schema version at startup, migrating only when it is behind."""
+    with target.connect() as conn:
+        version = current_version(conn)
+        storage = stored_id_storage(conn) if version == HEAD_VERSION else None
+    if storage is not None and storage != ID_STORAGE:
+        raise RuntimeError(
+            f"Task IDs are stored as {storage} but ID_STORAGE is {ID_STORAGE}; "
+            f"run 'python -m app.migrations convert-ids {ID_STORAGE}'"
+        )
+    if version == HEAD_VERSION:
+        return
+    if version is not None and version > HEAD_VERSION:
+        raise RuntimeError(
+            f"Database schema version {version} is newer than this application ({HEAD_VERSION})"
+        )
+    if not auto_migrate:
+        raise RuntimeError(
+            f"Database schema version {version} is not {HEAD_VERSION}; "
+            "run 'python -m app.migrations upgrade'"
+        )
+    upgrade(target)
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(
+        prog="python -m app.migrations", description="Manage the database schema version."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("upgrade", help="apply pending migrations")
+    commands.add_parser("current", help="print the schema version")
+    convert = commands.add_parser("convert-ids", help="rebuild ID tables with new ID storage")
+    convert.add_argument("storage", choices=("binary", "text"))
+
+    args = parser.parse_args(argv)
+    try:
+        if args.command == "upgrade":
+            start = upgrade(engine)
+            print(f"Schema at version {HEAD_VERSION} (was {start or 'unversioned'})")
+        elif args.command == "convert-ids":
+            converted = convert_ids(engine, args.storage)
+            print(f"Converted {converted} rows to {args.storage} ID storage")
+            if args.storage != ID_STORAGE:
+                print(f"Set ID_STORAGE={args.storage} before starting the application")
+        else:
+            with engine.connect() as conn:
+                print(current_version(conn) or "unversioned")
+    except (SQLAlchemyError, RuntimeError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,34 @@
 """SQLAlchemy ORM models."""
 
-import uuid
 from datetime import datetime, timezone
 from typing import Optional
 
-from sqlalchemy import Boolean, DateTime, Integer, String
+from sqlalchemy import (
+    Boolean,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Table,
+    UniqueConstraint,
+    event,
+    text,
+)
+from sqlalchemy.engine import Connection
 from sqlalchemy.orm import Mapped, mapped_column
 
 from .database import Base
+from .ids import id_type, new_id
+
+# The list that holds tasks created through /api/v1/tasks. It is shared by
+# every owner, each of whom sees only their own tasks in it.
+DEFAULT_LIST_ID = "00000000-0000-0000-0000-000000000000"
+DEFAULT_LIST_NAME = "Tasks"
+
+# Owner of rows created by requests without an Authorization header
+ANONYMOUS_OWNER = "anonymous"
+OWNER_ID_LENGTH = 32
 
 
 def utcnow() -> datetime:
@@ -15,18 +36,74 @@ def utcnow() -> datetime:
     return datetime.now(timezone.utc)
 
 
+class TaskList(Base):
+    """A named, independently ordered list of tasks."""
+
+    __tablename__ = "task_lists"
+    __table_args__ = (Index("ix_task_lists_owner_id_created_at", "owner_id", "created_at"),)
+
+    id: Mapped[str] = mapped_column(id_type(), primary_key=True, default=new_id)
+    owner_id: Mapped[str] = mapped_column(
+        String(OWNER_ID_LENGTH), nullable=False, default=ANONYMOUS_OWNER
+    )
+    name: Mapped[str] = mapped_column(String(200), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow, onupdate=utcnow)
+
+    def __repr__(self) -> str:
+        """Return string representation of TaskList."""
+        return f"<TaskList(id={self.id}, name='{self.name}')>"
+
+
+@event.listens_for(TaskList.__table__, "after_create")
+def _create_default_list(target: Table, connection: Connection, **kw) -> None:
+    """Every database starts with the default list."""
+    now = utcnow()
+    connection.execute(
+        target.insert().values(
+            id=DEFAULT_LIST_ID,
+            owner_id=ANONYMOUS_OWNER,
+            name=DEFAULT_LIST_NAME,
+            created_at=now,
+            updated_at=now,
+        )
+    )
+
+
 class Task(Base):
     """Task model representing a single task item."""
 
     __tablename__ = "tasks"
+    # Positions are unique within an owner's list; the index also serves
+    # per-list ordering, max(position) and counts without touching other
+    # owners' or lists' rows
+    __table_args__ = (
+        UniqueConstraint(
+            "owner_id", "list_id", "position", name="uq_tasks_owner_id_list_id_position"
+        ),
+        # Incomplete tasks with a deadline, in deadline order, for the due
+        # tasks view; partial so completed and undated tasks are not indexed
+        Index(
+            "ix_tasks_owner_id_deadline_id",
+            "owner_id",
+            "deadline",
+            "id",
+            sqlite_where=text("is_complete = 0 AND deadline IS NOT NULL"),
+            postgresql_where=text("NOT is_complete AND deadline IS NOT NULL"),
+        ),
+    )
 
-    id: Mapped[str] = mapped_column(
-        String(36), primary_key=True, default=lambda: str(uuid.uuid4())
+    id: Mapped[str] = mapped_column(id_type(), primary_key=True, default=new_id)
+    owner_id: Mapped[str] = mapped_column(
+        String(OWNER_ID_LENGTH), nullable=False, default=ANONYMOUS_OWNER
+    )
+    list_id: Mapped[str] = mapped_column(
+        id_type(), ForeignKey("task_lists.id"), nullable=False, default=DEFAULT_LIST_ID
     )
     title: Mapped[str] = mapped_column(String(200), nullable=False)
     description: Mapped[Optional[str]] = mapped_column(String(2000), nullable=True)
     is_complete: Mapped[bool] = mapped_column(Boolean, default=False)
-    position: Mapped[int] = mapped_column(Integer, nullable=False, unique=True)
+    position: Mapped[int] = mapped_column(Integer, nullable=False)
     deadline: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow, onupdate=utcnow)
@@ -34,3 +111,91 @@ class Task(Base):
     def __repr__(self) -> str:
         """Return string representation of Task."""
         return f"<Task(id={self.id}, title='{self.title}', complete={self.is_complete})>"
+
+
+class ArchivedTask(Base):
+    """A completed task moved out of the active tasks table."""
+
+    __tablename__ = "archived_tasks"
+    __table_args__ = (
+        Index("ix_archived_tasks_owner_id_archived_at_id", "owner_id", "archived_at", "id"),
+    )
+
+    id: Mapped[str] = mapped_column(id_type(), primary_key=True)
+    owner_id: Mapped[str] = mapped_column(
+        String(OWNER_ID_LENGTH), nullable=False, default=ANONYMOUS_OWNER
+    )
+    title: Mapped[str] = mapped_column(String(200), nullable=False)
+    description: Mapped[Optional[str]] = mapped_column(String(2000), nullable=True)
+    is_complete: Mapped[bool] = mapped_column(Boolean, default=True)
+    deadline: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow, nullable=False)
+
+    def __repr__(self) -> str:
+        """Return string representation of ArchivedTask."""
+        return f"<ArchivedTask(id={self.id}, title='{self.title}')>"
+
+
+class OwnerRevision(Base):
+    """A stamp advanced by triggers whenever an owner's tasks or lists change.
+
+    Readers compare revisions to tell whether anything they derived from an
+    owner's data is still current, without reading the data itself. The
+    revision is the time of the last change in microseconds, or one more
+    than the previous revision if that is later, so it never repeats a value
+    even when the database is restored from a backup or recreated.
+    """
+
+    __tablename__ = "owner_revisions"
+
+    owner_id: Mapped[str] = mapped_column(String(OWNER_ID_LENGTH), primary_key=True)
+    revision: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+# Triggers rather than ORM events, so bulk statements, the archive sweeper
+# and other processes writing the same database all bump the revision
+_NOW_US = "CAST((julianday('now') - 2440587.5) * 86400000000 AS INTEGER)"
+
+
+def _bump_revision(owner: str, condition: str = "") -> str:
+    return (
+        f"INSERT INTO owner_revisions (owner_id, revision) SELECT {owner}, {_NOW_US} "
+        f"WHERE {condition or 'true'} "
+        f"ON CONFLICT (owner_id) DO UPDATE SET revision = max(revision + 1, {_NOW_US});"
+    )
+
+
+REVISION_TRIGGERS = [
+    f"CREATE TRIGGER IF NOT EXISTS {table}_revision_{event_name} "
+    f"AFTER {event_name.upper()} ON {table} BEGIN {body} END"
+    for table in ("tasks", "task_lists")
+    for event_name, body in (
+        ("insert", _bump_revision("NEW.owner_id")),
+        ("delete", _bump_revision("OLD.owner_id")),
+        (
+            "update",
+            _bump_revision("NEW.owner_id")
+            + " "
+            + _bump_revision("OLD.owner_id", "OLD.owner_id != NEW.owner_id"),
+        ),
+    )
+]
+
+
+def create_revision_triggers(connection: Connection) -> None:
+    """Create the triggers maintaining owner_revisions, if they do not exist.
+
+    Only SQLite is supported; elsewhere no revisions are recorded and
+    nothing is cached against them.
+    """
+    if connection.dialect.name != "sqlite":
+        return
+    for ddl in REVISION_TRIGGERS:
+        connection.execute(text(ddl))
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_revision_triggers(target: object, connection: Connection, **kw) -> None:
+    create_revision_triggers(connection)
@@ -0,0 +1,158 @@
+"""MessagePack content negotiation for the tasks API.
+
+Clients of ``/api/v1/tasks`` may exchange MessagePack instead of JSON:
+
+- ``Accept: application/msgpack`` selects MessagePack responses. Handlers
+  read the choice from ``app.responses.response_encoding``; datetimes are
+  timestamp extensions. Error responses stay JSON, as do clients that
+  prefer JSON or send no ``Accept`` header. Responses carry ``Vary: Accept``.
+- ``Content-Type: application/msgpack`` request bodies are translated to
+  JSON as they arrive, one line per packed object, so handlers and the
+  NDJSON import stream work unchanged. Timestamps become naive UTC ISO 8601
+  strings. A malformed or truncated body is rejected with 400.
+
+MessagePack needs the optional msgpack package. Without it, requests are
+answered in JSON and MessagePack bodies are rejected with 415.
+"""
+
+import json
+from datetime import datetime, timezone
+from typing import Any, List, Optional, Tuple
+
+from fastapi import HTTPException
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .responses import JSON, MSGPACK, MSGPACK_MEDIA_TYPE, Encoding, msgpack, response_encoding
+
+# Path prefixes whose handlers encode in the negotiated format
+NEGOTIATED_PREFIXES: Tuple[str, ...] = ("/api/v1/tasks",)
+
+MSGPACK_MEDIA_TYPES = frozenset({MSGPACK_MEDIA_TYPE, "application/x-msgpack"})
+JSON_MEDIA_RANGES = frozenset({"application/json", "application/*", "*/*"})
+
+
+def _media_ranges(accept: str) -> List[Tuple[str, float]]:
+    """Parse an Accept header into (media range, q) pairs."""
+    ranges = []
+    for item in accept.split(","):
+        media_range, *params = (part.strip() for part in item.split(";"))
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if media_range:
+            ranges.append((media_range.lower(), quality))
+    return ranges
+
+
+def accepted_encoding(accept: Optional[str]) -> Encoding:
+    """Pick the response encoding for an Accept header; JSON unless MessagePack is preferred.
+
+    MessagePack must be named explicitly: wildcards only ever select JSON.
+    """
+    if not accept or MSGPACK is None:
+        return JSON
+    ranges = _media_ranges(accept)
+    msgpack_q = max((q for r, q in ranges if r in MSGPACK_MEDIA_TYPES), default=0.0)
+    json_q = max((q for r, q in ranges if r in JSON_MEDIA_RANGES), default=0.0)
+    return MSGPACK if msgpack_q > 0 and msgpack_q >= json_q else JSON
+
+
+def negotiated_encoding(scope: Scope) -> Encoding:
+    """Return the encoding a request's response is sent in: JSON outside the tasks API."""
+    if not scope["path"].startswith(NEGOTIATED_PREFIXES):
+        return JSON
+    return accepted_encoding(Headers(scope=scope).get("accept"))
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.astimezone(timezone.utc).replace(tzinfo=None).isoformat()
+    raise TypeError(f"{type(value).__name__} has no JSON form")
+
+
+def _to_json_line(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, default=_json_default).encode() + b"\n"
+
+
+def _invalid_body() -> HTTPException:
+    return HTTPException(status_code=400, detail="Invalid MessagePack body")
+
+
+async def _send_json(send: Send, status: int, detail: str) -> None:
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json")],
+        }
+    )
+    await send({"type": "http.response.body", "body": json.dumps({"detail": detail}).encode()})
+
+
+def msgpack_to_json(receive: Receive) -> Receive:
+    """Wrap receive so a MessagePack stream arrives as one JSON line per object."""
+    unpacker = msgpack.Unpacker(timestamp=3, raw=False)
+    received = 0
+
+    async def json_receive() -> Message:
+        nonlocal received
+        message = await receive()
+        if message["type"] != "http.request":
+            return message
+        data = message.get("body", b"")
+        received += len(data)
+        unpacker.feed(data)
+        try:
+            body = b"".join(_to_json_line(value) for value in unpacker)
+        except (ValueError, TypeError) as exc:
+            raise _invalid_body() from exc
+        if not message.get("more_body", False) and unpacker.tell() != received:
+            raise _invalid_body()
+        return {**message, "body": body}
+
+    return json_receive
+
+
+class NegotiationMiddleware:
+    """ASGI middleware choosing the response encoding and decoding MessagePack bodies."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(NEGOTIATED_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+
+        content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        if content_type in MSGPACK_MEDIA_TYPES:
+            if msgpack is None:
+                await _send_json(send, 415, "MessagePack support is not installed")
+                return
+            scope = dict(scope)
+            scope["headers"] = [
+                (name, value)
+                for name, value in scope["headers"]
+                if name not in (b"content-type", b"content-length")
+            ] + [(b"content-type", b"application/json")]
+            receive = msgpack_to_json(receive)
+
+        async def vary_send(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                vary = [*message.get("headers", []), (b"vary", b"Accept")]
+                message = {**message, "headers": vary}
+            await send(message)
+
+        token = response_encoding.set(accepted_encoding(headers.get("accept")))
+        try:
+            await self.app(scope, receive, vary_send)
+        finally:
+            response_encoding.reset(token)
+
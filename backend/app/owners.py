@@ -0,0 +1,29 @@
+"""Request owners.
+
+Every task and list belongs to an owner, and each request acts for exactly
+one. The owner is derived from the ``Authorization`` header: its value is
+hashed into a fixed-length ID, so the raw credential is never stored and
+every owner-scoped index has the same key width. Verifying the credential is
+left to whatever sits in front of the API; requests without the header share
+the anonymous owner.
+"""
+
+import hashlib
+from typing import Optional
+
+from fastapi import Header
+
+from .models import ANONYMOUS_OWNER, OWNER_ID_LENGTH
+
+
+def owner_id_for(authorization: Optional[str]) -> str:
+    """Return the owner ID for an Authorization header value."""
+    if not authorization or not authorization.strip():
+        return ANONYMOUS_OWNER
+    digest = hashlib.sha256(authorization.strip().encode("utf-8")).hexdigest()
+    return digest[:OWNER_ID_LENGTH]
+
+
+def get_owner_id(authorization: Optional[str] = Header(None)) -> str:
+    """FastAPI dependency resolving the request's owner."""
+    return owner_id_for(authorization)
@@ -0,0 +1,239 @@
+"""On-demand profiling of single requests.
+
+Enabled only when ``PROFILING_ENABLED=1`` and ``PROFILING_TOKEN`` are set.
+A request is profiled with cProfile when it carries ``X-Profile: 1`` (or the
+``profile=1`` query parameter) together with ``X-Profile-Token`` matching
+the configured token. Other requests pass straight through.
+
+The profile covers the event loop thread for the duration of the request,
+plus the worker thread running a sync endpoint. It is returned in place of
+the response body as a download (the original status is kept in
+``X-Profile-Status``), or, when ``PROFILE_DIR`` is set, written there with the
+normal response sent back and the file name in ``X-Profile-File``.
+Formats are ``pstats`` (load with ``pstats.Stats``) and ``speedscope``
+(open at https://www.speedscope.app), chosen with ``X-Profile-Format``.
+"""
+
+import cProfile
+import hmac
+import json
+import marshal
+import os
+import pstats
+import re
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .routing import endpoint_hooks
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "").lower() in ("1", "true", "yes")
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+PROFILE_DIR = os.getenv("PROFILE_DIR", "")
+
+PROFILE_FORMATS = {"pstats": ".pstats", "speedscope": ".speedscope.json"}
+
+# Limits on the call tree expanded when building a speedscope profile
+SPEEDSCOPE_MAX_DEPTH = 64
+SPEEDSCOPE_MAX_SAMPLES = 50_000
+
+FunctionKey = Tuple[str, int, str]
+
+
+class RequestProfile:
+    """cProfile profilers collected for one request."""
+
+    def __init__(self) -> None:
+        self.loop_thread = threading.get_ident()
+        self.loop_profiler = cProfile.Profile()
+        self.worker_profilers: List[cProfile.Profile] = []
+
+    @contextmanager
+    def profile_worker(self) -> Iterator[None]:
+        """Profile the endpoint when it runs outside the event loop thread."""
+        if threading.get_ident() == self.loop_thread:
+            # Already covered by the loop profiler
+            yield
+            return
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            self.worker_profilers.append(profiler)
+
+    def stats(self) -> pstats.Stats:
+        """Combine all profilers into one set of stats."""
+        stats = pstats.Stats(self.loop_profiler)
+        for profiler in self.worker_profilers:
+            stats.add(profiler)
+        return stats
+
+
+def _frame_name(key: FunctionKey) -> Dict[str, Any]:
+    filename, line, name = key
+    return {"name": name, "file": filename, "line": line}
+
+
+def speedscope_profile(stats: pstats.Stats, name: str) -> Dict[str, Any]:
+    """Convert pstats into a speedscope sampled profile.
+
+    cProfile records caller/callee edges rather than stacks, so stacks are
+    rebuilt by walking edges down from the root functions and splitting each
+    edge's time between the callee's own time and its children.
+    """
+    raw: Dict[FunctionKey, Any] = stats.stats  # type: ignore[attr-defined]
+    callees: Dict[FunctionKey, List[Tuple[FunctionKey, float]]] = {}
+    for function, (_, _, _, _, callers) in raw.items():
+        for caller, (_, _, _, cumulative) in callers.items():
+            callees.setdefault(caller, []).append((function, cumulative))
+
+    frames: List[Dict[str, Any]] = []
+    frame_index: Dict[FunctionKey, int] = {}
+    samples: List[List[int]] = []
+    weights: List[float] = []
+
+    def index_of(function: FunctionKey) -> int:
+        if function not in frame_index:
+            frame_index[function] = len(frames)
+            frames.append(_frame_name(function))
+        return frame_index[function]
+
+    def walk(function: FunctionKey, time: float, stack: List[int]) -> None:
+        _, _, own, cumulative, _ = raw[function]
+        stack = stack + [index_of(function)]
+        self_share = own / cumulative if cumulative else 1.0
+        samples.append(stack)
+        weights.append(time * self_share)
+        if len(stack) >= SPEEDSCOPE_MAX_DEPTH or len(samples) >= SPEEDSCOPE_MAX_SAMPLES:
+            return
+        scale = time / cumulative if cumulative else 0.0
+        for callee, edge_time in callees.get(function, []):
+            if frame_index.get(callee) not in stack:
+                walk(callee, edge_time * scale, stack)
+
+    roots = [function for function, entry in raw.items() if not entry[4]]
+    for root in roots:
+        walk(root, raw[root][3], [])
+
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "shared": {"frames": frames},
+        "profiles": [
+            {
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }
+        ],
+        "exporter": "task-manager",
+    }
+
+
+def render_profile(profile: RequestProfile, profile_format: str, name: str) -> bytes:
+    """Serialise a request profile in the requested format."""
+    stats = profile.stats()
+    if profile_format == "speedscope":
+        return json.dumps(speedscope_profile(stats, name)).encode()
+    return marshal.dumps(stats.stats)  # type: ignore[attr-defined]
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles requests which ask for it with a valid token."""
+
+    def __init__(
+        self, app: ASGIApp, token: str = PROFILING_TOKEN, directory: str = PROFILE_DIR
+    ) -> None:
+        self.app = app
+        self.token = token.encode()
+        self.directory = Path(directory) if directory else None
+        # cProfile hooks are per thread, so only one request on the event
+        # loop can be profiled at a time; others are served unprofiled
+        self.busy = False
+
+    def _requested_format(self, scope: Scope) -> Optional[str]:
+        """Return the profile format if this request should be profiled."""
+        raw_query = scope.get("query_string", b"")
+        if b"profile=" not in raw_query and not any(
+            name == b"x-profile" for name, _ in scope["headers"]
+        ):
+            return None
+        headers = Headers(scope=scope)
+        query = parse_qs(raw_query.decode())
+        if headers.get("x-profile") != "1" and query.get("profile") != ["1"]:
+            return None
+        supplied = headers.get("x-profile-token", "").encode()
+        if not self.token or not hmac.compare_digest(supplied, self.token):
+            return None
+        profile_format = headers.get("x-profile-format", "pstats")
+        return profile_format if profile_format in PROFILE_FORMATS else "pstats"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        profile_format = None
+        if scope["type"] == "http" and not self.busy:
+            profile_format = self._requested_format(scope)
+        if profile_format is None:
+            await self.app(scope, receive, send)
+            return
+
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", scope["path"]).strip("-") or "root"
+        filename = f"profile-{stamp}-{scope['method'].lower()}-{slug}"
+        filename += PROFILE_FORMATS[profile_format]
+
+        profile = RequestProfile()
+        messages: List[Message] = []
+
+        async def capture(message: Message) -> None:
+            messages.append(message)
+
+        async def send_with_filename(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Profile-File", filename)
+            await send(message)
+
+        send_to = capture if self.directory is None else send_with_filename
+        token = endpoint_hooks.set(endpoint_hooks.get() + (profile.profile_worker,))
+        self.busy = True
+        profile.loop_profiler.enable()
+        try:
+            await self.app(scope, receive, send_to)
+        finally:
+            profile.loop_profiler.disable()
+            self.busy = False
+            endpoint_hooks.reset(token)
+
+        body = render_profile(profile, profile_format, f"{scope['method']} {scope['path']}")
+
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            (self.directory / filename).write_bytes(body)
+            return
+
+        status = next(
+            (m["status"] for m in messages if m["type"] == "http.response.start"), 500
+        )
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"application/octet-stream"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"content-disposition", f'attachment; filename="{filename}"'.encode()),
+                    (b"x-profile-status", str(status).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,144 @@
+"""Readiness probe for the database.
+
+Unlike ``/health``, which only shows that the process is up, readiness times
+a read of the ``schema_version`` table and inspects the connection pool. A
+real table is read because ``SELECT 1`` takes no lock and succeeds even while
+another connection holds SQLite's exclusive lock; on SQLite the read waits
+for the lock no longer than ``READY_MAX_LATENCY_MS``. The service is
+reported unavailable when the query fails or is slower than that, or when
+the share of pool capacity checked out reaches ``READY_MAX_POOL_USAGE``.
+Results are cached for ``READY_CACHE_TTL`` seconds so that frequent probes
+do not add load of their own.
+"""
+
+import os
+import threading
+from dataclasses import dataclass, field
+from time import monotonic, perf_counter
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import Connection, Engine, text
+from sqlalchemy.exc import SQLAlchemyError
+
+from .migrations import VERSION_TABLE
+
+READY_MAX_LATENCY_MS = float(os.getenv("READY_MAX_LATENCY_MS", "250"))
+READY_MAX_POOL_USAGE = float(os.getenv("READY_MAX_POOL_USAGE", "0.9"))
+READY_CACHE_TTL = float(os.getenv("READY_CACHE_TTL", "2"))
+
+PROBE_QUERY = text(f"SELECT version FROM {VERSION_TABLE}")
+
+
+@dataclass
+class Readiness:
+    """Outcome of one readiness check."""
+
+    ready: bool
+    latency_ms: Optional[float]
+    pool: Dict[str, Optional[int]]
+    reasons: List[str] = field(default_factory=list)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the response body for this result."""
+        return {
+            "status": "ready" if self.ready else "unavailable",
+            "database": {"latency_ms": self.latency_ms},
+            "pool": self.pool,
+            "reasons": self.reasons,
+        }
+
+
+def pool_status(target: Engine) -> Dict[str, Optional[int]]:
+    """Report pool size, checked-out and overflow counts, and total capacity.
+
+    Pools without a fixed size (such as SQLite's in-memory pools) report
+    None for the values they do not track.
+    """
+    pool = target.pool
+    readings: Dict[str, Optional[int]] = {}
+    for name, attribute in (
+        ("size", "size"),
+        ("checked_out", "checkedout"),
+        ("overflow", "overflow"),
+    ):
+        reading = getattr(pool, attribute, None)
+        readings[name] = max(reading(), 0) if reading is not None else None
+    max_overflow = getattr(pool, "_max_overflow", None)
+    if readings["size"] is not None and max_overflow is not None and max_overflow >= 0:
+        readings["capacity"] = readings["size"] + max_overflow
+    else:
+        readings["capacity"] = None
+    return readings
+
+
+class ReadinessProbe:
+    """Checks database latency and pool saturation, caching the result."""
+
+    def __init__(
+        self,
+        target: Engine,
+        max_latency_ms: float = READY_MAX_LATENCY_MS,
+        max_pool_usage: float = READY_MAX_POOL_USAGE,
+        ttl: float = READY_CACHE_TTL,
+    ) -> None:
+        self.engine = target
+        self.max_latency_ms = max_latency_ms
+        self.max_pool_usage = max_pool_usage
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._result: Optional[Readiness] = None
+        self._expires = 0.0
+
+    def cached(self) -> Optional[Readiness]:
+        """Return the last result if it is still fresh."""
+        if self._result is not None and monotonic() < self._expires:
+            return self._result
+        return None
+
+    def check(self) -> Readiness:
+        """Return a fresh or cached result; only one check runs at a time."""
+        with self._lock:
+            result = self.cached()
+            if result is None:
+                result = self._run()
+                self._result = result
+                self._expires = monotonic() + self.ttl
+            return result
+
+    def _run(self) -> Readiness:
+        pool = pool_status(self.engine)
+        reasons = []
+
+        capacity = pool["capacity"]
+        if capacity and pool["checked_out"] is not None:
+            usage = pool["checked_out"] / capacity
+            if usage >= self.max_pool_usage:
+                # Checking out another connection would only queue behind the rest
+                reasons.append(f"connection pool {usage:.0%} checked out")
+                return Readiness(False, None, pool, reasons)
+
+        start = perf_counter()
+        try:
+            with self.engine.connect() as conn:
+                self._query(conn)
+        except SQLAlchemyError as exc:
+            reasons.append(f"database query failed: {exc.__class__.__name__}")
+            return Readiness(False, None, pool, reasons)
+        latency_ms = round((perf_counter() - start) * 1000, 3)
+
+        if latency_ms > self.max_latency_ms:
+            reasons.append(f"database latency {latency_ms}ms over {self.max_latency_ms:g}ms")
+        return Readiness(not reasons, latency_ms, pool, reasons)
+
+    def _query(self, conn: Connection) -> None:
+        if conn.dialect.name != "sqlite":
+            conn.execute(PROBE_QUERY)
+            return
+        # Fail fast on a locked database instead of waiting out the
+        # connection's busy timeout, and restore it for the pool's next user
+        previous = conn.exec_driver_sql("PRAGMA busy_timeout").scalar()
+        conn.exec_driver_sql(f"PRAGMA busy_timeout = {max(int(self.max_latency_ms), 0)}")
+        try:
+            conn.execute(PROBE_QUERY)
+        finally:
+            conn.exec_driver_sql(f"PRAGMA busy_timeout = {previous}")
@@ -0,0 +1,158 @@
+"""Fast JSON and MessagePack encoding for task and list responses.
+
+FastAPI's default path validates a handler's result against the response
+model, converts it to plain Python with ``jsonable_encoder`` and encodes
+that with the stdlib ``json`` module; for a list of tasks the conversion
+costs more than the query. Two faster paths produce the same bytes:
+
+- ``encode_json`` validates with a prebuilt ``TypeAdapter`` and lets
+  pydantic-core write JSON bytes directly. Handlers return the bytes in a
+  ``Response``, which FastAPI passes through untouched, while the route's
+  ``response_model`` still documents the schema.
+- ``FastJSONResponse`` is the routers' default response class for the
+  handlers still serialized by FastAPI. It encodes with orjson when it is
+  installed and falls back to ``json`` otherwise.
+
+Both match Starlette's ``JSONResponse`` byte for byte for the values these
+APIs return: compact separators, non-ASCII text unescaped and ISO 8601
+datetimes. orjson writes floats differently, so ``FastJSONResponse`` is
+only used where responses contain none.
+
+Handlers that encode their own bodies do so with an ``Encoding``, JSON or,
+when the msgpack package is installed, MessagePack with datetimes as
+timestamp extensions. The encoding for the current request is chosen by
+``app.negotiation`` and read from ``response_encoding``. Their encode and
+join functions report the time they take to ``encode_observer``, if request
+instrumentation has set one (see ``app.sql_timing``).
+"""
+
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import wraps
+from time import perf_counter
+from typing import Any, Callable, Optional, Sequence, TypeVar
+
+from fastapi.responses import JSONResponse, Response
+from pydantic import TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised by the fallback test
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - MessagePack support is optional
+    msgpack = None
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+F = TypeVar("F", bound=Callable[..., bytes])
+
+# Called with the seconds each encode or join took, for the current request
+encode_observer: ContextVar[Optional[Callable[[float], None]]] = ContextVar(
+    "encode_observer", default=None
+)
+
+
+def timed(fn: F) -> F:
+    """Wrap an encoder so that it reports its duration to ``encode_observer``."""
+
+    @wraps(fn)
+    def wrapper(*args: Any) -> bytes:
+        observe = encode_observer.get()
+        if observe is None:
+            return fn(*args)
+        start = perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            observe(perf_counter() - start)
+
+    return wrapper  # type: ignore[return-value]
+
+
+class FastJSONResponse(JSONResponse):
+    """A ``JSONResponse`` rendered with orjson when it is available."""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content)
+
+
+@dataclass(frozen=True)
+class Encoding:
+    """A response body format: how to encode one value and join encoded items."""
+
+    name: str
+    media_type: str
+    encode: Callable[[TypeAdapter, Any], bytes]
+    join: Callable[[Sequence[bytes]], bytes]
+
+
+def encode_json(adapter: TypeAdapter, value: Any) -> bytes:
+    """Encode a handler result exactly as FastAPI would for its response model."""
+    return adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+
+
+def join_json(items: Sequence[bytes]) -> bytes:
+    """Join encoded values into a JSON array, byte for byte as json.dumps would."""
+    return b"[" + b",".join(items) + b"]"
+
+
+def msgpack_default(value: Any) -> Any:
+    """Pack naive datetimes, which are UTC throughout the app, as timestamps."""
+    if isinstance(value, datetime):
+        return msgpack.Timestamp.from_datetime(value.replace(tzinfo=timezone.utc))
+    raise TypeError(f"Cannot serialize {type(value).__name__} to MessagePack")
+
+
+def pack(value: Any) -> bytes:
+    """Pack plain Python values, with datetimes as timestamp extensions."""
+    return msgpack.packb(value, datetime=True, default=msgpack_default)
+
+
+def encode_msgpack(adapter: TypeAdapter, value: Any) -> bytes:
+    """Encode a handler result for its response model as MessagePack."""
+    return pack(adapter.dump_python(adapter.validate_python(value, from_attributes=True)))
+
+
+def join_msgpack(items: Sequence[bytes]) -> bytes:
+    """Join encoded values into a MessagePack array."""
+    count = len(items)
+    if count < 16:
+        header = bytes([0x90 | count])
+    elif count < 1 << 16:
+        header = b"\xdc" + count.to_bytes(2, "big")
+    else:
+        header = b"\xdd" + count.to_bytes(4, "big")
+    return header + b"".join(items)
+
+
+JSON = Encoding("json", JSON_MEDIA_TYPE, timed(encode_json), timed(join_json))
+MSGPACK: Optional[Encoding] = (
+    Encoding("msgpack", MSGPACK_MEDIA_TYPE, timed(encode_msgpack), timed(join_msgpack))
+    if msgpack
+    else None
+)
+ENCODINGS = tuple(encoding for encoding in (JSON, MSGPACK) if encoding is not None)
+
+# The encoding negotiated for the current request
+response_encoding: ContextVar[Encoding] = ContextVar("response_encoding", default=JSON)
+
+
+def encoded_response(
+    body: bytes, status_code: int = 200, encoding: Optional[Encoding] = None
+) -> Response:
+    """Wrap an already encoded body in a response."""
+    media_type = (encoding or response_encoding.get()).media_type
+    return Response(body, status_code=status_code, media_type=media_type)
+
+
+def respond(adapter: TypeAdapter, value: Any, status_code: int = 200) -> Response:
+    """Encode a handler result for its response model in the negotiated encoding."""
+    encoding = response_encoding.get()
+    return encoded_response(encoding.encode(adapter, value), status_code, encoding)
@@ -0,0 +1,193 @@
+"""Batch API router.
+
+Executes an ordered list of tasks and lists API calls in one request and one database
+transaction. Each operation is dispatched to the same handler that serves
+the equivalent standalone request.
+"""
+
+import inspect
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import Response, StreamingResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from sqlalchemy.orm import Session
+
+from ..coalescing import exclude_session
+from ..database import get_db
+from ..owners import get_owner_id
+from ..schemas import BatchOperation, BatchRequest, BatchResponse, BatchResult
+from . import lists, tasks
+
+router = APIRouter(prefix="/api/v1/batch", tags=["batch"])
+
+
+def _is_owner(param: inspect.Parameter) -> bool:
+    """Whether a handler parameter is the request owner dependency."""
+    return getattr(param.default, "dependency", None) is get_owner_id
+
+
+def _is_bindable(route: APIRoute, name: str, param: inspect.Parameter) -> bool:
+    """Whether a handler parameter can be supplied from a batch operation."""
+    annotation = param.annotation
+    return (
+        name in route.param_convertors
+        or _is_owner(param)
+        or (isinstance(annotation, type) and issubclass(annotation, (Session, BaseModel)))
+    )
+
+
+def _is_batchable(route: Any) -> bool:
+    """Whether a route is a plain JSON handler that a batch can call directly.
+
+    Streaming routes and handlers that need the raw request are excluded.
+    """
+    if not isinstance(route, APIRoute) or route.response_class is StreamingResponse:
+        return False
+    parameters = inspect.signature(route.endpoint).parameters
+    return all(_is_bindable(route, name, param) for name, param in parameters.items())
+
+
+# Every tasks and lists route, in the order the app matches them, so that
+# literal paths like /api/v1/tasks/due are found before /{task_id}
+ROUTES: List[APIRoute] = [
+    route
+    for route in [*tasks.router.routes, *lists.router.routes]
+    if isinstance(route, APIRoute)
+]
+
+# Routes that can be addressed from a batch operation
+BATCHABLE_ROUTES: List[APIRoute] = [route for route in ROUTES if _is_batchable(route)]
+
+# Serialisers for each route's response model, built once at import
+RESPONSE_ADAPTERS: Dict[str, TypeAdapter] = {
+    route.unique_id: TypeAdapter(route.response_model)
+    for route in BATCHABLE_ROUTES
+    if route.response_model is not None
+}
+
+# Execution options for the batch's connection (see enable_sqlite_transactions)
+BATCH_TRANSACTION = {"sqlite_begin": "BEGIN IMMEDIATE"}
+
+NOT_EXECUTED = BatchResult(
+    status=424, body={"detail": "Not executed: an earlier operation failed"}
+)
+
+
+def _resolve(method: str, path: str) -> Tuple[Optional[APIRoute], Dict[str, Any]]:
+    """Find the route serving method and path, with converted path params."""
+    for route in ROUTES:
+        match = route.path_regex.match(path)
+        if match and method in route.methods:
+            params = {
+                name: route.param_convertors[name].convert(value)
+                for name, value in match.groupdict().items()
+            }
+            return route, params
+    return None, {}
+
+
+def _call_route(
+    route: APIRoute, path_params: Dict[str, Any], body: Any, db: Session, owner_id: str
+) -> Any:
+    """Bind path params, body, session and owner to the route handler and call it."""
+    endpoint: Callable[..., Any] = route.endpoint
+    kwargs: Dict[str, Any] = {}
+    for name, param in inspect.signature(endpoint).parameters.items():
+        if name in path_params:
+            kwargs[name] = path_params[name]
+        elif _is_owner(param):
+            kwargs[name] = owner_id
+        elif isinstance(param.annotation, type) and issubclass(param.annotation, Session):
+            kwargs[name] = db
+        elif isinstance(param.annotation, type) and issubclass(param.annotation, BaseModel):
+            kwargs[name] = param.annotation.model_validate(body)
+    return endpoint(**kwargs)
+
+
+def _execute(operation: BatchOperation, db: Session, owner_id: str) -> BatchResult:
+    """Run one operation and capture its status code and body."""
+    route, path_params = _resolve(operation.method, operation.path)
+    if route is None:
+        return BatchResult(status=404, body={"detail": "Not Found"})
+    if route not in BATCHABLE_ROUTES:
+        return BatchResult(
+            status=400,
+            body={"detail": f"{operation.method} {operation.path} cannot be used in a batch"},
+        )
+
+    try:
+        result = _call_route(route, path_params, operation.body, db, owner_id)
+    except HTTPException as exc:
+        return BatchResult(status=exc.status_code, body={"detail": exc.detail})
+    except ValidationError as exc:
+        return BatchResult(
+            status=422,
+            body={"detail": exc.errors(include_url=False, include_context=False)},
+        )
+
+    adapter = RESPONSE_ADAPTERS.get(route.unique_id)
+    body = None
+    if isinstance(result, Response):
+        # Coalesced reads return their body already encoded
+        body = json.loads(result.body)
+    elif adapter is not None:
+        body = adapter.dump_python(
+            adapter.validate_python(result, from_attributes=True), mode="json"
+        )
+    return BatchResult(status=route.status_code or 200, body=body)
+
+
+@router.post("", response_model=BatchResponse)
+def run_batch(
+    batch: BatchRequest,
+    db: Session = Depends(get_db),
+    owner_id: str = Depends(get_owner_id),
+) -> BatchResponse:
+    """Execute several tasks API operations in order, as the request's owner.
+
+    All operations share one database transaction. Each operation runs in its
+    own savepoint, so a handler's commit or rollback only affects that
+    operation. With ``atomic`` set, the first failure stops the batch and
+    rolls everything back; otherwise failed operations are skipped and the
+    rest are committed together.
+    """
+    # Handlers commit as usual; in this session a commit releases a savepoint
+    # and the outer transaction on the request session decides the outcome.
+    # On SQLite the transaction takes the write lock up front: operations
+    # read before they write, and waiting for the lock here cannot deadlock.
+    # Execution options only apply to a new transaction, so end any the
+    # request session has open; it has not written anything yet.
+    db.rollback()
+    operation_session = Session(
+        bind=db.connection(execution_options=BATCH_TRANSACTION),
+        join_transaction_mode="create_savepoint",
+    )
+    # Reads see the batch's own uncommitted writes, so are never shared
+    exclude_session(operation_session)
+
+    results: List[BatchResult] = []
+    failed = False
+    try:
+        for operation in batch.operations:
+            if failed and batch.atomic:
+                results.append(NOT_EXECUTED)
+                continue
+
+            result = _execute(operation, operation_session, owner_id)
+            if result.status >= 400:
+                failed = True
+                operation_session.rollback()
+            results.append(result)
+    finally:
+        operation_session.close()
+
+    committed = not (failed and batch.atomic)
+    if committed:
+        db.commit()
+    else:
+        db.rollback()
+
+    return BatchResponse(committed=committed, results=results)
@@ -0,0 +1,173 @@
+"""Task lists API router.
+
+Lists belong to an owner (see ``app.owners``) and are ordered
+independently: positions are unique per owner and list, and listing,
+appending and reordering touch only the list's own rows and its range of the
+(owner_id, list_id, position) index. The default list is the one served by
+/api/v1/tasks; every owner sees it, holding only their own tasks.
+"""
+
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+from sqlalchemy import delete, or_
+from sqlalchemy.orm import Session
+
+from ..coalescing import coalesced_json
+from ..database import get_db
+from ..models import DEFAULT_LIST_ID, Task, TaskList
+from ..owners import get_owner_id
+from ..responses import FastJSONResponse
+from ..routing import InstrumentedRoute
+from ..schemas import (
+    ReorderRequest,
+    TaskCreate,
+    TaskListCreate,
+    TaskListResponse,
+    TaskListUpdate,
+    TaskResponse,
+)
+from .tasks import (
+    create_task_in_list,
+    in_list,
+    list_tasks_response,
+    reorder_list,
+    task_response,
+    tasks_response,
+)
+
+router = APIRouter(
+    prefix="/api/v1/lists",
+    tags=["lists"],
+    route_class=InstrumentedRoute,
+    default_response_class=FastJSONResponse,
+)
+
+LIST_ADAPTER = TypeAdapter(List[TaskListResponse])
+
+
+def _get_list_or_404(db: Session, owner_id: str, list_id: str) -> TaskList:
+    task_list = db.get(TaskList, list_id)
+    visible = task_list is not None and (
+        task_list.id == DEFAULT_LIST_ID or task_list.owner_id == owner_id
+    )
+    if not visible:
+        raise HTTPException(status_code=404, detail="List not found")
+    return task_list
+
+
+@router.get("/", response_model=List[TaskListResponse])
+def list_lists(
+    db: Session = Depends(get_db), owner_id: str = Depends(get_owner_id)
+) -> Response:
+    """Get the default list and the owner's lists, oldest first."""
+    return coalesced_json(
+        db,
+        owner_id,
+        ("list_lists",),
+        LIST_ADAPTER,
+        lambda: (
+            db.query(TaskList)
+            .filter(or_(TaskList.owner_id == owner_id, TaskList.id == DEFAULT_LIST_ID))
+            .order_by(TaskList.created_at.asc(), TaskList.id.asc())
+            .all()
+        ),
+    )
+
+
+@router.post("/", status_code=status.HTTP_201_CREATED, response_model=TaskListResponse)
+def create_list(
+    list_data: TaskListCreate,
+    db: Session = Depends(get_db),
+    owner_id: str = Depends(get_owner_id),
+) -> TaskList:
+    """Create a new, empty task list."""
+    task_list = TaskList(owner_id=owner_id, name=list_data.name)
+    db.add(task_list)
+    db.commit()
+    db.refresh(task_list)
+    return task_list
+
+
+@router.get("/{list_id}", response_model=TaskListResponse)
+def get_list(
+    list_id: str, db: Session = Depends(get_db), owner_id: str = Depends(get_owner_id)
+) -> TaskList:
+    """Get a single task list by ID."""
+    return _get_list_or_404(db, owner_id, list_id)
+
+
+@router.patch("/{list_id}", response_model=TaskListResponse)
+def update_list(
+    list_id: str,
+    list_data: TaskListUpdate,
+    db: Session = Depends(get_db),
+    owner_id: str = Depends(get_owner_id),
+) -> TaskList:
+    """Rename a task list.
+
+    The default list is shared by every owner and cannot be renamed.
+    """
+    if list_id == DEFAULT_LIST_ID:
+        raise HTTPException(status_code=400, detail="The default list cannot be renamed")
+    task_list = _get_list_or_404(db, owner_id, list_id)
+    task_list.name = list_data.name
+    db.commit()
+    db.refresh(task_list)
+    return task_list
+
+
+@router.delete("/{list_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_list(
+    list_id: str, db: Session = Depends(get_db), owner_id: str = Depends(get_owner_id)
+) -> None:
+    """Delete a task list and every task in it.
+
+    The default list cannot be deleted.
+    """
+    if list_id == DEFAULT_LIST_ID:
+        raise HTTPException(status_code=400, detail="The default list cannot be deleted")
+    task_list = _get_list_or_404(db, owner_id, list_id)
+
+    db.execute(delete(Task).where(in_list(owner_id, list_id)))
+    db.delete(task_list)
+    db.commit()
+
+
+@router.get("/{list_id}/tasks", response_model=List[TaskResponse])
+def list_list_tasks(
+    list_id: str, db: Session = Depends(get_db), owner_id: str = Depends(get_owner_id)
+) -> Response:
+    """Get a list's tasks ordered by position."""
+    return list_tasks_response(
+        db, owner_id, list_id, check=lambda: _get_list_or_404(db, owner_id, list_id)
+    )
+
+
+@router.post(
+    "/{list_id}/tasks", status_code=status.HTTP_201_CREATED, response_model=TaskResponse
+)
+def create_list_task(
+    list_id: str,
+    task_data: TaskCreate,
+    db: Session = Depends(get_db),
+    owner_id: str = Depends(get_owner_id),
+) -> Response:
+    """Append a new task to a list."""
+    _get_list_or_404(db, owner_id, list_id)
+    task = create_task_in_list(db, owner_id, list_id, task_data)
+    return task_response(task, status.HTTP_201_CREATED)
+
+
+@router.put("/{list_id}/tasks/reorder", response_model=List[TaskResponse])
+def reorder_list_tasks(
+    list_id: str,
+    reorder_data: ReorderRequest,
+    db: Session = Depends(get_db),
+    owner_id: str = Depends(get_owner_id),
+) -> Response:
+    """Reorder a list by providing the new order of all its task IDs."""
+    _get_list_or_404(db, owner_id, list_id)
+    return tasks_response(reorder_list(db, owner_id, list_id, reorder_data.task_ids))
@@ -1,60 +1,229 @@
 """Tasks API router."""
 
-from typing import List
-
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import func
+import codecs
+import csv
+import io
+import json
+import logging
+import zlib
+from datetime import datetime, timedelta
+from typing import Any, Callable, Iterator, List, Literal, Optional, Sequence, Tuple, Union
+
+from anyio import from_thread
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import ColumnElement, and_, bindparam, false, func, insert, select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from ..archive import archive_completed, archive_page
+from ..coalescing import coalesced, reads_are_private
 from ..database import get_db
-from ..models import Task
-from ..schemas import ReorderRequest, TaskCreate, TaskResponse, TaskUpdate
-
-router = APIRouter(prefix="/api/v1/tasks", tags=["tasks"])
+from ..fragments import ListSnapshot, fragments
+from ..models import DEFAULT_LIST_ID, Task, utcnow
+from ..owners import get_owner_id
+from ..responses import (
+    MSGPACK,
+    MSGPACK_MEDIA_TYPE,
+    Encoding,
+    FastJSONResponse,
+    encoded_response,
+    pack,
+    respond,
+    response_encoding,
+)
+from ..routing import InstrumentedRoute
+from ..schemas import (
+    ArchivePage,
+    ArchiveRequest,
+    ArchiveResult,
+    ImportLineError,
+    ImportResult,
+    ReorderRequest,
+    TaskCreate,
+    TaskResponse,
+    TaskUpdate,
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/api/v1/tasks",
+    tags=["tasks"],
+    route_class=InstrumentedRoute,
+    default_response_class=FastJSONResponse,
+)
 
 # Explicit allowlist of fields that can be updated via PATCH
 UPDATABLE_FIELDS = {"title", "description", "is_complete", "position", "deadline"}
 
+# Export settings: rows fetched per round trip and bytes buffered per chunk
+EXPORT_COLUMNS = list(TaskResponse.model_fields)
+EXPORT_BATCH_SIZE = 1000
+EXPORT_CHUNK_BYTES = 64 * 1024
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "json": "application/json",
+    "msgpack": MSGPACK_MEDIA_TYPE,
+}
+
+# Import settings: tasks inserted per transaction, longest accepted line and
+# number of per-line errors reported back
+IMPORT_CHUNK_SIZE = 500
+IMPORT_MAX_LINE_CHARS = 64 * 1024
+IMPORT_MAX_ERRORS = 100
+
+# Due tasks: accepted "within" durations, e.g. 90m, 36h, 7d or 2w
+DURATION_PATTERN = r"^\d{1,5}[smhdw]$"
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+ARCHIVE_PAGE_ADAPTER = TypeAdapter(ArchivePage)
+ARCHIVE_RESULT_ADAPTER = TypeAdapter(ArchiveResult)
+IMPORT_RESULT_ADAPTER = TypeAdapter(ImportResult)
+
+
+def in_list(owner_id: str, list_id: str) -> ColumnElement[bool]:
+    """Filter for an owner's tasks in one list, a prefix of the position index."""
+    return and_(Task.owner_id == owner_id, Task.list_id == list_id)
+
+
+# Hot statements are built once with named parameters. Executing the same
+# statement object reuses its memoized cache key and the engine's compiled
+# SQL, where a fresh db.query(...) chain is rebuilt and re-keyed every call.
+_IN_LIST = and_(
+    Task.owner_id == bindparam("owner_id"), Task.list_id == bindparam("list_id")
+)
+OWNED_TASK = select(Task).where(
+    Task.id == bindparam("task_id"), Task.owner_id == bindparam("owner_id")
+)
+MAX_POSITION = select(func.max(Task.position)).where(_IN_LIST)
+COUNT_IN_LIST = select(func.count(Task.id)).where(_IN_LIST)
+TASKS_BY_ID = select(Task).where(
+    _IN_LIST, Task.id.in_(bindparam("task_ids", expanding=True))
+)
+LOCK_TASKS_BY_ID = TASKS_BY_ID.with_for_update()
+TASK_STAMPS = (
+    select(Task.id, Task.updated_at, Task.position)
+    .where(_IN_LIST)
+    .order_by(Task.position.asc())
+)
+# An owner's incomplete tasks due before :until, in all their lists, earliest
+# first. Both read the partial ix_tasks_owner_id_deadline_id index in order,
+# so only the rows returned are visited however many tasks there are.
+DUE_TASKS = (
+    select(Task)
+    .where(
+        Task.owner_id == bindparam("owner_id"),
+        Task.is_complete == false(),
+        Task.deadline < bindparam("until"),
+    )
+    .order_by(Task.deadline.asc(), Task.id.asc())
+    .limit(bindparam("limit"))
+)
+UPCOMING_TASKS = DUE_TASKS.where(Task.deadline >= bindparam("now"))
+
+
+def get_owned_task(db: Session, owner_id: str, task_id: str) -> Task:
+    """Return one of an owner's tasks, or raise 404."""
+    task = db.scalars(OWNED_TASK, {"task_id": task_id, "owner_id": owner_id}).first()
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return task
 
-@router.get("/", response_model=List[TaskResponse])
-def list_tasks(db: Session = Depends(get_db)) -> List[Task]:
-    """Get all tasks ordered by position.
 
-    Returns tasks sorted by position ascending.
+def task_response(task: Task, status_code: int = 200) -> Response:
+    """Respond with a task's pre-encoded body (see ``app.responses``)."""
+    encoding = response_encoding.get()
+    return encoded_response(fragments.fragment(task, encoding), status_code, encoding)
+
+
+def tasks_response(tasks: Sequence[Task]) -> Response:
+    """Respond with tasks encoded as an array, storing their fragments."""
+    encoding = response_encoding.get()
+    encoded = fragments.store(tasks, encoding)
+    return encoded_response(encoding.join([encoded[task.id] for task in tasks]), encoding=encoding)
+
+
+def encode_tasks_in_list(
+    db: Session, owner_id: str, list_id: str, revision: Optional[int], encoding: Encoding
+) -> bytes:
+    """Encode a list's tasks from pre-encoded fragments (see ``app.fragments``).
+
+    Only tasks changed since their fragment was stored are loaded and
+    encoded; the rest of the response is a byte join. The stamps and the
+    changed rows are separate reads, so a task deleted or archived between
+    them is left out, as a read after the delete would.
+    """
+    params = {"owner_id": owner_id, "list_id": list_id}
+    key = (owner_id, list_id)
+    snapshot = fragments.snapshot(key, revision) if revision is not None else None
+    if snapshot is None:
+        rows = db.execute(TASK_STAMPS, params).all()
+        snapshot = ListSnapshot(
+            revision, tuple((row.id, (row.updated_at, row.position)) for row in rows)
+        )
+        # A session with its own uncommitted writes may roll them back
+        if revision is not None and not reads_are_private(db):
+            fragments.save_snapshot(key, snapshot)
+
+    found = fragments.lookup(snapshot.stamps, encoding)
+    missing = [
+        task_id for (task_id, _), fragment in zip(snapshot.stamps, found) if fragment is None
+    ]
+    if missing:
+        rows = db.scalars(TASKS_BY_ID, {**params, "task_ids": missing})
+        loaded = fragments.store(rows, encoding)
+        found = [
+            fragment if fragment is not None else loaded.get(task_id)
+            for (task_id, _), fragment in zip(snapshot.stamps, found)
+        ]
+    return encoding.join([fragment for fragment in found if fragment is not None])
+
+
+def list_tasks_response(
+    db: Session, owner_id: str, list_id: str, check: Optional[Callable[[], Any]] = None
+) -> Response:
+    """Encode a list's tasks, sharing the read with concurrent identical requests.
+
+    check, if given, runs first inside the shared read, e.g. to raise 404.
     """
-    return db.query(Task).order_by(Task.position.asc()).all()
 
+    encoding = response_encoding.get()
 
-@router.get("/{task_id}", response_model=TaskResponse)
-def get_task(task_id: str, db: Session = Depends(get_db)) -> Task:
-    """Get a single task by ID."""
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    return task
+    def encode(revision: Optional[int]) -> bytes:
+        if check is not None:
+            check()
+        return encode_tasks_in_list(db, owner_id, list_id, revision, encoding)
 
+    return coalesced(db, owner_id, ("list_tasks", list_id), encode, encoding=encoding)
 
-@router.post("/", status_code=status.HTTP_201_CREATED, response_model=TaskResponse)
-def create_task(task_data: TaskCreate, db: Session = Depends(get_db)) -> Task:
-    """Create a new task.
 
-    The task is assigned the next available position (appended to end of list).
+def next_position(db: Session, owner_id: str, list_id: str) -> int:
+    """Return the position after the owner's last task in a list."""
+    max_position = db.scalar(MAX_POSITION, {"owner_id": owner_id, "list_id": list_id})
+    return (max_position or 0) + 1
+
+
+def create_task_in_list(
+    db: Session, owner_id: str, list_id: str, task_data: TaskCreate
+) -> Task:
+    """Append a new task to an owner's list.
+
     Handles race conditions on concurrent inserts with retry logic.
     """
     max_retries = 3
     for attempt in range(max_retries):
         try:
-            # Calculate next position
-            max_position = db.query(func.max(Task.position)).scalar()
-            next_position = (max_position or 0) + 1
-
-            # Create task
             task = Task(
+                owner_id=owner_id,
+                list_id=list_id,
                 title=task_data.title,
                 description=task_data.description,
                 deadline=task_data.deadline,
-                position=next_position,
+                position=next_position(db, owner_id, list_id),
             )
             db.add(task)
             db.commit()
@@ -75,58 +244,21 @@ def create_task(task_data: TaskCreate, db: Session = Depends(get_db)) -> Task:
     raise HTTPException(status_code=500, detail="Unexpected error creating task")
 
 
-@router.patch("/{task_id}", response_model=TaskResponse)
-def update_task(
-    task_id: str, task_data: TaskUpdate, db: Session = Depends(get_db)
-) -> Task:
-    """Update an existing task.
-
-    Only provided fields are updated (partial update).
-    """
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-
-    # Update only provided fields (restricted to allowlist)
-    update_data = task_data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        if field in UPDATABLE_FIELDS:
-            setattr(task, field, value)
-
-    db.commit()
-    db.refresh(task)
-
-    return task
-
-
-@router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_task(task_id: str, db: Session = Depends(get_db)) -> None:
-    """Delete a task by ID."""
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-
-    db.delete(task)
-    db.commit()
-
-
-@router.put("/reorder", response_model=List[TaskResponse])
-def reorder_tasks(
-    reorder_data: ReorderRequest, db: Session = Depends(get_db)
+def reorder_list(
+    db: Session, owner_id: str, list_id: str, task_ids: List[str]
 ) -> List[Task]:
-    """Reorder tasks by providing the new order of task IDs.
+    """Renumber an owner's tasks in a list 1, 2, 3, ... in the given order.
 
-    All task IDs must be provided in the desired order.
-    Positions will be recalculated to be sequential (1, 2, 3, ...).
+    Every one of the owner's tasks in the list must be included, and no others.
     """
-    task_ids = reorder_data.task_ids
-
     # Check for duplicates
     if len(task_ids) != len(set(task_ids)):
         raise HTTPException(status_code=400, detail="Duplicate task IDs provided")
 
-    # Get total task count
-    total_tasks = db.query(func.count(Task.id)).scalar()
+    params = {"owner_id": owner_id, "list_id": list_id, "task_ids": task_ids}
+
+    # Get the owner's task count in the list
+    total_tasks = db.scalar(COUNT_IN_LIST, params)
 
     # Check that all tasks are included
     if len(task_ids) != total_tasks:
@@ -135,10 +267,10 @@ def reorder_tasks(
             detail="All tasks must be included in reorder request",
         )
 
-    # Fetch all tasks by IDs with row-level locking to prevent concurrent modifications
-    tasks = db.query(Task).filter(Task.id.in_(task_ids)).with_for_update().all()
+    # Fetch the tasks by IDs with row-level locking to prevent concurrent modifications
+    tasks = db.scalars(LOCK_TASKS_BY_ID, params).all()
 
-    # Verify all IDs exist
+    # Verify all IDs exist in this list
     if len(tasks) != len(task_ids):
         raise HTTPException(status_code=400, detail="One or more task IDs not found")
 
@@ -157,9 +289,431 @@ def reorder_tasks(
 
     db.commit()
 
+    # Reload the expired tasks with one query rather than a refresh per task
+    db.scalars(TASKS_BY_ID, params).all()
+
     # Return tasks in new order
-    result = [task_map[task_id] for task_id in task_ids]
-    for task in result:
-        db.refresh(task)
+    return [task_map[task_id] for task_id in task_ids]
 
+
+@router.get("/", response_model=List[TaskResponse])
+def list_tasks(
+    db: Session = Depends(get_db), owner_id: str = Depends(get_owner_id)
+) -> Response:
+    """Get the default list's tasks ordered by position.
+
+    Returns tasks sorted by position ascending. Concurrent identical
+    requests share one query and encoded body.
+    """
+    return list_tasks_response(db, owner_id, DEFAULT_LIST_ID)
+
+
+def parse_duration(value: str) -> timedelta:
+    """Parse a duration such as "90m", "36h" or "7d" (see DURATION_PATTERN)."""
+    return timedelta(seconds=int(value[:-1]) * DURATION_UNITS[value[-1]])
+
+
+@router.get("/due", response_model=List[TaskResponse])
+def list_due_tasks(
+    within: str = Query("7d", pattern=DURATION_PATTERN),
+    include_overdue: bool = Query(True),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    owner_id: str = Depends(get_owner_id),
+) -> Response:
+    """List incomplete tasks due within a duration from now, earliest deadline first.
+
+    Covers the owner's tasks in every list. Overdue tasks come first unless
+    include_overdue is false; tasks without a deadline are never included.
+    Deadlines are compared in UTC.
+    """
+    now = utcnow().replace(tzinfo=None)
+    params = {
+        "owner_id": owner_id,
+        "now": now,
+        "until": now + parse_duration(within),
+        "limit": limit,
+    }
+    statement = DUE_TASKS if include_overdue else UPCOMING_TASKS
+    return tasks_response(db.scalars(statement, params).all())
+
+
+def _export_value(value: Any) -> Any:
+    """Convert a column value to its JSON representation."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _csv_value(value: Any) -> Any:
+    """Convert a column value to its CSV representation."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return _export_value(value)
+
+
+def _format_rows(export_format: str, rows: Sequence[Sequence[Any]], first: bool) -> str:
+    """Render a batch of rows in the requested export format."""
+    if export_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        if first:
+            writer.writerow(EXPORT_COLUMNS)
+        writer.writerows([_csv_value(v) for v in row] for row in rows)
+        return buffer.getvalue()
+
+    records = (
+        json.dumps(dict(zip(EXPORT_COLUMNS, map(_export_value, row))), ensure_ascii=False)
+        for row in rows
+    )
+    if export_format == "ndjson":
+        return "".join(f"{record}\n" for record in records)
+    return ("" if first else ",") + ",".join(records)
+
+
+def _pack_rows(rows: Sequence[Sequence[Any]]) -> bytes:
+    """Render a batch of rows as a MessagePack stream of maps."""
+    return b"".join(pack(dict(zip(EXPORT_COLUMNS, row))) for row in rows)
+
+
+def export_chunks(
+    db: Session, owner_id: str, export_format: str, compress: bool = False
+) -> Iterator[bytes]:
+    """Yield the owner's default list in position order as encoded, optionally gzipped, chunks.
+
+    Rows are fetched in batches of EXPORT_BATCH_SIZE and written out as soon
+    as EXPORT_CHUNK_BYTES have accumulated, so memory use does not depend on
+    the number of tasks.
+    """
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    statement = (
+        select(*(getattr(Task, column) for column in EXPORT_COLUMNS))
+        .where(in_list(owner_id, DEFAULT_LIST_ID))
+        .order_by(Task.position.asc())
+        .execution_options(yield_per=EXPORT_BATCH_SIZE, stream_results=True)
+    )
+
+    def encode(data: Union[str, bytes]) -> bytes:
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        return compressor.compress(data) if compressor else data
+
+    pending: List[bytes] = []
+    pending_size = 0
+    first = True
+    if export_format == "json":
+        pending.append(encode("["))
+    if export_format == "csv":
+        # Header is written even when there are no rows
+        pending.append(encode(_format_rows("csv", [], first=True)))
+        first = False
+
+    for rows in db.execute(statement).partitions():
+        if export_format == "msgpack":
+            chunk = encode(_pack_rows(rows))
+        else:
+            chunk = encode(_format_rows(export_format, rows, first))
+        first = False
+        pending.append(chunk)
+        pending_size += len(chunk)
+        if pending_size >= EXPORT_CHUNK_BYTES:
+            yield b"".join(pending)
+            pending, pending_size = [], 0
+
+    if export_format == "json":
+        pending.append(encode("]"))
+    if compressor:
+        pending.append(compressor.flush())
+    yield b"".join(pending)
+
+
+@router.get("/export", response_class=StreamingResponse)
+def export_tasks(
+    format: Literal["csv", "ndjson", "json", "msgpack"] = Query("ndjson"),
+    gzip: bool = Query(False),
+    db: Session = Depends(get_db),
+    owner_id: str = Depends(get_owner_id),
+) -> StreamingResponse:
+    """Stream all tasks, ordered by position, as a CSV, NDJSON, JSON or MessagePack download.
+
+    MessagePack is a stream of one map per task, with datetimes as timestamp
+    extensions. With ``gzip`` set the stream is gzip-compressed and served
+    as a ``.gz`` file.
+    """
+    if format == "msgpack" and MSGPACK is None:
+        raise HTTPException(status_code=406, detail="MessagePack support is not installed")
+    filename = f"tasks.{format}"
+    media_type = EXPORT_MEDIA_TYPES[format]
+    if gzip:
+        filename += ".gz"
+        media_type = "application/gzip"
+
+    def stream() -> Iterator[bytes]:
+        # The response outlives the request dependency scope, so the
+        # generator owns closing the session once streaming finishes.
+        try:
+            yield from export_chunks(db, owner_id, format, compress=gzip)
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        stream(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def _iter_lines(read_chunk: Callable[[], Optional[bytes]]) -> Iterator[str]:
+    """Decode a chunked UTF-8 body into lines, keeping line endings.
+
+    Only the current partial line is buffered; a line longer than
+    IMPORT_MAX_LINE_CHARS aborts the import.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    while (chunk := read_chunk()) is not None:
+        pending += decoder.decode(chunk)
+        start = 0
+        while (end := pending.find("\n", start)) != -1:
+            yield pending[start : end + 1]
+            start = end + 1
+        pending = pending[start:]
+        if len(pending) > IMPORT_MAX_LINE_CHARS:
+            raise HTTPException(status_code=413, detail="Import line too long")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def _iter_records(lines: Iterator[str], import_format: str) -> Iterator[Tuple[int, Any]]:
+    """Yield (line number, raw record) pairs; malformed lines yield the exception."""
+    if import_format == "csv":
+        reader = csv.DictReader(lines)
+        try:
+            for row in reader:
+                # Empty CSV cells mean "not set" for the optional fields
+                yield reader.line_num, {k: v for k, v in row.items() if k and v != ""}
+        except csv.Error as exc:
+            raise HTTPException(
+                status_code=400, detail=f"Malformed CSV at line {reader.line_num}: {exc}"
+            )
+        return
+
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError as exc:
+            yield line_number, exc
+
+
+def _insert_chunk(db: Session, owner_id: str, tasks: List[TaskCreate]) -> None:
+    """Insert validated tasks in one transaction, appended to the end of the list.
+
+    Positions for the whole chunk are allocated from a single max(position)
+    read, with the same retry-on-conflict behaviour as create_task.
+    """
+    max_retries = 3
+    for attempt in range(max_retries):
+        try:
+            first = next_position(db, owner_id, DEFAULT_LIST_ID)
+            db.execute(
+                insert(Task),
+                [
+                    {
+                        **task.model_dump(),
+                        "owner_id": owner_id,
+                        "list_id": DEFAULT_LIST_ID,
+                        "position": first + offset,
+                    }
+                    for offset, task in enumerate(tasks)
+                ],
+            )
+            db.commit()
+            return
+        except IntegrityError:
+            db.rollback()
+            if attempt == max_retries - 1:
+                raise HTTPException(
+                    status_code=409,
+                    detail="Conflict: unable to assign positions. Please retry.",
+                )
+
+
+def import_records(
+    db: Session, owner_id: str, records: Iterator[Tuple[int, Any]]
+) -> ImportResult:
+    """Validate records against TaskCreate and insert them in chunks."""
+    result = ImportResult(imported=0, failed=0, errors=[])
+    chunk: List[TaskCreate] = []
+
+    def flush() -> None:
+        _insert_chunk(db, owner_id, chunk)
+        result.imported += len(chunk)
+        chunk.clear()
+        logger.info("Task import progress: %d imported, %d failed", result.imported, result.failed)
+
+    for line_number, record in records:
+        try:
+            if isinstance(record, Exception):
+                raise record
+            chunk.append(TaskCreate.model_validate(record))
+        except (ValueError, ValidationError) as exc:
+            result.failed += 1
+            if len(result.errors) < IMPORT_MAX_ERRORS:
+                if isinstance(exc, ValidationError):
+                    detail: Any = exc.errors(
+                        include_url=False, include_context=False, include_input=False
+                    )
+                else:
+                    detail = str(exc)
+                result.errors.append(ImportLineError(line=line_number, detail=detail))
+            continue
+
+        if len(chunk) >= IMPORT_CHUNK_SIZE:
+            flush()
+
+    if chunk:
+        flush()
     return result
+
+
+@router.post("/import", response_model=ImportResult)
+async def import_tasks(
+    request: Request,
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    db: Session = Depends(get_db),
+    owner_id: str = Depends(get_owner_id),
+) -> Response:
+    """Import tasks from an NDJSON, CSV or MessagePack request body.
+
+    The body is parsed as it arrives and valid tasks are appended to the end of
+    the list in chunks of IMPORT_CHUNK_SIZE, each in its own transaction.
+    Invalid lines are skipped and reported (up to IMPORT_MAX_ERRORS). A
+    MessagePack stream of task maps arrives as NDJSON (see ``app.negotiation``).
+    """
+    chunks = request.stream()
+
+    async def next_chunk() -> Optional[bytes]:
+        return await anext(chunks, None)
+
+    def read_chunk() -> Optional[bytes]:
+        return from_thread.run(next_chunk)
+
+    def run_import() -> ImportResult:
+        return import_records(db, owner_id, _iter_records(_iter_lines(read_chunk), format))
+
+    # Parsing and inserts block, so they run in a worker thread that pulls
+    # body chunks back from the event loop as it needs them.
+    return respond(IMPORT_RESULT_ADAPTER, await run_in_threadpool(run_import))
+
+
+@router.get("/archive", response_model=ArchivePage)
+def list_archived_tasks(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    db: Session = Depends(get_db),
+    owner_id: str = Depends(get_owner_id),
+) -> Response:
+    """List archived tasks, most recently archived first.
+
+    Pass the returned next_cursor to fetch the following page.
+    """
+    try:
+        items, next_cursor = archive_page(db, owner_id, limit, cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return respond(ARCHIVE_PAGE_ADAPTER, ArchivePage(items=items, next_cursor=next_cursor))
+
+
+@router.post("/archive", response_model=ArchiveResult)
+def archive_tasks(
+    archive_data: ArchiveRequest,
+    db: Session = Depends(get_db),
+    owner_id: str = Depends(get_owner_id),
+) -> Response:
+    """Move completed tasks out of the active list into the archive.
+
+    Archives completed tasks last updated at least older_than_days ago,
+    optionally restricted to task_ids. Incomplete tasks are never archived.
+    """
+    archived = archive_completed(
+        db, archive_data.older_than_days, archive_data.task_ids, owner_id=owner_id
+    )
+    return respond(ARCHIVE_RESULT_ADAPTER, ArchiveResult(archived=archived))
+
+
+@router.get("/{task_id}", response_model=TaskResponse)
+def get_task(
+    task_id: str, db: Session = Depends(get_db), owner_id: str = Depends(get_owner_id)
+) -> Response:
+    """Get a single task by ID."""
+    return task_response(get_owned_task(db, owner_id, task_id))
+
+
+@router.post("/", status_code=status.HTTP_201_CREATED, response_model=TaskResponse)
+def create_task(
+    task_data: TaskCreate,
+    db: Session = Depends(get_db),
+    owner_id: str = Depends(get_owner_id),
+) -> Response:
+    """Create a new task in the default list.
+
+    The task is assigned the next available position (appended to end of list).
+    """
+    task = create_task_in_list(db, owner_id, DEFAULT_LIST_ID, task_data)
+    return task_response(task, status.HTTP_201_CREATED)
+
+
+@router.patch("/{task_id}", response_model=TaskResponse)
+def update_task(
+    task_id: str,
+    task_data: TaskUpdate,
+    db: Session = Depends(get_db),
+    owner_id: str = Depends(get_owner_id),
+) -> Response:
+    """Update an existing task.
+
+    Only provided fields are updated (partial update).
+    """
+    task = get_owned_task(db, owner_id, task_id)
+
+    # Update only provided fields (restricted to allowlist)
+    update_data = task_data.model_dump(exclude_unset=True)
+    for field, value in update_data.items():
+        if field in UPDATABLE_FIELDS:
+            setattr(task, field, value)
+
+    db.commit()
+    db.refresh(task)
+
+    return task_response(task)
+
+
+@router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_task(
+    task_id: str, db: Session = Depends(get_db), owner_id: str = Depends(get_owner_id)
+) -> None:
+    """Delete a task by ID."""
+    task = get_owned_task(db, owner_id, task_id)
+
+    db.delete(task)
+    db.commit()
+    fragments.discard(task_id)
+
+
+@router.put("/reorder", response_model=List[TaskResponse])
+def reorder_tasks(
+    reorder_data: ReorderRequest,
+    db: Session = Depends(get_db),
+    owner_id: str = Depends(get_owner_id),
+) -> Response:
+    """Reorder the default list by providing the new order of task IDs.
+
+    All task IDs must be provided in the desired order.
+    Positions will be recalculated to be sequential (1, 2, 3, ...).
+    """
+    return tasks_response(reorder_list(db, owner_id, DEFAULT_LIST_ID, reorder_data.task_ids))
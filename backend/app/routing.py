@@ -0,0 +1,57 @@
+"""Route class that lets request-scoped instrumentation wrap endpoint calls.
+
+Middleware can register hooks for the current request in ``endpoint_hooks``;
+they are entered around the endpoint function itself, inside the worker
+thread for sync endpoints. With no hooks registered the only cost is a
+context variable lookup.
+"""
+
+import inspect
+from contextlib import ExitStack
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, ContextManager, Tuple
+
+from fastapi.routing import APIRoute
+
+EndpointHook = Callable[[], ContextManager[Any]]
+
+endpoint_hooks: ContextVar[Tuple[EndpointHook, ...]] = ContextVar(
+    "endpoint_hooks", default=()
+)
+
+
+def _wrap_endpoint(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap an endpoint so registered hooks run around each call."""
+    if inspect.iscoroutinefunction(endpoint):
+
+        @wraps(endpoint)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            hooks = endpoint_hooks.get()
+            if not hooks:
+                return await endpoint(*args, **kwargs)
+            with ExitStack() as stack:
+                for hook in hooks:
+                    stack.enter_context(hook())
+                return await endpoint(*args, **kwargs)
+
+        return async_wrapper
+
+    @wraps(endpoint)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        hooks = endpoint_hooks.get()
+        if not hooks:
+            return endpoint(*args, **kwargs)
+        with ExitStack() as stack:
+            for hook in hooks:
+                stack.enter_context(hook())
+            return endpoint(*args, **kwargs)
+
+    return wrapper
+
+
+class InstrumentedRoute(APIRoute):
+    """APIRoute whose endpoint runs inside any hooks registered for the request."""
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        super().__init__(path, _wrap_endpoint(endpoint), **kwargs)
@@ -1,11 +1,18 @@
 """Pydantic schemas for request/response validation."""
 
-from datetime import datetime
-from typing import List, Optional
+from datetime import datetime, timezone
+from typing import Any, List, Literal, Optional
 
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Convert an aware datetime to the naive UTC the database stores."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
 class TaskCreate(BaseModel):
     """Schema for creating a new task."""
 
@@ -21,6 +28,12 @@ class TaskCreate(BaseModel):
             raise ValueError("title cannot be blank")
         return v
 
+    @field_validator("deadline")
+    @classmethod
+    def deadline_in_utc(cls, v: Optional[datetime]) -> Optional[datetime]:
+        """Store deadlines given with an offset as naive UTC."""
+        return naive_utc(v)
+
 
 class TaskUpdate(BaseModel):
     """Schema for updating an existing task."""
@@ -39,6 +52,12 @@ class TaskUpdate(BaseModel):
             raise ValueError("title cannot be blank")
         return v
 
+    @field_validator("deadline")
+    @classmethod
+    def deadline_in_utc(cls, v: Optional[datetime]) -> Optional[datetime]:
+        """Store deadlines given with an offset as naive UTC."""
+        return naive_utc(v)
+
     @field_validator("position")
     @classmethod
     def position_must_be_positive(cls, v: Optional[int]) -> Optional[int]:
@@ -54,6 +73,7 @@ class TaskResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
     id: str
+    list_id: str
     title: str
     description: Optional[str]
     is_complete: bool
@@ -63,7 +83,115 @@ class TaskResponse(BaseModel):
     updated_at: datetime
 
 
+class TaskListCreate(BaseModel):
+    """Schema for creating a task list."""
+
+    name: str = Field(..., min_length=1, max_length=200)
+
+    @field_validator("name")
+    @classmethod
+    def name_not_whitespace(cls, v: str) -> str:
+        """Validate that name is not whitespace-only."""
+        if not v.strip():
+            raise ValueError("name cannot be blank")
+        return v
+
+
+class TaskListUpdate(TaskListCreate):
+    """Schema for renaming a task list."""
+
+
+class TaskListResponse(BaseModel):
+    """Schema for task list responses."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    name: str
+    created_at: datetime
+    updated_at: datetime
+
+
 class ReorderRequest(BaseModel):
     """Schema for reordering tasks."""
 
     task_ids: List[str] = Field(..., min_length=1)
+
+
+class BatchOperation(BaseModel):
+    """A single API call executed as part of a batch."""
+
+    method: Literal["GET", "POST", "PATCH", "PUT", "DELETE"]
+    path: str = Field(..., min_length=1)
+    body: Optional[Any] = None
+
+
+class BatchRequest(BaseModel):
+    """Schema for executing several operations in one request."""
+
+    operations: List[BatchOperation] = Field(..., min_length=1, max_length=1000)
+    atomic: bool = False
+
+
+class BatchResult(BaseModel):
+    """Outcome of a single batch operation."""
+
+    status: int
+    body: Optional[Any] = None
+
+
+class BatchResponse(BaseModel):
+    """Schema for batch responses."""
+
+    committed: bool
+    results: List[BatchResult]
+
+
+class ImportLineError(BaseModel):
+    """A rejected line from a task import."""
+
+    line: int
+    detail: Any
+
+
+class ImportResult(BaseModel):
+    """Summary of a task import."""
+
+    imported: int
+    failed: int
+    errors: List[ImportLineError]
+
+
+class ArchiveRequest(BaseModel):
+    """Schema for archiving completed tasks."""
+
+    older_than_days: float = Field(0, ge=0)
+    task_ids: Optional[List[str]] = Field(None, min_length=1, max_length=1000)
+
+
+class ArchiveResult(BaseModel):
+    """Summary of an archive run."""
+
+    archived: int
+
+
+class ArchivedTaskResponse(BaseModel):
+    """Schema for archived task responses."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    title: str
+    description: Optional[str]
+    is_complete: bool
+    deadline: Optional[datetime]
+    created_at: datetime
+    updated_at: datetime
+    archived_at: datetime
+
+
+class ArchivePage(BaseModel):
+    """A page of archived tasks, most recently archived first."""
+
+    items: List[ArchivedTaskResponse]
+    next_cursor: Optional[str]
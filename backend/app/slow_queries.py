@@ -0,0 +1,157 @@
+"""Slow statement log.
+
+When ``SLOW_QUERY_MS`` is set, every statement that takes longer is logged as
+one JSON object per line with its SQL, the shape (not the values) of its
+bound parameters, its duration and the route that issued it. On SQLite the
+``EXPLAIN QUERY PLAN`` output is attached the first time each distinct
+statement is seen. Lines go to ``SLOW_QUERY_LOG`` if set, otherwise to the
+``app.slow_queries`` logger.
+"""
+
+import json
+import logging
+import os
+import threading
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from time import perf_counter
+from typing import Any, Dict, List, Optional
+from weakref import WeakSet
+
+from sqlalchemy import Engine, event
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# Threshold in milliseconds; unset or empty disables the log
+SLOW_QUERY_MS = os.getenv("SLOW_QUERY_MS", "")
+SLOW_QUERY_LOG = os.getenv("SLOW_QUERY_LOG", "")
+
+# Distinct statements whose query plan is remembered
+PLAN_CACHE_SIZE = 1000
+
+# Statements worth asking SQLite for a plan
+EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+current_scope: ContextVar[Optional[Scope]] = ContextVar("slow_query_scope", default=None)
+
+_instrumented_engines: "WeakSet[Engine]" = WeakSet()
+_explained: Dict[str, bool] = {}
+_explained_lock = threading.Lock()
+
+
+def _type_name(value: Any) -> str:
+    return type(value).__name__
+
+
+def parameter_shape(parameters: Any, executemany: bool) -> Any:
+    """Describe bound parameters by type only, so values never reach the log."""
+    if executemany:
+        rows = list(parameters or [])
+        return {"rows": len(rows), "shape": parameter_shape(rows[0], False) if rows else None}
+    if isinstance(parameters, dict):
+        return {key: _type_name(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_type_name(value) for value in parameters]
+    return None
+
+
+def _route() -> Optional[str]:
+    """Return "METHOD /route/template" for the request being served, if any."""
+    scope = current_scope.get()
+    if scope is None:
+        return None
+    template = getattr(scope.get("route"), "path", scope["path"])
+    return f"{scope['method']} {template}"
+
+
+def _should_explain(statement: str) -> bool:
+    """Claim the first sighting of a statement for plan capture."""
+    with _explained_lock:
+        if statement in _explained:
+            return False
+        if len(_explained) >= PLAN_CACHE_SIZE:
+            _explained.pop(next(iter(_explained)))
+        _explained[statement] = True
+        return True
+
+
+def _query_plan(
+    dbapi_connection: Any, statement: str, parameters: Any, executemany: bool
+) -> List[str]:
+    """Run EXPLAIN QUERY PLAN on a separate cursor of the same connection."""
+    if executemany:
+        parameters = (list(parameters) or [()])[0]
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters or ())
+        return [row[-1] for row in cursor.fetchall()]
+    except Exception as exc:  # The plan is best effort; never fail the query
+        return [f"unavailable: {exc}"]
+    finally:
+        cursor.close()
+
+
+def instrument_engine(target: Engine, threshold_ms: float) -> None:
+    """Log statements slower than threshold_ms on an engine."""
+    if target in _instrumented_engines:
+        return
+    _instrumented_engines.add(target)
+    threshold = threshold_ms / 1000
+    explain = target.dialect.name == "sqlite"
+
+    # The start time lives on the statement's execution context rather than
+    # the connection: after_cursor_execute never fires for a statement that
+    # raises, and anything left on a pooled connection would outlive it
+    @event.listens_for(target, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany) -> None:
+        if context is not None:
+            context.slow_query_start = perf_counter()
+
+    @event.listens_for(target, "after_cursor_execute")
+    def _finish(conn, cursor, statement, parameters, context, executemany) -> None:
+        started = getattr(context, "slow_query_start", None)
+        if started is None:
+            return
+        elapsed = perf_counter() - started
+        if elapsed < threshold:
+            return
+
+        record: Dict[str, Any] = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "duration_ms": round(elapsed * 1000, 3),
+            "route": _route(),
+            "statement": statement,
+            "parameters": parameter_shape(parameters, executemany),
+        }
+        keyword = statement.lstrip()[:6].upper()
+        if explain and keyword.startswith(EXPLAINABLE) and _should_explain(statement):
+            record["plan"] = _query_plan(
+                conn.connection.dbapi_connection, statement, parameters, executemany
+            )
+        logger.warning(json.dumps(record))
+
+
+def configure_log_file(path: str) -> None:
+    """Write slow statement records, one JSON object per line, to path."""
+    handler = logging.FileHandler(path)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.propagate = False
+
+
+class SlowQueryMiddleware:
+    """ASGI middleware that makes the current request visible to the slow log."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = current_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_scope.reset(token)
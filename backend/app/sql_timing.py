@@ -0,0 +1,155 @@
+"""Per-request SQL instrumentation.
+
+When enabled with ``SQL_TIMING=1``, statements executed while serving a
+request are counted and timed through engine cursor events. The totals are
+returned in a ``Server-Timing`` header and a warning is logged when a route
+exceeds its statement budget or repeats the same statement often enough to
+suggest an N+1 query. When disabled nothing is registered.
+
+The header's ``serialize`` metric adds up the two places a response body is
+encoded: the handlers that encode their own bodies do it inside the endpoint,
+through ``app.responses`` encoders that report to ``encode_observer``; the
+others are serialised by FastAPI between the endpoint returning and the
+response starting.
+"""
+
+import logging
+import os
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Iterator, List, Optional
+from weakref import WeakSet
+
+from sqlalchemy import Engine, event
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .responses import encode_observer
+from .routing import endpoint_hooks
+
+logger = logging.getLogger(__name__)
+
+SQL_TIMING_ENABLED = os.getenv("SQL_TIMING", "").lower() in ("1", "true", "yes")
+
+# Statements per request before a warning is logged
+SQL_STATEMENT_BUDGET = int(os.getenv("SQL_STATEMENT_BUDGET", "10"))
+
+# Executions of one statement within a request that suggest an N+1 query
+SQL_REPEAT_THRESHOLD = int(os.getenv("SQL_REPEAT_THRESHOLD", "5"))
+
+
+@dataclass
+class RequestStats:
+    """SQL totals for one request."""
+
+    count: int = 0
+    duration: float = 0.0
+    encoding: float = 0.0
+    endpoint_finished: Optional[float] = None
+    statements: Counter = field(default_factory=Counter)
+    _starts: List[float] = field(default_factory=list)
+
+    @contextmanager
+    def track_endpoint(self) -> Iterator[None]:
+        """Record when the endpoint returns; the rest is serialisation."""
+        try:
+            yield
+        finally:
+            self.endpoint_finished = perf_counter()
+
+    def add_encoding(self, seconds: float) -> None:
+        """Count time spent encoding a body inside the endpoint."""
+        self.encoding += seconds
+
+    def server_timing(self, response_started: float) -> str:
+        """Format the totals as a Server-Timing header value."""
+        metrics = [f"db;dur={self.duration * 1000:.3f}", f"db-count;desc={self.count}"]
+        if self.endpoint_finished is not None:
+            serialize = (self.encoding + response_started - self.endpoint_finished) * 1000
+            metrics.append(f"serialize;dur={serialize:.3f}")
+        return ", ".join(metrics)
+
+
+current_stats: ContextVar[Optional[RequestStats]] = ContextVar(
+    "sql_request_stats", default=None
+)
+
+_instrumented_engines: "WeakSet[Engine]" = WeakSet()
+
+
+def instrument_engine(target: Engine) -> None:
+    """Time statements on an engine for the current request. Safe to call twice."""
+    if target in _instrumented_engines:
+        return
+    _instrumented_engines.add(target)
+
+    @event.listens_for(target, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany) -> None:
+        stats = current_stats.get()
+        if stats is not None:
+            stats._starts.append(perf_counter())
+
+    @event.listens_for(target, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany) -> None:
+        stats = current_stats.get()
+        if stats is not None and stats._starts:
+            stats.duration += perf_counter() - stats._starts.pop()
+            stats.count += 1
+            stats.statements[statement] += 1
+
+
+def _check_budget(scope: Scope, stats: RequestStats) -> None:
+    """Log a warning for requests over budget or with repeated statements."""
+    route = getattr(scope.get("route"), "path", scope["path"])
+    if stats.count > SQL_STATEMENT_BUDGET:
+        logger.warning(
+            "%s %s executed %d SQL statements (budget %d)",
+            scope["method"],
+            route,
+            stats.count,
+            SQL_STATEMENT_BUDGET,
+        )
+    if stats.statements:
+        statement, repeats = stats.statements.most_common(1)[0]
+        if repeats >= SQL_REPEAT_THRESHOLD:
+            logger.warning(
+                "Possible N+1 query in %s %s: statement executed %d times: %s",
+                scope["method"],
+                route,
+                repeats,
+                " ".join(statement.split()),
+            )
+
+
+class ServerTimingMiddleware:
+    """ASGI middleware that collects SQL stats and adds a Server-Timing header."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", stats.server_timing(perf_counter()))
+            await send(message)
+
+        stats_token = current_stats.set(stats)
+        hooks_token = endpoint_hooks.set(endpoint_hooks.get() + (stats.track_endpoint,))
+        observer_token = encode_observer.set(stats.add_encoding)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            encode_observer.reset(observer_token)
+            endpoint_hooks.reset(hooks_token)
+            current_stats.reset(stats_token)
+            _check_budget(scope, stats)
@@ -0,0 +1,5 @@
+"""Performance benchmarks for the Task Manager API.
+
+Run from the backend directory:
+    python -m benchmarks.run --help
+"""
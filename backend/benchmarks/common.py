@@ -0,0 +1,148 @@
+"""Shared helpers for benchmarks: seeding, statement counting and reporting."""
+
+import json
+import platform
+import statistics
+import subprocess
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import Engine, create_engine, event, insert
+from sqlalchemy.engine.interfaces import CacheStats
+
+from app.database import Base, enable_sqlite_transactions
+from app.models import Task, utcnow
+
+SEED_BATCH_SIZE = 10_000
+
+
+def create_file_engine(path: Path) -> Engine:
+    """Create an engine for a file-backed SQLite database, configured like the app."""
+    engine = create_engine(
+        f"sqlite:///{path}",
+        pool_pre_ping=True,
+        connect_args={"check_same_thread": False},
+    )
+    enable_sqlite_transactions(engine)
+    return engine
+
+
+def seed_database(engine: Engine, count: int) -> None:
+    """Create the schema and insert count tasks in position order."""
+    Base.metadata.create_all(engine)
+    now = utcnow()
+    with engine.begin() as conn:
+        for start in range(0, count, SEED_BATCH_SIZE):
+            conn.execute(
+                insert(Task),
+                [
+                    {
+                        "id": str(uuid.uuid4()),
+                        "title": f"Task {i}",
+                        "description": f"Benchmark task number {i}",
+                        "is_complete": i % 3 == 0,
+                        "position": i + 1,
+                        # Half the tasks are due, spread over 30 days either side of now
+                        "deadline": now + timedelta(hours=i % 1440 - 720) if i % 2 else None,
+                        "created_at": now,
+                        "updated_at": now,
+                    }
+                    for i in range(start, min(start + SEED_BATCH_SIZE, count))
+                ],
+            )
+
+
+class StatementCounter:
+    """Counts statements executed on an engine and their compiled cache lookups.
+
+    Textual SQL such as BEGIN has no cache key and is not a lookup.
+    """
+
+    def __init__(self, engine: Engine) -> None:
+        self.count = 0
+        self.cache_lookups = 0
+        self.cache_hits = 0
+        event.listen(engine, "before_cursor_execute", self._increment)
+
+    def _increment(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.count += 1
+        if context is None:
+            return
+        if context.cache_hit in (CacheStats.CACHE_HIT, CacheStats.CACHE_MISS):
+            self.cache_lookups += 1
+        if context.cache_hit is CacheStats.CACHE_HIT:
+            self.cache_hits += 1
+
+
+def summarise(samples: List[float], statements: Optional[float] = None) -> Dict[str, Any]:
+    """Return latency percentiles in milliseconds for a list of durations in seconds."""
+    millis = sorted(sample * 1000 for sample in samples)
+    if len(millis) > 1:
+        cuts = statistics.quantiles(millis, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = millis[0]
+    summary = {
+        "iterations": len(millis),
+        "mean_ms": round(statistics.fmean(millis), 3),
+        "p50_ms": round(p50, 3),
+        "p95_ms": round(p95, 3),
+        "p99_ms": round(p99, 3),
+    }
+    if statements is not None:
+        summary["statements"] = round(statements, 2)
+    return summary
+
+
+def git_commit() -> Optional[str]:
+    """Return the current git commit, if available."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata() -> Dict[str, Any]:
+    """Describe the environment a benchmark ran in."""
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+
+def save_results(path: Path, results: Dict[str, Any]) -> None:
+    """Write benchmark results as JSON."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+
+
+def compare(
+    baseline: Dict[str, Any], current: Dict[str, Any], metric: str = "p50_ms"
+) -> List[Dict[str, Any]]:
+    """Compare two result sets, returning one row per operation present in both."""
+    rows = []
+    for mode, sizes in current["results"].items():
+        for size, operations in sizes.items():
+            for operation, summary in operations.items():
+                before = baseline["results"].get(mode, {}).get(size, {}).get(operation)
+                if not before or not before.get(metric):
+                    continue
+                change = (summary[metric] - before[metric]) / before[metric]
+                rows.append(
+                    {
+                        "mode": mode,
+                        "size": size,
+                        "operation": operation,
+                        "before": before[metric],
+                        "after": summary[metric],
+                        "change": change,
+                    }
+                )
+    return rows
@@ -0,0 +1,109 @@
+"""Compare JSON and MessagePack task list responses.
+
+Encodes a list of tasks the way ``GET /api/v1/tasks/`` does, once as JSON
+and once as MessagePack, and reports the payload size (raw and gzipped) and
+encode and decode latency for each. Decoding uses what a Python client
+would: ``json.loads`` and ``msgpack.unpackb`` with timestamps as datetimes.
+
+Usage:
+    python -m benchmarks.encodings --rows 10000
+"""
+
+import argparse
+import gzip
+import json
+import sys
+import time
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from pydantic import TypeAdapter
+
+from app.models import DEFAULT_LIST_ID, Task, utcnow
+from app.responses import JSON, MSGPACK, Encoding, msgpack
+from app.schemas import TaskResponse
+
+from .common import summarise
+
+ADAPTER = TypeAdapter(List[TaskResponse])
+
+
+def make_tasks(rows: int) -> List[Task]:
+    """Unsaved tasks shaped like a typical list: half with descriptions and deadlines."""
+    now = utcnow()
+    return [
+        Task(
+            id=f"{i:08x}-0000-4000-8000-000000000000",
+            owner_id="anonymous",
+            list_id=DEFAULT_LIST_ID,
+            title=f"Task {i}",
+            description=f"Notes for task {i}" if i % 2 else None,
+            is_complete=i % 3 == 0,
+            position=i + 1,
+            deadline=now + timedelta(days=i % 30) if i % 2 else None,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(rows)
+    ]
+
+
+def _time(fn: Callable[[], Any], repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _decoder(encoding: Encoding) -> Callable[[bytes], Any]:
+    if encoding is JSON:
+        return json.loads
+    return lambda body: msgpack.unpackb(body, timestamp=3)
+
+
+def measure(rows: int, repeat: int) -> Dict[str, Dict[str, Any]]:
+    """Encode and decode the same tasks in every available encoding."""
+    tasks = make_tasks(rows)
+    results: Dict[str, Dict[str, Any]] = {}
+    for encoding in (JSON, MSGPACK):
+        if encoding is None:
+            continue
+        body = encoding.encode(ADAPTER, tasks)
+        decode = _decoder(encoding)
+        results[encoding.name] = {
+            "bytes": len(body),
+            "gzip_bytes": len(gzip.compress(body, compresslevel=6)),
+            "encode": summarise(_time(lambda: encoding.encode(ADAPTER, tasks), repeat)),
+            "decode": summarise(_time(lambda: decode(body), repeat)),
+        }
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.encodings", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    if msgpack is None:
+        print("msgpack is not installed; only JSON is measured", file=sys.stderr)
+    print(
+        f"{'encoding':<8} {'KiB':>8} {'gzip KiB':>9} {'enc p50':>8} {'enc p99':>8} "
+        f"{'dec p50':>8} {'dec p99':>8}"
+    )
+    for name, r in measure(args.rows, args.repeat).items():
+        print(
+            f"{name:<8} {r['bytes'] / 1024:>8.1f} {r['gzip_bytes'] / 1024:>9.1f} "
+            f"{r['encode']['p50_ms']:>8.2f} {r['encode']['p99_ms']:>8.2f} "
+            f"{r['decode']['p50_ms']:>8.2f} {r['decode']['p99_ms']:>8.2f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
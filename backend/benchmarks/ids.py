@@ -0,0 +1,146 @@
+"""Compare task ID storage modes at scale.
+
+For each combination of storage (text or binary) and ID version (UUIDv4 or
+UUIDv7), builds a tasks table with the given number of rows and reports
+insert time, database and primary key index size, and lookup latency for
+single IDs and for 1,000-ID ``IN`` lists like the ones reorder sends.
+
+Usage:
+    python -m benchmarks.ids --rows 1000000
+"""
+
+import argparse
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import MetaData, func, insert, select
+
+from app.ids import id_type, uuid7
+from app.models import DEFAULT_LIST_ID, Task, TaskList, utcnow
+
+from .common import create_file_engine, summarise
+
+INSERT_BATCH_SIZE = 10_000
+IN_LIST_SIZE = 1_000
+MODES = [("text", "4"), ("text", "7"), ("binary", "4"), ("binary", "7")]
+
+
+def _index_bytes(path: Path, table: str) -> Optional[int]:
+    """Return the size of a table's primary key index, if dbstat is available."""
+    conn = sqlite3.connect(path)
+    try:
+        # The primary key's implicit index is the table's first autoindex
+        index = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ? "
+            "AND name LIKE 'sqlite_autoindex_%' ORDER BY name LIMIT 1",
+            (table,),
+        ).fetchone()
+        if index is None:
+            return None
+        return conn.execute(
+            "SELECT sum(pgsize) FROM dbstat WHERE name = ?", (index[0],)
+        ).fetchone()[0]
+    except sqlite3.OperationalError:
+        return None
+    finally:
+        conn.close()
+
+
+def measure(path: Path, rows: int, storage: str, version: str, lookups: int) -> Dict[str, Any]:
+    """Build one table and measure it."""
+    metadata = MetaData()
+    # Referenced by the tasks table's foreign key; not created
+    TaskList.__table__.to_metadata(metadata)
+    table = Task.__table__.to_metadata(metadata)
+    table.c.id.type = table.c.list_id.type = id_type(storage)
+    engine = create_file_engine(path)
+    table.create(engine)
+    generate = uuid7 if version == "7" else uuid.uuid4
+    now = utcnow()
+    ids: List[str] = []
+
+    start = time.perf_counter()
+    with engine.begin() as conn:
+        for offset in range(0, rows, INSERT_BATCH_SIZE):
+            batch = []
+            for i in range(offset, min(offset + INSERT_BATCH_SIZE, rows)):
+                task_id = str(generate())
+                ids.append(task_id)
+                batch.append(
+                    {
+                        "id": task_id,
+                        "list_id": DEFAULT_LIST_ID,
+                        "title": f"Task {i}",
+                        "is_complete": False,
+                        "position": i + 1,
+                        "created_at": now,
+                        "updated_at": now,
+                    }
+                )
+            conn.execute(insert(table), batch)
+    insert_seconds = time.perf_counter() - start
+
+    rng = random.Random(0)
+    single: List[float] = []
+    in_list: List[float] = []
+    with engine.connect() as conn:
+        for _ in range(lookups):
+            task_id = rng.choice(ids)
+            t = time.perf_counter()
+            conn.execute(select(table.c.title).where(table.c.id == task_id)).scalar()
+            single.append(time.perf_counter() - t)
+        for _ in range(max(1, lookups // 100)):
+            chosen = rng.sample(ids, min(IN_LIST_SIZE, len(ids)))
+            t = time.perf_counter()
+            conn.execute(select(func.count()).where(table.c.id.in_(chosen))).scalar()
+            in_list.append(time.perf_counter() - t)
+    engine.dispose()
+
+    return {
+        "storage": storage,
+        "version": version,
+        "insert_seconds": round(insert_seconds, 2),
+        "database_bytes": path.stat().st_size,
+        "pk_index_bytes": _index_bytes(path, table.name),
+        "get_by_id": summarise(single),
+        "in_list_1000": summarise(in_list),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.ids", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=2_000)
+    args = parser.parse_args(argv)
+
+    print(
+        f"{'storage':<8} {'uuid':>4} {'insert s':>9} {'db MiB':>8} {'pk MiB':>8} "
+        f"{'get p50':>8} {'get p99':>8} {'IN p50':>8}"
+    )
+    with tempfile.TemporaryDirectory(prefix="task-ids-") as workdir:
+        for storage, version in MODES:
+            path = Path(workdir) / f"{storage}-v{version}.db"
+            r = measure(path, args.rows, storage, version, args.lookups)
+            pk = r["pk_index_bytes"]
+            print(
+                f"{storage:<8} {'v' + version:>4} {r['insert_seconds']:>9.2f} "
+                f"{r['database_bytes'] / 2**20:>8.1f} "
+                f"{(pk / 2**20 if pk is not None else float('nan')):>8.1f} "
+                f"{r['get_by_id']['p50_ms']:>8.3f} {r['get_by_id']['p99_ms']:>8.3f} "
+                f"{r['in_list_1000']['p50_ms']:>8.3f}"
+            )
+            path.unlink()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,344 @@
+"""Open-loop load generator for a running backend.
+
+Requests arrive as a Poisson process at a target rate that ramps linearly
+through a series of stages, independent of how quickly the server answers,
+so queueing shows up as latency instead of silently lowering the load.
+Latency is measured from each request's scheduled start. Every stage prints
+per-operation throughput, percentiles and error rates, including conflicts
+(409) and SQLite lock errors, followed by latency histograms for the run.
+
+Usage:
+    python -m benchmarks.loadgen --url http://localhost:8000 \\
+        --stages 30s:10 60s:50 60s:100 30s:0 \\
+        --mix list=40,get=30,create=10,toggle=10,move=5,reorder=5
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from .common import metadata, summarise
+
+OPERATIONS = ("list", "get", "create", "toggle", "move", "reorder")
+DEFAULT_MIX = "list=40,get=30,create=10,toggle=10,move=5,reorder=5"
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+HISTOGRAM_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+LOCKED_MESSAGE = "database is locked"
+
+
+@dataclass
+class Stage:
+    """Ramp the arrival rate linearly to rate over duration seconds."""
+
+    duration: float
+    rate: float
+
+
+def parse_stage(spec: str) -> Stage:
+    """Parse "30s:50" (or "2m:50", "30:50") into a stage."""
+    duration, _, rate = spec.partition(":")
+    if not rate:
+        raise argparse.ArgumentTypeError(f"stage {spec!r} must be DURATION:RATE")
+    multiplier = 60 if duration.endswith("m") else 1
+    try:
+        return Stage(float(duration.rstrip("sm")) * multiplier, float(rate))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid stage {spec!r}")
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """Parse "list=40,get=30" into operation weights."""
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"unknown operation {name!r}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+@dataclass
+class OperationStats:
+    """Outcomes and latencies of one operation."""
+
+    latencies: List[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    locked: int = 0
+    transport_errors: int = 0
+
+    @property
+    def count(self) -> int:
+        """Number of completed requests."""
+        return len(self.latencies)
+
+    def histogram(self) -> List[int]:
+        """Count latencies per bucket; the last bucket is everything slower."""
+        buckets = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+        for latency in self.latencies:
+            ms = latency * 1000
+            index = next(
+                (i for i, bound in enumerate(HISTOGRAM_BOUNDS_MS) if ms <= bound),
+                len(HISTOGRAM_BOUNDS_MS),
+            )
+            buckets[index] += 1
+        return buckets
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        """Summarise throughput, latency and error rates."""
+        count = self.count
+        summary = summarise(self.latencies) if count else {"iterations": 0}
+        errors = sum(n for status, n in self.statuses.items() if status >= 400)
+        summary.update(
+            {
+                "throughput": round(count / elapsed, 2) if elapsed else 0.0,
+                "statuses": {str(status): n for status, n in sorted(self.statuses.items())},
+                "error_rate": round((errors + self.transport_errors) / count, 4) if count else 0,
+                "conflict_rate": round(self.statuses[409] / count, 4) if count else 0,
+                "locked_rate": round(self.locked / count, 4) if count else 0,
+                "transport_errors": self.transport_errors,
+                "histogram_ms": dict(
+                    zip([str(b) for b in HISTOGRAM_BOUNDS_MS] + ["inf"], self.histogram())
+                ),
+            }
+        )
+        return summary
+
+
+class Workload:
+    """Issues the mixed operations against the tasks API."""
+
+    def __init__(self, client: httpx.AsyncClient, rng: random.Random) -> None:
+        self.client = client
+        self.rng = rng
+        self.task_ids: List[str] = []
+
+    async def prepare(self, seed: int) -> None:
+        """Load existing task IDs, creating seed tasks if there are none."""
+        response = await self.client.get("/api/v1/tasks/")
+        response.raise_for_status()
+        self.task_ids = [task["id"] for task in response.json()]
+        for i in range(max(0, seed - len(self.task_ids))):
+            created = await self.client.post("/api/v1/tasks/", json={"title": f"Load {i}"})
+            created.raise_for_status()
+            self.task_ids.append(created.json()["id"])
+
+    def _random_id(self) -> str:
+        return self.rng.choice(self.task_ids) if self.task_ids else "missing"
+
+    async def _current_order(self) -> List[str]:
+        response = await self.client.get("/api/v1/tasks/")
+        response.raise_for_status()
+        return [task["id"] for task in response.json()]
+
+    async def list(self) -> httpx.Response:
+        return await self.client.get("/api/v1/tasks/")
+
+    async def get(self) -> httpx.Response:
+        return await self.client.get(f"/api/v1/tasks/{self._random_id()}")
+
+    async def create(self) -> httpx.Response:
+        response = await self.client.post(
+            "/api/v1/tasks/", json={"title": f"Load {self.rng.getrandbits(32):08x}"}
+        )
+        if response.status_code == 201:
+            self.task_ids.append(response.json()["id"])
+        return response
+
+    async def toggle(self) -> httpx.Response:
+        return await self.client.patch(
+            f"/api/v1/tasks/{self._random_id()}",
+            json={"is_complete": self.rng.random() < 0.5},
+        )
+
+    async def move(self) -> httpx.Response:
+        """Drag one task to a new place, as the frontend does."""
+        order = await self._current_order()
+        if order:
+            order.insert(self.rng.randrange(len(order)), order.pop(self.rng.randrange(len(order))))
+        return await self.client.put("/api/v1/tasks/reorder", json={"task_ids": order})
+
+    async def reorder(self) -> httpx.Response:
+        """Shuffle the whole list."""
+        order = await self._current_order()
+        self.rng.shuffle(order)
+        return await self.client.put("/api/v1/tasks/reorder", json={"task_ids": order})
+
+
+class LoadGenerator:
+    """Drives a workload through ramp stages with Poisson arrivals."""
+
+    def __init__(
+        self,
+        workload: Workload,
+        mix: Dict[str, float],
+        max_in_flight: int,
+        rng: random.Random,
+    ) -> None:
+        self.workload = workload
+        self.operations = list(mix)
+        self.weights = list(mix.values())
+        self.max_in_flight = max_in_flight
+        self.rng = rng
+        self.in_flight = 0
+
+    async def _issue(self, operation: str, scheduled: float, stats: OperationStats) -> None:
+        call: Callable[[], Awaitable[httpx.Response]] = getattr(self.workload, operation)
+        try:
+            response = await call()
+        except httpx.HTTPError:
+            stats.transport_errors += 1
+        else:
+            stats.statuses[response.status_code] += 1
+            if response.status_code >= 500 and LOCKED_MESSAGE in response.text.lower():
+                stats.locked += 1
+        finally:
+            stats.latencies.append(time.perf_counter() - scheduled)
+            self.in_flight -= 1
+
+    async def run_stage(self, stage: Stage, start_rate: float) -> Dict[str, Any]:
+        """Run one stage and return its per-operation report."""
+        stats = {operation: OperationStats() for operation in self.operations}
+        pending: "set[asyncio.Task[None]]" = set()
+        dropped = 0
+        began = time.perf_counter()
+        scheduled = began
+        while True:
+            progress = (scheduled - began) / stage.duration if stage.duration else 1.0
+            if progress >= 1.0:
+                break
+            rate = start_rate + (stage.rate - start_rate) * progress
+            if rate <= 0:
+                scheduled += 0.01
+            else:
+                scheduled += self.rng.expovariate(rate)
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if rate <= 0 or scheduled - began >= stage.duration:
+                continue
+            if self.in_flight >= self.max_in_flight:
+                dropped += 1
+                continue
+            operation = self.rng.choices(self.operations, self.weights)[0]
+            self.in_flight += 1
+            task = asyncio.create_task(self._issue(operation, scheduled, stats[operation]))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        if pending:
+            await asyncio.gather(*pending)
+        elapsed = time.perf_counter() - began
+        return {
+            "duration": stage.duration,
+            "start_rate": start_rate,
+            "end_rate": stage.rate,
+            "dropped": dropped,
+            "operations": {
+                operation: operation_stats.report(elapsed)
+                for operation, operation_stats in stats.items()
+            },
+        }
+
+
+def print_stage(index: int, report: Dict[str, Any]) -> None:
+    """Print a stage report as a table."""
+    print(
+        f"\nStage {index}: {report['start_rate']:g} -> {report['end_rate']:g} req/s "
+        f"over {report['duration']:g}s (dropped {report['dropped']})"
+    )
+    print(
+        f"{'operation':<9} {'count':>7} {'req/s':>8} {'p50':>9} {'p95':>9} {'p99':>9} "
+        f"{'err%':>6} {'409%':>6} {'lock%':>6}"
+    )
+    for operation, s in report["operations"].items():
+        if not s["iterations"]:
+            continue
+        print(
+            f"{operation:<9} {s['iterations']:>7} {s['throughput']:>8.2f} "
+            f"{s['p50_ms']:>9.2f} {s['p95_ms']:>9.2f} {s['p99_ms']:>9.2f} "
+            f"{s['error_rate']:>6.1%} {s['conflict_rate']:>6.1%} {s['locked_rate']:>6.1%}"
+        )
+
+
+def print_histograms(stages: List[Dict[str, Any]]) -> None:
+    """Print run-wide latency histograms per operation."""
+    print("\nLatency histograms (ms, whole run):")
+    totals: Dict[str, Counter] = {}
+    for stage in stages:
+        for operation, s in stage["operations"].items():
+            totals.setdefault(operation, Counter()).update(s.get("histogram_ms", {}))
+    for operation, buckets in totals.items():
+        count = sum(buckets.values())
+        if not count:
+            continue
+        print(f"  {operation} ({count})")
+        for bound in [str(b) for b in HISTOGRAM_BOUNDS_MS] + ["inf"]:
+            n = buckets[bound]
+            if n:
+                bar = "#" * max(1, round(40 * n / count))
+                print(f"    <= {bound:>5}: {n:>7} {bar}")
+
+
+async def generate(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run every stage against the target server."""
+    rng = random.Random(args.random_seed)
+    limits = httpx.Limits(max_connections=args.connections)
+    async with httpx.AsyncClient(
+        base_url=args.url, limits=limits, timeout=args.timeout
+    ) as client:
+        workload = Workload(client, rng)
+        await workload.prepare(args.seed)
+        generator = LoadGenerator(workload, args.mix, args.max_in_flight, rng)
+        reports = []
+        rate = 0.0
+        for index, stage in enumerate(args.stages, start=1):
+            report = await generator.run_stage(stage, rate)
+            print_stage(index, report)
+            reports.append(report)
+            rate = stage.rate
+    print_histograms(reports)
+    return {"meta": {**metadata(), "url": args.url, "mix": args.mix}, "stages": reports}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.loadgen", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument(
+        "--stages", type=parse_stage, nargs="+", default=[parse_stage("30s:20")],
+        help="DURATION:RATE stages; the rate ramps linearly from the previous stage",
+    )
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX))
+    parser.add_argument("--connections", type=int, default=100, help="HTTP connection limit")
+    parser.add_argument(
+        "--max-in-flight", type=int, default=1000,
+        help="arrivals beyond this many outstanding requests are dropped and counted",
+    )
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=100, help="minimum number of tasks")
+    parser.add_argument("--random-seed", type=int, default=None)
+    parser.add_argument("--output", type=Path, help="write the full report as JSON")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(generate(args))
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"\nReport written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""Measure the CPU cost of building hot router statements per call.
+
+The tasks router executes prebuilt statements with bound parameters. For
+each one, this times executing the prebuilt statement against building the
+same statement afresh on every call, which is what a ``db.query(...)`` chain
+does, and reports the CPU time per call and the compiled cache hit rate.
+The difference is the statement construction and cache key generation
+saved on every request.
+
+Usage:
+    python -m benchmarks.queries --rows 100 --calls 5000
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import bindparam, false, func, select
+from sqlalchemy.orm import Session
+
+from app.models import ANONYMOUS_OWNER, DEFAULT_LIST_ID, Task, utcnow
+from app.routers import tasks
+
+from .common import StatementCounter, create_file_engine, seed_database
+
+Params = Dict[str, Any]
+
+
+def _adhoc_get(p: Params) -> Any:
+    return select(Task).where(Task.id == p["task_id"], Task.owner_id == p["owner_id"])
+
+
+def _adhoc_stamps(p: Params) -> Any:
+    return (
+        select(Task.id, Task.updated_at, Task.position)
+        .where(Task.owner_id == p["owner_id"], Task.list_id == p["list_id"])
+        .order_by(Task.position.asc())
+    )
+
+
+def _adhoc_max(p: Params) -> Any:
+    return select(func.max(Task.position)).where(
+        Task.owner_id == p["owner_id"], Task.list_id == p["list_id"]
+    )
+
+
+def _adhoc_by_id(p: Params) -> Any:
+    return select(Task).where(
+        Task.owner_id == p["owner_id"],
+        Task.list_id == p["list_id"],
+        Task.id.in_(bindparam("task_ids", p["task_ids"], expanding=True)),
+    )
+
+
+def _adhoc_due(p: Params) -> Any:
+    return (
+        select(Task)
+        .where(
+            Task.owner_id == p["owner_id"],
+            Task.is_complete == false(),
+            Task.deadline < p["until"],
+        )
+        .order_by(Task.deadline.asc(), Task.id.asc())
+        .limit(p["limit"])
+    )
+
+
+# name -> (statement built per call, prebuilt statement)
+STATEMENTS: Dict[str, tuple] = {
+    "get_task": (_adhoc_get, tasks.OWNED_TASK),
+    "task_stamps": (_adhoc_stamps, tasks.TASK_STAMPS),
+    "max_position": (_adhoc_max, tasks.MAX_POSITION),
+    "tasks_by_id": (_adhoc_by_id, tasks.TASKS_BY_ID),
+    "due_tasks": (_adhoc_due, tasks.DUE_TASKS),
+}
+
+
+def _time_calls(
+    db: Session, counter: StatementCounter, calls: int, execute: Callable[[], Any]
+) -> Dict[str, float]:
+    for _ in range(min(calls, 200)):
+        execute()
+    lookups, hits = counter.cache_lookups, counter.cache_hits
+    start = time.process_time()
+    for _ in range(calls):
+        execute()
+        db.expunge_all()
+    elapsed = time.process_time() - start
+    lookups = counter.cache_lookups - lookups
+    return {
+        "cpu_us": round(elapsed / calls * 1e6, 1),
+        "cache_hit_rate": round((counter.cache_hits - hits) / lookups, 3) if lookups else 0.0,
+    }
+
+
+def measure(path: Path, rows: int, calls: int) -> Dict[str, Dict[str, Any]]:
+    """Time every hot statement both ways against a seeded database."""
+    engine = create_file_engine(path)
+    seed_database(engine, rows)
+    counter = StatementCounter(engine)
+    results = {}
+    with Session(engine) as db:
+        ids = list(db.scalars(select(Task.id).order_by(Task.position).limit(20)))
+        params = {
+            "task_id": ids[0],
+            "owner_id": ANONYMOUS_OWNER,
+            "list_id": DEFAULT_LIST_ID,
+            "task_ids": ids,
+            "until": utcnow().replace(tzinfo=None) + timedelta(days=7),
+            "limit": 100,
+        }
+        for name, (build, prebuilt) in STATEMENTS.items():
+            adhoc = _time_calls(
+                db, counter, calls, lambda: db.execute(build(params)).all()
+            )
+            cached = _time_calls(
+                db, counter, calls, lambda: db.execute(prebuilt, params).all()
+            )
+            results[name] = {
+                "adhoc": adhoc,
+                "prebuilt": cached,
+                "saving": round(1 - cached["cpu_us"] / adhoc["cpu_us"], 3),
+            }
+    engine.dispose()
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.queries", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--calls", type=int, default=5_000)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="task-queries-") as workdir:
+        results = measure(Path(workdir) / "tasks.db", args.rows, args.calls)
+
+    print(f"{'statement':<14} {'ad hoc us':>10} {'prebuilt us':>12} {'saving':>7} {'hit rate':>9}")
+    for name, r in results.items():
+        print(
+            f"{name:<14} {r['adhoc']['cpu_us']:>10.1f} {r['prebuilt']['cpu_us']:>12.1f} "
+            f"{r['saving']:>7.1%} {r['prebuilt']['cache_hit_rate']:>9.3f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
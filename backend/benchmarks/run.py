@@ -0,0 +1,296 @@
+"""Benchmark the tasks API at several table sizes.
+
+Seeds a file-backed SQLite database per size, then times each tasks router
+operation either in process (through the ASGI app with a test client) or
+against a local uvicorn server. Results are p50/p95/p99 latency and SQL
+statements per operation and, in process, mean CPU time per request and the
+share of statements served from the compiled SQL cache. They are written as
+JSON so that runs from different commits can be compared.
+
+Usage:
+    python -m benchmarks.run --sizes 1000 10000 --modes inprocess
+    python -m benchmarks.run --baseline benchmarks/results/abc1234.json
+    python -m benchmarks.run --baseline old.json --metric cpu_ms --modes inprocess
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from app.database import get_db
+from app.main import app
+
+from .common import (
+    StatementCounter,
+    compare,
+    create_file_engine,
+    metadata,
+    save_results,
+    seed_database,
+    summarise,
+)
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+
+# Timed calls per operation. Operations are run in this order: reorder runs
+# before create so it sees the seeded set, and each delete removes a task
+# created just for it.
+DEFAULT_ITERATIONS = {
+    "list_tasks": 20,
+    "get_task": 200,
+    "due_tasks": 200,
+    "update_task": 200,
+    "reorder_tasks": 5,
+    "create_task": 200,
+    "delete_task": 200,
+}
+
+Request = Callable[[], httpx.Response]
+
+# Per-request measurements besides latency, such as "statements" or "cpu_ms"
+Measurements = Dict[str, float]
+
+
+class Target:
+    """An HTTP client plus a way to measure what happened behind a request."""
+
+    def __init__(
+        self, client: Any, timed: Callable[[Request], Tuple[httpx.Response, Measurements]]
+    ) -> None:
+        self.client = client
+        self.timed = timed
+
+
+def _prepare(target: Target, operation: str, ids: List[str], i: int) -> Request:
+    """Do any untimed setup for one call and return the timed request."""
+    client = target.client
+    task_id = ids[(i * 7919) % len(ids)]
+    if operation == "list_tasks":
+        return lambda: client.get("/api/v1/tasks/")
+    if operation == "get_task":
+        return lambda: client.get(f"/api/v1/tasks/{task_id}")
+    if operation == "due_tasks":
+        return lambda: client.get("/api/v1/tasks/due?within=7d")
+    if operation == "update_task":
+        return lambda: client.patch(f"/api/v1/tasks/{task_id}", json={"is_complete": i % 2 == 0})
+    if operation == "reorder_tasks":
+        order = ids if i % 2 else list(reversed(ids))
+        return lambda: client.put("/api/v1/tasks/reorder", json={"task_ids": order})
+    if operation == "create_task":
+        return lambda: client.post("/api/v1/tasks/", json={"title": f"Benchmark {i}"})
+    if operation == "delete_task":
+        created = client.post("/api/v1/tasks/", json={"title": f"Doomed {i}"}).json()["id"]
+        return lambda: client.delete(f"/api/v1/tasks/{created}")
+    raise ValueError(f"Unknown operation {operation}")
+
+
+def benchmark_target(target: Target, iterations: Dict[str, int]) -> Dict[str, Any]:
+    """Time every operation against a target."""
+    ids = [task["id"] for task in target.client.get("/api/v1/tasks/").json()]
+    results = {}
+    for operation, count in iterations.items():
+        samples: List[float] = []
+        totals: Dict[str, float] = {}
+        for i in range(count):
+            request = _prepare(target, operation, ids, i)
+            start = time.perf_counter()
+            response, measured = target.timed(request)
+            samples.append(time.perf_counter() - start)
+            response.raise_for_status()
+            for name, value in measured.items():
+                totals[name] = totals.get(name, 0) + value
+        statements = totals.pop("statements", None)
+        summary = summarise(samples, statements / count if statements is not None else None)
+        if "cpu_ms" in totals:
+            summary["cpu_ms"] = round(totals["cpu_ms"] / count, 3)
+        if totals.get("cache_lookups"):
+            summary["cache_hit_rate"] = round(totals["cache_hits"] / totals["cache_lookups"], 3)
+        results[operation] = summary
+    return results
+
+
+@contextlib.contextmanager
+def inprocess_target(db_path: Path) -> Iterator[Target]:
+    """Serve the app in process against the seeded database."""
+    engine = create_file_engine(db_path)
+    sessions = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    counter = StatementCounter(engine)
+
+    def override_get_db():
+        db = sessions()
+        try:
+            yield db
+        finally:
+            db.rollback()
+            db.close()
+
+    def timed(request: Request):
+        before = (counter.count, counter.cache_lookups, counter.cache_hits)
+        # Process time covers the test client's server thread too
+        cpu = time.process_time()
+        response = request()
+        return response, {
+            "cpu_ms": (time.process_time() - cpu) * 1000,
+            "statements": counter.count - before[0],
+            "cache_lookups": counter.cache_lookups - before[1],
+            "cache_hits": counter.cache_hits - before[2],
+        }
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        yield Target(TestClient(app), timed)
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        engine.dispose()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _statements_from_header(response: httpx.Response) -> Optional[int]:
+    """Read the statement count from the Server-Timing header."""
+    for entry in response.headers.get("server-timing", "").split(","):
+        name, _, params = entry.strip().partition(";")
+        if name == "db-count":
+            return int(params.partition("=")[2])
+    return None
+
+
+@contextlib.contextmanager
+def uvicorn_target(db_path: Path) -> Iterator[Target]:
+    """Serve the app with a local uvicorn process against the seeded database."""
+    port = _free_port()
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{db_path}", "SQL_TIMING": "1"}
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--port", str(port), "--log-level", "warning",
+        ],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    client = httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=120)
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                client.get("/health").raise_for_status()
+                break
+            except httpx.TransportError:
+                if time.monotonic() > deadline or server.poll() is not None:
+                    raise RuntimeError("uvicorn did not start")
+                time.sleep(0.1)
+
+        def timed(request: Request):
+            response = request()
+            statements = _statements_from_header(response)
+            return response, {} if statements is None else {"statements": statements}
+
+        yield Target(client, timed)
+    finally:
+        client.close()
+        server.terminate()
+        server.wait(timeout=10)
+
+
+TARGETS = {"inprocess": inprocess_target, "uvicorn": uvicorn_target}
+
+
+def run(sizes: List[int], modes: List[str], scale: float) -> Dict[str, Any]:
+    """Seed and benchmark every size in every mode."""
+    iterations = {op: max(1, round(n * scale)) for op, n in DEFAULT_ITERATIONS.items()}
+    results: Dict[str, Any] = {mode: {} for mode in modes}
+    with tempfile.TemporaryDirectory(prefix="task-bench-") as workdir:
+        for size in sizes:
+            for mode in modes:
+                db_path = Path(workdir) / f"tasks-{mode}-{size}.db"
+                engine = create_file_engine(db_path)
+                seed_database(engine, size)
+                engine.dispose()
+                print(f"Benchmarking {mode} at {size} tasks...", file=sys.stderr)
+                with TARGETS[mode](db_path) as target:
+                    results[mode][str(size)] = benchmark_target(target, iterations)
+    return {"meta": metadata(), "results": results}
+
+
+def print_results(results: Dict[str, Any]) -> None:
+    """Print results as a table."""
+    print(
+        f"{'mode':<10} {'size':>7} {'operation':<14} "
+        f"{'p50':>9} {'p95':>9} {'p99':>9} {'stmts':>6} {'cpu':>8} {'cached':>7}"
+    )
+    for mode, sizes in results["results"].items():
+        for size, operations in sizes.items():
+            for operation, s in operations.items():
+                print(
+                    f"{mode:<10} {size:>7} {operation:<14} {s['p50_ms']:>9.3f} "
+                    f"{s['p95_ms']:>9.3f} {s['p99_ms']:>9.3f} {s.get('statements', '-'):>6} "
+                    f"{s.get('cpu_ms', '-'):>8} {s.get('cache_hit_rate', '-'):>7}"
+                )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.run", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--modes", nargs="+", choices=sorted(TARGETS), default=sorted(TARGETS))
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="multiply the default iteration counts"
+    )
+    parser.add_argument("--output", type=Path, help="results file (default: results/<commit>.json)")
+    parser.add_argument("--baseline", type=Path, help="results file to compare against")
+    parser.add_argument(
+        "--metric", choices=("p50_ms", "p95_ms", "p99_ms", "mean_ms", "cpu_ms"),
+        default="p50_ms", help="metric compared against the baseline",
+    )
+    parser.add_argument(
+        "--max-regression", type=float, default=0.2,
+        help="fail if the metric is worse than the baseline by more than this fraction",
+    )
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.modes, args.scale)
+    output = args.output or RESULTS_DIR / f"{results['meta']['commit'] or 'latest'}.json"
+    save_results(output, results)
+    print_results(results)
+    print(f"\nResults written to {output}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        regressions = 0
+        print(f"\nCompared with {args.baseline} ({args.metric}):")
+        for row in compare(baseline, results, args.metric):
+            flag = ""
+            if row["change"] > args.max_regression:
+                flag = "  REGRESSION"
+                regressions += 1
+            print(
+                f"{row['mode']:<10} {row['size']:>7} {row['operation']:<14} "
+                f"{row['before']:>9.3f} -> {row['after']:>9.3f} ({row['change']:+.1%}){flag}"
+            )
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
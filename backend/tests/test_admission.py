@@ -0,0 +1,131 @@
+"""Tests for admission control."""
+
+import asyncio
+
+import httpx
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.admission import AdmissionMiddleware, Limiter
+from app.metrics import ADMISSION_SHED
+
+
+def make_app(release: asyncio.Event, **settings) -> AdmissionMiddleware:
+    """An app whose task routes block until release is set."""
+
+    async def blocked(request):
+        await release.wait()
+        return PlainTextResponse("done")
+
+    async def health(request):
+        return PlainTextResponse("ok")
+
+    app = Starlette(
+        routes=[
+            Route("/api/v1/tasks/", blocked, methods=["GET", "POST"]),
+            Route("/health", health),
+        ]
+    )
+    return AdmissionMiddleware(app, **settings)
+
+
+async def _send_all(app, requests, release: asyncio.Event, wait: float = 0.05):
+    """Send requests concurrently, release the app after wait, return responses."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        pending = [asyncio.create_task(client.request(*request)) for request in requests]
+        await asyncio.sleep(wait)
+        release.set()
+        return await asyncio.gather(*pending)
+
+
+def run(app_settings, requests, wait=0.05):
+    """Run requests against a fresh blocking app with the given settings."""
+
+    async def main():
+        release = asyncio.Event()
+        app = make_app(release, **app_settings)
+        return await _send_all(app, requests, release, wait)
+
+    return asyncio.run(main())
+
+
+class TestAdmissionMiddleware:
+    """Tests for AdmissionMiddleware."""
+
+    def test_queued_requests_are_admitted_in_turn(self):
+        """Requests within the queue bound wait and then succeed."""
+        responses = run(
+            {"read_limit": 1, "queue_size": 5, "queue_timeout_ms": 5000},
+            [("GET", "/api/v1/tasks/")] * 3,
+        )
+
+        assert [r.status_code for r in responses] == [200, 200, 200]
+
+    def test_full_queue_is_shed_with_retry_after(self):
+        """Requests beyond the budget and queue fail fast with 503."""
+        before = ADMISSION_SHED.labels("read", "queue_full").get()
+
+        responses = run(
+            {"read_limit": 1, "queue_size": 1, "queue_timeout_ms": 5000, "retry_after": 2},
+            [("GET", "/api/v1/tasks/")] * 4,
+        )
+
+        statuses = sorted(r.status_code for r in responses)
+        assert statuses == [200, 200, 503, 503]
+        rejected = next(r for r in responses if r.status_code == 503)
+        assert rejected.headers["retry-after"] == "2"
+        assert rejected.json() == {"detail": "Server busy, retry later"}
+        assert ADMISSION_SHED.labels("read", "queue_full").get() == before + 2
+
+    def test_deadline_sheds_waiting_request(self):
+        """A request that waits longer than the deadline gets 503."""
+        responses = run(
+            {"write_limit": 1, "queue_size": 5, "queue_timeout_ms": 10},
+            [("POST", "/api/v1/tasks/")] * 2,
+            wait=0.2,
+        )
+
+        assert sorted(r.status_code for r in responses) == [200, 503]
+
+    def test_reads_and_writes_have_separate_budgets(self):
+        """A busy write budget does not hold up reads."""
+        responses = run(
+            {"read_limit": 1, "write_limit": 1, "queue_size": 0},
+            [("POST", "/api/v1/tasks/"), ("GET", "/api/v1/tasks/")],
+        )
+
+        assert [r.status_code for r in responses] == [200, 200]
+
+    def test_other_paths_bypass_admission(self):
+        """Routes outside the database-bound prefixes are never limited."""
+        responses = run(
+            {"read_limit": 1, "queue_size": 0},
+            [("GET", "/api/v1/tasks/"), ("GET", "/health"), ("GET", "/health")],
+        )
+
+        assert [r.status_code for r in responses] == [200, 200, 200]
+
+
+class TestLimiter:
+    """Tests for Limiter slot accounting."""
+
+    def test_slots_are_returned(self):
+        """Releasing every slot leaves the limiter idle."""
+
+        async def main():
+            limiter = Limiter("test", limit=1, queue_size=2, timeout=1)
+            assert await limiter.acquire() is None
+            waiter = asyncio.create_task(limiter.acquire())
+            await asyncio.sleep(0)
+            assert len(limiter.waiters) == 1
+            limiter.release()
+            assert await waiter is None
+            limiter.release()
+            return limiter
+
+        limiter = asyncio.run(main())
+
+        assert limiter.active == 0
+        assert not limiter.waiters
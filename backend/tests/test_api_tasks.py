@@ -14,11 +14,15 @@ Covers TS0001 test cases:
 - TC027: Confirmed deletion removes task via API
 """
 
+import sqlite3
 import uuid
 
 from fastapi.testclient import TestClient
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
 
+from app.database import get_db
+from app.main import app
 from app.models import Task
 
 
@@ -485,3 +489,24 @@ class TestHealthCheck:
         response = client.get("/health")
 
         assert response.json() == {"status": "healthy"}
+
+
+class TestDatabaseLocked:
+    """Tests for SQLite lock contention handling."""
+
+    def test_locked_database_returns_503(self, client: TestClient, sample_task: Task):
+        """A locked database is reported as a retryable 503."""
+
+        class LockedSession:
+            def scalars(self, *args):
+                raise OperationalError(
+                    "SELECT", {}, sqlite3.OperationalError("database is locked")
+                )
+
+        app.dependency_overrides[get_db] = lambda: LockedSession()
+
+        response = client.get(f"/api/v1/tasks/{sample_task.id}")
+
+        assert response.status_code == 503
+        assert response.json() == {"detail": "Database is locked"}
+        assert response.headers["retry-after"] == "1"
@@ -0,0 +1,172 @@
+"""Tests for the archive tier."""
+
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.archive import archive_completed, sweep
+from app.models import ArchivedTask, Task
+
+from .conftest import TestingSessionLocal
+
+
+def add_tasks(db: Session, count: int, complete: bool = True, age_days: float = 0) -> list:
+    """Add tasks after any existing ones, last updated age_days ago."""
+    start = max((position for (position,) in db.query(Task.position)), default=0)
+    updated = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=age_days)
+    tasks = [
+        Task(
+            title=f"Task {start + i}",
+            position=start + i,
+            is_complete=complete,
+            created_at=updated,
+            updated_at=updated,
+        )
+        for i in range(1, count + 1)
+    ]
+    db.add_all(tasks)
+    db.flush()
+    ids = [task.id for task in tasks]
+    db.commit()
+    return ids
+
+
+class TestArchiveTasks:
+    """Tests for POST /api/v1/tasks/archive."""
+
+    def test_archives_only_completed_tasks(self, client: TestClient, db_session: Session):
+        """Completed tasks move to the archive; active tasks stay listed."""
+        add_tasks(db_session, 3, complete=True)
+        active = add_tasks(db_session, 2, complete=False)
+
+        response = client.post("/api/v1/tasks/archive", json={})
+
+        assert response.status_code == 200
+        assert response.json() == {"archived": 3}
+        listed = [task["id"] for task in client.get("/api/v1/tasks/").json()]
+        assert listed == active
+        assert db_session.query(ArchivedTask).count() == 3
+
+    def test_respects_age_threshold(self, client: TestClient, db_session: Session):
+        """Only tasks last updated before the threshold are archived."""
+        old = add_tasks(db_session, 2, age_days=10)
+        add_tasks(db_session, 2, age_days=1)
+
+        response = client.post("/api/v1/tasks/archive", json={"older_than_days": 7})
+
+        assert response.json() == {"archived": 2}
+        archived = {task.id for task in db_session.query(ArchivedTask).all()}
+        assert archived == set(old)
+
+    def test_restricted_to_task_ids(self, client: TestClient, db_session: Session):
+        """With task_ids, other completed tasks are left in place."""
+        ids = add_tasks(db_session, 3)
+        incomplete = add_tasks(db_session, 1, complete=False)
+
+        response = client.post(
+            "/api/v1/tasks/archive", json={"task_ids": [ids[0], incomplete[0]]}
+        )
+
+        assert response.json() == {"archived": 1}
+        assert db_session.query(Task).count() == 3
+
+    def test_archived_task_keeps_its_fields(self, client: TestClient, completed_task: Task):
+        """The archived copy matches the task as it was."""
+        original = client.get(f"/api/v1/tasks/{completed_task.id}").json()
+
+        client.post("/api/v1/tasks/archive", json={})
+
+        assert client.get(f"/api/v1/tasks/{completed_task.id}").status_code == 404
+        item = client.get("/api/v1/tasks/archive").json()["items"][0]
+        for field in ("id", "title", "description", "is_complete", "created_at", "updated_at"):
+            assert item[field] == original[field]
+        assert item["archived_at"]
+
+    def test_archives_in_batches(self, db_session: Session):
+        """Large archives are moved in several transactions."""
+        add_tasks(db_session, 25)
+
+        assert archive_completed(db_session, batch_size=10) == 25
+        assert db_session.query(Task).count() == 0
+
+    def test_task_changed_after_selection_is_kept(self, db_session: Session):
+        """A task un-completed after the batch is chosen is neither archived nor deleted."""
+        ids = add_tasks(db_session, 3)
+        engine = db_session.get_bind()
+        pending = [ids[1]]
+
+        def uncomplete_first(conn, cursor, statement, *args):
+            if statement.lstrip().upper().startswith("INSERT INTO ARCHIVED_TASKS") and pending:
+                other = conn.connection.dbapi_connection
+                other.execute("UPDATE tasks SET is_complete = 0 WHERE id = ?", (pending.pop(),))
+                other.commit()
+
+        event.listen(engine, "before_cursor_execute", uncomplete_first)
+        try:
+            archived = archive_completed(db_session)
+        finally:
+            event.remove(engine, "before_cursor_execute", uncomplete_first)
+
+        assert archived == 2
+        assert [task.id for task in db_session.query(Task)] == [ids[1]]
+        assert {task.id for task in db_session.query(ArchivedTask)} == {ids[0], ids[2]}
+
+
+class TestListArchivedTasks:
+    """Tests for GET /api/v1/tasks/archive."""
+
+    def test_empty_archive(self, client: TestClient):
+        """An empty archive returns no items and no cursor."""
+        response = client.get("/api/v1/tasks/archive")
+
+        assert response.status_code == 200
+        assert response.json() == {"items": [], "next_cursor": None}
+
+    def test_paginates_with_cursor(self, client: TestClient, db_session: Session):
+        """Following next_cursor visits every archived task exactly once."""
+        ids = add_tasks(db_session, 7)
+        archive_completed(db_session, batch_size=3)
+
+        seen = []
+        cursor = None
+        pages = 0
+        while True:
+            params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+            page = client.get("/api/v1/tasks/archive", params=params).json()
+            seen.extend(item["id"] for item in page["items"])
+            pages += 1
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        assert pages == 3
+        assert sorted(seen) == sorted(ids)
+        assert len(seen) == len(set(seen))
+
+    def test_invalid_cursor_rejected(self, client: TestClient):
+        """A malformed cursor is a 400."""
+        response = client.get("/api/v1/tasks/archive", params={"cursor": "nope"})
+
+        assert response.status_code == 400
+
+    def test_limit_validated(self, client: TestClient):
+        """Page size is bounded."""
+        response = client.get("/api/v1/tasks/archive", params={"limit": 0})
+
+        assert response.status_code == 422
+
+
+class TestSweeper:
+    """Tests for the background sweep."""
+
+    def test_sweep_archives_old_completed_tasks(self, db_session: Session):
+        """A sweep archives completed tasks past the configured age."""
+        add_tasks(db_session, 2, age_days=40)
+        add_tasks(db_session, 1, age_days=1)
+        add_tasks(db_session, 1, complete=False, age_days=40)
+
+        assert sweep(TestingSessionLocal, 30) == 2
+        assert sweep(TestingSessionLocal, 30) == 0
+        assert db_session.query(Task).count() == 2
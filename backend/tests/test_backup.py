@@ -0,0 +1,154 @@
+"""Tests for online SQLite snapshots and restores.
+
+Covers:
+- Plain and compressed snapshots of a file-backed database
+- Pausing between backup steps and giving up on a database that keeps changing
+- Restoring into a database that is still open elsewhere
+- Rejecting corrupt snapshots and non-file databases
+"""
+
+import gzip
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from app import backup
+from app.backup import (
+    BackupRestartsExceeded,
+    create_snapshot,
+    database_path,
+    default_snapshot_path,
+    restore_snapshot,
+)
+
+
+@pytest.fixture
+def live_db(tmp_path: Path) -> Path:
+    """Create a file-backed database with a few rows."""
+    path = tmp_path / "tasks.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE tasks (id INTEGER PRIMARY KEY, title TEXT)")
+    conn.executemany("INSERT INTO tasks (title) VALUES (?)", [(f"Task {i}",) for i in range(500)])
+    conn.commit()
+    conn.close()
+    return path
+
+
+def _titles(path: Path) -> list:
+    """Return all task titles in a database."""
+    conn = sqlite3.connect(path)
+    try:
+        return [row[0] for row in conn.execute("SELECT title FROM tasks ORDER BY id")]
+    finally:
+        conn.close()
+
+
+class TestSnapshot:
+    """Tests for create_snapshot."""
+
+    def test_snapshot_copies_database(self, live_db: Path, tmp_path: Path):
+        """A plain snapshot is a readable copy of the database."""
+        dest = create_snapshot(live_db, tmp_path / "backups" / "snap.db", pages=4)
+
+        assert _titles(dest) == _titles(live_db)
+        assert list(dest.parent.iterdir()) == [dest]
+
+    def test_compressed_snapshot_is_gzip(self, live_db: Path, tmp_path: Path):
+        """A compressed snapshot decompresses to a SQLite database."""
+        dest = create_snapshot(live_db, tmp_path / "snap.db.gz", compress=True)
+
+        assert gzip.decompress(dest.read_bytes()).startswith(b"SQLite format 3")
+        assert not list(tmp_path.glob(".*"))
+
+    def test_pauses_between_steps_and_survives_a_few_writes(
+        self, live_db: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ):
+        """Writers get a turn between steps; the restarted copy includes their rows."""
+        writer = sqlite3.connect(live_db, isolation_level=None)
+        pauses = []
+
+        def write_during_pause(seconds: float) -> None:
+            pauses.append(seconds)
+            if len(pauses) <= 2:
+                writer.execute("INSERT INTO tasks (title) VALUES (?)", (f"Written {len(pauses)}",))
+
+        monkeypatch.setattr(backup.time, "sleep", write_during_pause)
+        try:
+            dest = create_snapshot(live_db, tmp_path / "snap.db", pages=2, sleep=0.01)
+        finally:
+            writer.close()
+
+        assert set(pauses) == {0.01}
+        assert _titles(dest)[-2:] == ["Written 1", "Written 2"]
+
+    def test_gives_up_after_max_restarts(
+        self, live_db: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ):
+        """A source written between every step fails with a clear error and no snapshot."""
+        writer = sqlite3.connect(live_db, isolation_level=None)
+        monkeypatch.setattr(
+            backup.time,
+            "sleep",
+            lambda seconds: writer.execute("INSERT INTO tasks (title) VALUES ('busy')"),
+        )
+        try:
+            with pytest.raises(BackupRestartsExceeded, match="restarted 4 times"):
+                create_snapshot(live_db, tmp_path / "snap.db", pages=2, max_restarts=3)
+        finally:
+            writer.close()
+
+        assert list(tmp_path.iterdir()) == [live_db]
+
+    def test_default_snapshot_path(self, live_db: Path):
+        """Default snapshots are timestamped in a backups directory."""
+        path = default_snapshot_path(live_db, compress=True)
+
+        assert path.parent == live_db.parent / "backups"
+        assert path.name.startswith("tasks-")
+        assert path.name.endswith(".db.gz")
+
+
+class TestRestore:
+    """Tests for restore_snapshot."""
+
+    @pytest.mark.parametrize("compress", [False, True])
+    def test_restore_replaces_contents(self, live_db: Path, tmp_path: Path, compress: bool):
+        """Restoring brings back the snapshot contents."""
+        snapshot = create_snapshot(live_db, tmp_path / "snap", compress=compress)
+        expected = _titles(live_db)
+
+        # Keep a connection open, as a running worker would
+        conn = sqlite3.connect(live_db)
+        conn.execute("DELETE FROM tasks")
+        conn.commit()
+
+        restore_snapshot(snapshot, live_db)
+
+        assert [row[0] for row in conn.execute("SELECT title FROM tasks ORDER BY id")] == expected
+        conn.close()
+
+    def test_restore_rejects_corrupt_snapshot(self, live_db: Path, tmp_path: Path):
+        """A snapshot that is not a valid database leaves the live one untouched."""
+        bad = tmp_path / "bad.db"
+        bad.write_bytes(b"not a database" * 100)
+        expected = _titles(live_db)
+
+        with pytest.raises(sqlite3.DatabaseError):
+            restore_snapshot(bad, live_db)
+
+        assert _titles(live_db) == expected
+
+
+class TestDatabasePath:
+    """Tests for resolving the database file from its URL."""
+
+    def test_database_path_from_url(self):
+        """The file path is taken from the SQLite URL."""
+        assert database_path("sqlite:///./data/tasks.db") == Path("./data/tasks.db")
+
+    @pytest.mark.parametrize("url", ["sqlite:///:memory:", "postgresql://localhost/tasks"])
+    def test_database_path_rejects_non_file_databases(self, url: str):
+        """Only file-backed SQLite databases can be snapshotted."""
+        with pytest.raises(ValueError):
+            database_path(url)
@@ -0,0 +1,194 @@
+"""API tests for the batch endpoint.
+
+Covers:
+- Operations are dispatched to the tasks router handlers in order
+- Per-operation status codes and bodies are returned
+- Routes a batch cannot call are rejected by name
+- Independent mode commits successful operations only
+- Atomic mode rolls back everything on the first failure
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.models import Task
+
+
+class TestBatchDispatch:
+    """Tests for POST /api/v1/batch operation dispatch."""
+
+    def test_batch_runs_operations_in_order(self, client: TestClient):
+        """Later operations see the effects of earlier ones."""
+        response = client.post(
+            "/api/v1/batch",
+            json={
+                "operations": [
+                    {"method": "POST", "path": "/api/v1/tasks/", "body": {"title": "First"}},
+                    {"method": "POST", "path": "/api/v1/tasks/", "body": {"title": "Second"}},
+                    {"method": "GET", "path": "/api/v1/tasks/"},
+                ]
+            },
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["committed"] is True
+        assert [r["status"] for r in data["results"]] == [201, 201, 200]
+        assert [t["title"] for t in data["results"][2]["body"]] == ["First", "Second"]
+        assert [t["position"] for t in data["results"][2]["body"]] == [1, 2]
+
+    def test_batch_update_delete_and_reorder(
+        self, client: TestClient, multiple_tasks: list[Task]
+    ):
+        """PATCH, DELETE and PUT reorder map onto the existing handlers."""
+        first, second, third = (task.id for task in multiple_tasks)
+        response = client.post(
+            "/api/v1/batch",
+            json={
+                "operations": [
+                    {
+                        "method": "PATCH",
+                        "path": f"/api/v1/tasks/{first}",
+                        "body": {"is_complete": True},
+                    },
+                    {"method": "DELETE", "path": f"/api/v1/tasks/{second}"},
+                    {
+                        "method": "PUT",
+                        "path": "/api/v1/tasks/reorder",
+                        "body": {"task_ids": [third, first]},
+                    },
+                ]
+            },
+        )
+
+        results = response.json()["results"]
+        assert [r["status"] for r in results] == [200, 204, 200]
+        assert results[0]["body"]["is_complete"] is True
+        assert results[1]["body"] is None
+        assert [t["id"] for t in results[2]["body"]] == [third, first]
+
+        listed = client.get("/api/v1/tasks/").json()
+        assert [t["id"] for t in listed] == [third, first]
+
+    def test_batch_unknown_path_returns_404_result(self, client: TestClient):
+        """Operations that match no route report 404."""
+        response = client.post(
+            "/api/v1/batch",
+            json={"operations": [{"method": "GET", "path": "/api/v1/unknown"}]},
+        )
+
+        assert response.json()["results"][0]["status"] == 404
+
+    @pytest.mark.parametrize(
+        "method, path",
+        [
+            ("GET", "/api/v1/tasks/due"),
+            ("GET", "/api/v1/tasks/archive"),
+            ("GET", "/api/v1/tasks/export"),
+        ],
+    )
+    def test_batch_unbatchable_route_returns_400_result(
+        self, client: TestClient, method: str, path: str
+    ):
+        """Routes a batch cannot call are named, not mistaken for a task ID."""
+        response = client.post(
+            "/api/v1/batch", json={"operations": [{"method": method, "path": path}]}
+        )
+
+        result = response.json()["results"][0]
+        assert result["status"] == 400
+        assert result["body"] == {"detail": f"{method} {path} cannot be used in a batch"}
+
+    def test_batch_invalid_body_returns_422_result(self, client: TestClient):
+        """Operation bodies are validated against the handler schema."""
+        response = client.post(
+            "/api/v1/batch",
+            json={
+                "operations": [
+                    {"method": "POST", "path": "/api/v1/tasks/", "body": {"title": "   "}}
+                ]
+            },
+        )
+
+        result = response.json()["results"][0]
+        assert result["status"] == 422
+        assert result["body"]["detail"][0]["loc"] == ["title"]
+
+    def test_batch_empty_operations_rejected(self, client: TestClient):
+        """A batch must contain at least one operation."""
+        response = client.post("/api/v1/batch", json={"operations": []})
+
+        assert response.status_code == 422
+
+
+class TestBatchTransactions:
+    """Tests for independent and atomic batch execution."""
+
+    def test_independent_mode_commits_successful_operations(
+        self, client: TestClient, db_session: Session
+    ):
+        """A failed operation does not undo the others."""
+        response = client.post(
+            "/api/v1/batch",
+            json={
+                "operations": [
+                    {"method": "POST", "path": "/api/v1/tasks/", "body": {"title": "Kept"}},
+                    {"method": "DELETE", "path": "/api/v1/tasks/missing"},
+                    {"method": "POST", "path": "/api/v1/tasks/", "body": {"title": "Also kept"}},
+                ]
+            },
+        )
+
+        data = response.json()
+        assert data["committed"] is True
+        assert [r["status"] for r in data["results"]] == [201, 404, 201]
+        assert db_session.query(Task).count() == 2
+
+    def test_atomic_mode_rolls_back_on_failure(
+        self, client: TestClient, db_session: Session, sample_task: Task
+    ):
+        """In atomic mode the first failure discards all changes."""
+        response = client.post(
+            "/api/v1/batch",
+            json={
+                "atomic": True,
+                "operations": [
+                    {"method": "POST", "path": "/api/v1/tasks/", "body": {"title": "Discarded"}},
+                    {
+                        "method": "PATCH",
+                        "path": f"/api/v1/tasks/{sample_task.id}",
+                        "body": {"title": "Discarded too"},
+                    },
+                    {"method": "DELETE", "path": "/api/v1/tasks/missing"},
+                    {"method": "POST", "path": "/api/v1/tasks/", "body": {"title": "Skipped"}},
+                ]
+            },
+        )
+
+        data = response.json()
+        assert data["committed"] is False
+        assert [r["status"] for r in data["results"]] == [201, 200, 404, 424]
+
+        db_session.expire_all()
+        assert db_session.query(Task).count() == 1
+        assert db_session.get(Task, sample_task.id).title == "Call dentist"
+
+    def test_atomic_mode_commits_when_all_succeed(
+        self, client: TestClient, db_session: Session
+    ):
+        """A fully successful atomic batch is committed."""
+        response = client.post(
+            "/api/v1/batch",
+            json={
+                "atomic": True,
+                "operations": [
+                    {"method": "POST", "path": "/api/v1/tasks/", "body": {"title": "One"}},
+                    {"method": "POST", "path": "/api/v1/tasks/", "body": {"title": "Two"}},
+                ],
+            },
+        )
+
+        assert response.json()["committed"] is True
+        db_session.expire_all()
+        assert db_session.query(Task).count() == 2
@@ -0,0 +1,142 @@
+"""Tests for the benchmark suite helpers."""
+
+import argparse
+
+import pytest
+
+from benchmarks import encodings
+from benchmarks.common import compare, create_file_engine, seed_database, summarise
+from benchmarks.loadgen import OperationStats, Stage, parse_mix, parse_stage
+from benchmarks.queries import STATEMENTS, measure
+from benchmarks.run import benchmark_target, inprocess_target
+
+
+class TestSummarise:
+    """Tests for latency summaries."""
+
+    def test_percentiles_in_milliseconds(self):
+        """Durations in seconds are summarised as millisecond percentiles."""
+        summary = summarise([i / 1000 for i in range(1, 101)], statements=2)
+
+        assert summary["iterations"] == 100
+        assert summary["p50_ms"] == 50.5
+        assert summary["p99_ms"] == 99.01
+        assert summary["statements"] == 2
+
+    def test_single_sample(self):
+        """A single sample is every percentile."""
+        summary = summarise([0.004])
+
+        assert summary["p50_ms"] == summary["p99_ms"] == 4.0
+        assert "statements" not in summary
+
+
+class TestCompare:
+    """Tests for comparing result sets."""
+
+    def test_reports_relative_change(self):
+        """Operations present in both runs are compared on p50."""
+        baseline = {"results": {"inprocess": {"10": {"get_task": {"p50_ms": 2.0}}}}}
+        current = {
+            "results": {
+                "inprocess": {
+                    "10": {"get_task": {"p50_ms": 3.0}, "list_tasks": {"p50_ms": 1.0}}
+                }
+            }
+        }
+
+        rows = compare(baseline, current)
+
+        assert len(rows) == 1
+        assert rows[0]["operation"] == "get_task"
+        assert rows[0]["change"] == 0.5
+
+
+class TestInProcessRun:
+    """Tests for running the benchmark in process."""
+
+    def test_measures_every_operation(self, tmp_path):
+        """Every operation is timed against a seeded database."""
+        db_path = tmp_path / "bench.db"
+        engine = create_file_engine(db_path)
+        seed_database(engine, 20)
+        engine.dispose()
+        iterations = {
+            "list_tasks": 2,
+            "get_task": 2,
+            "due_tasks": 2,
+            "update_task": 2,
+            "reorder_tasks": 1,
+            "create_task": 2,
+            "delete_task": 2,
+        }
+
+        with inprocess_target(db_path) as target:
+            results = benchmark_target(target, iterations)
+            remaining = target.client.get("/api/v1/tasks/").json()
+
+        assert set(results) == set(iterations)
+        assert results["get_task"]["iterations"] == 2
+        assert results["list_tasks"]["statements"] >= 1
+        assert results["get_task"]["cpu_ms"] > 0
+        assert results["get_task"]["cache_hit_rate"] > 0
+        assert len(remaining) == 22
+
+
+class TestQueryBenchmark:
+    """Tests for the statement construction benchmark."""
+
+    def test_measures_every_statement(self, tmp_path):
+        """Both variants of each hot statement run and are served from the cache."""
+        results = measure(tmp_path / "queries.db", rows=20, calls=5)
+
+        assert set(results) == set(STATEMENTS)
+        for result in results.values():
+            assert result["prebuilt"]["cpu_us"] > 0
+            assert result["prebuilt"]["cache_hit_rate"] == 1.0
+
+
+class TestEncodingBenchmark:
+    """Tests for the JSON and MessagePack comparison."""
+
+    def test_measures_available_encodings(self):
+        """JSON is always measured, MessagePack when it is installed."""
+        results = encodings.measure(rows=20, repeat=2)
+
+        expected = {"json"} if encodings.msgpack is None else {"json", "msgpack"}
+        assert set(results) == expected
+        for result in results.values():
+            assert result["bytes"] > result["gzip_bytes"] > 0
+            assert result["encode"]["iterations"] == 2
+
+
+class TestLoadGenerator:
+    """Tests for load generator configuration and reporting."""
+
+    def test_parse_stage(self):
+        """Stages accept seconds or minutes."""
+        assert parse_stage("30s:50") == Stage(30.0, 50.0)
+        assert parse_stage("2m:10") == Stage(120.0, 10.0)
+
+    def test_parse_mix_rejects_unknown_operation(self):
+        """Only known operations can be weighted."""
+        assert parse_mix("list=3,get=1") == {"list": 3.0, "get": 1.0}
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_mix("list=3,explode=1")
+
+    def test_report_counts_conflicts_and_locks(self):
+        """Error rates separate conflicts and lock errors."""
+        stats = OperationStats(latencies=[0.001, 0.003, 0.03, 20.0])
+        stats.statuses.update({201: 2, 409: 1, 503: 1})
+        stats.locked = 1
+
+        report = stats.report(elapsed=2.0)
+
+        assert report["throughput"] == 2.0
+        assert report["error_rate"] == 0.5
+        assert report["conflict_rate"] == 0.25
+        assert report["locked_rate"] == 0.25
+        assert report["histogram_ms"]["1"] == 1
+        assert report["histogram_ms"]["5"] == 1
+        assert report["histogram_ms"]["50"] == 1
+        assert report["histogram_ms"]["inf"] == 1
@@ -0,0 +1,209 @@
+"""Tests for single-flight coalescing of concurrent reads."""
+
+import threading
+import time
+from typing import List
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+
+from app import coalescing
+from app.coalescing import SingleFlight, coalesced_json, current_revision
+from app.metrics import COALESCED_READS
+from app.models import ANONYMOUS_OWNER
+from app.owners import owner_id_for
+from app.schemas import TaskResponse
+
+ADAPTER = TypeAdapter(List[TaskResponse])
+
+
+def wait_for(condition, timeout: float = 5.0) -> None:
+    """Poll until condition() is true."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+class TestSingleFlight:
+    """Tests for sharing one call between concurrent callers."""
+
+    def test_concurrent_callers_share_one_call(self):
+        """Callers arriving while a call is in flight get its result."""
+        flight = SingleFlight()
+        started, release = threading.Event(), threading.Event()
+        calls, results = [], []
+
+        def slow():
+            calls.append(1)
+            started.set()
+            release.wait()
+            return "body"
+
+        followers = COALESCED_READS.labels("follower").get()
+        threads = [threading.Thread(target=lambda: results.append(flight.do("k", slow)))]
+        threads[0].start()
+        started.wait()
+        threads += [
+            threading.Thread(target=lambda: results.append(flight.do("k", slow)))
+            for _ in range(3)
+        ]
+        for thread in threads[1:]:
+            thread.start()
+        wait_for(lambda: COALESCED_READS.labels("follower").get() == followers + 3)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert calls == [1]
+        assert results == ["body"] * 4
+
+    def test_errors_reach_every_caller_and_are_not_kept(self):
+        """A failed call fails its followers; the next call runs afresh."""
+        flight = SingleFlight()
+        started, release = threading.Event(), threading.Event()
+        errors = []
+
+        def failing():
+            started.set()
+            release.wait()
+            raise ValueError("boom")
+
+        def call():
+            try:
+                flight.do("k", failing)
+            except ValueError as exc:
+                errors.append(exc)
+
+        followers = COALESCED_READS.labels("follower").get()
+        leader = threading.Thread(target=call)
+        leader.start()
+        started.wait()
+        follower = threading.Thread(target=call)
+        follower.start()
+        wait_for(lambda: COALESCED_READS.labels("follower").get() == followers + 1)
+        release.set()
+        leader.join()
+        follower.join()
+
+        assert len(errors) == 2
+        assert flight.do("k", lambda: "recovered") == "recovered"
+
+    def test_sequential_calls_are_not_cached(self):
+        """Nothing is kept once a call completes."""
+        flight = SingleFlight()
+
+        assert [flight.do("k", lambda i=i: i) for i in range(3)] == [0, 1, 2]
+
+
+class TestRevisions:
+    """Tests for the owner revision that keys shared reads."""
+
+    def test_writes_advance_only_the_writers_revision(
+        self, client: TestClient, db_session: Session
+    ):
+        """Creating, updating and deleting tasks each advance the revision."""
+        revisions = [current_revision(db_session, ANONYMOUS_OWNER)]
+        db_session.commit()
+
+        task_id = client.post("/api/v1/tasks/", json={"title": "A"}).json()["id"]
+        revisions.append(current_revision(db_session, ANONYMOUS_OWNER))
+        db_session.commit()
+        client.patch(f"/api/v1/tasks/{task_id}", json={"title": "B"})
+        revisions.append(current_revision(db_session, ANONYMOUS_OWNER))
+        db_session.commit()
+        client.delete(f"/api/v1/tasks/{task_id}")
+        revisions.append(current_revision(db_session, ANONYMOUS_OWNER))
+
+        assert revisions[0] == 0
+        assert revisions == sorted(set(revisions))
+        assert current_revision(db_session, owner_id_for("Bearer alice")) == 0
+
+    def test_read_after_write_is_not_shared_with_older_read(self, db_session: Session):
+        """A request seeing a newer revision starts its own read."""
+        started, release = threading.Event(), threading.Event()
+        loads = []
+
+        def slow_load():
+            loads.append("old")
+            started.set()
+            release.wait()
+            return []
+
+        leader = threading.Thread(
+            target=coalesced_json,
+            args=(db_session, ANONYMOUS_OWNER, ("k",), ADAPTER, slow_load, True),
+        )
+        leader.start()
+        started.wait()
+        db_session.connection().exec_driver_sql(
+            "INSERT INTO owner_revisions (owner_id, revision) VALUES ('anonymous', 1)"
+        )
+        response = coalesced_json(
+            db_session, ANONYMOUS_OWNER, ("k",), ADAPTER, lambda: loads.append("new") or [], True
+        )
+        release.set()
+        leader.join()
+
+        assert loads == ["old", "new"]
+        assert response.body == b"[]"
+
+
+class TestCoalescedRoutes:
+    """Tests that coalesced routes respond exactly as before."""
+
+    @pytest.mark.parametrize("path", ["/api/v1/tasks/", "/api/v1/lists/"])
+    def test_response_matches_response_model(self, client: TestClient, multiple_tasks, path):
+        """The shared body is the JSON FastAPI would have produced."""
+        response = client.get(path)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert response.content.startswith(b'[{"')
+        assert b": " not in response.content
+
+    def test_list_reflects_writes_immediately(self, client: TestClient):
+        """A read after a write sees it; nothing is served from an old read."""
+        before = client.get("/api/v1/tasks/").json()
+        client.post("/api/v1/tasks/", json={"title": "New"})
+
+        after = client.get("/api/v1/tasks/").json()
+
+        assert [t["title"] for t in after] == [t["title"] for t in before] + ["New"]
+
+    def test_missing_list_is_404(self, client: TestClient):
+        """Errors inside a coalesced read become the request's response."""
+        response = client.get("/api/v1/lists/00000000-0000-0000-0000-00000000ffff/tasks")
+
+        assert response.status_code == 404
+
+    def test_reads_are_not_shared_without_revisions(self, db_session: Session, monkeypatch):
+        """Where revisions are not maintained, each concurrent request runs its own read."""
+        monkeypatch.setattr(coalescing, "current_revision", lambda db, owner_id: None)
+        started, release = threading.Event(), threading.Event()
+        loads = []
+
+        def slow_load():
+            loads.append("first")
+            started.set()
+            release.wait()
+            return []
+
+        leaders = COALESCED_READS.labels("leader").get()
+        first = threading.Thread(
+            target=coalesced_json,
+            args=(db_session, ANONYMOUS_OWNER, ("k",), ADAPTER, slow_load, True),
+        )
+        first.start()
+        started.wait()
+        response = coalesced_json(
+            db_session, ANONYMOUS_OWNER, ("k",), ADAPTER, lambda: loads.append("second") or [], True
+        )
+        release.set()
+        first.join()
+
+        assert loads == ["first", "second"]
+        assert response.body == b"[]"
+        assert COALESCED_READS.labels("leader").get() == leaders
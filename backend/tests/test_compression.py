@@ -0,0 +1,139 @@
+"""Tests for backend response compression."""
+
+import gzip
+import json
+from typing import List
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app import compression
+from app.compression import CompressedCache, accepted_codec
+from app.metrics import COMPRESSION_CACHE
+from app.models import Task
+
+
+def raw_get(client: TestClient, path: str, accept_encoding: str = "gzip"):
+    """GET a path and return the response with its body as sent, still compressed."""
+    with client.stream("GET", path, headers={"Accept-Encoding": accept_encoding}) as response:
+        return response, b"".join(response.iter_raw())
+
+
+def cache_lookups(result: str) -> float:
+    """Compressed cache lookups with this result so far."""
+    return COMPRESSION_CACHE.labels(result).get()
+
+
+@pytest.fixture
+def many_tasks(db_session: Session) -> List[Task]:
+    """Enough tasks for the list response to pass the size threshold."""
+    tasks = [Task(title=f"Task {i}", position=i, is_complete=False) for i in range(1, 41)]
+    db_session.add_all(tasks)
+    db_session.commit()
+    return tasks
+
+
+class TestAcceptedCodec:
+    """Tests for choosing a content coding from Accept-Encoding."""
+
+    @pytest.mark.parametrize(
+        "accept_encoding, expected",
+        [
+            (None, None),
+            ("identity", None),
+            ("gzip", "gzip"),
+            ("deflate, gzip;q=0.5", "gzip"),
+            ("gzip;q=0", None),
+            ("*;q=0.1, gzip;q=0", "zstd"),
+            ("gzip, br, zstd", "zstd"),
+            ("gzip, br;q=0.9", "gzip"),
+        ],
+    )
+    def test_prefers_client_then_server_order(self, accept_encoding, expected):
+        """The client's q-values decide; ties go to zstd, then brotli, then gzip."""
+        pytest.importorskip("brotli")
+        pytest.importorskip("zstandard")
+
+        codec = accepted_codec(accept_encoding)
+
+        assert (codec.name if codec else None) == expected
+
+    def test_gzip_only_without_optional_packages(self, monkeypatch):
+        """gzip is always available."""
+        monkeypatch.setattr(compression, "CODECS", {"gzip": compression.CODECS["gzip"]})
+
+        assert accepted_codec("zstd, br, gzip;q=0.5").name == "gzip"
+        assert accepted_codec("zstd, br") is None
+
+
+class TestCompressedResponses:
+    """Tests for compressing responses through the middleware."""
+
+    def test_list_is_gzipped(self, client: TestClient, many_tasks: List[Task]):
+        """Large JSON responses are gzipped and marked as varying by Accept-Encoding."""
+        response, body = raw_get(client, "/api/v1/tasks/")
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert int(response.headers["content-length"]) == len(body)
+        assert len(json.loads(gzip.decompress(body))) == 40
+
+    def test_small_responses_are_not_compressed(self, client: TestClient, sample_task: Task):
+        """Bodies under the threshold are sent as they are."""
+        response, body = raw_get(client, f"/api/v1/tasks/{sample_task.id}")
+
+        assert "content-encoding" not in response.headers
+        assert json.loads(body)["id"] == sample_task.id
+
+    @pytest.mark.parametrize("coding, module", [("br", "brotli"), ("zstd", "zstandard")])
+    def test_optional_codings(self, client: TestClient, many_tasks: List[Task], coding, module):
+        """brotli and zstd are used when installed and accepted."""
+        library = pytest.importorskip(module)
+        response, body = raw_get(client, "/api/v1/tasks/", coding)
+
+        decompressed = (
+            library.decompress(body)
+            if coding == "br"
+            else library.ZstdDecompressor().decompressobj().decompress(body)
+        )
+        assert response.headers["content-encoding"] == coding
+        assert len(json.loads(decompressed)) == 40
+
+    def test_export_stream_is_compressed(self, client: TestClient, many_tasks: List[Task]):
+        """Streams are compressed as they go; already gzipped exports are left alone."""
+        plain = client.get("/api/v1/tasks/export", headers={"Accept-Encoding": "identity"})
+        response, body = raw_get(client, "/api/v1/tasks/export")
+        gzipped, gzipped_body = raw_get(client, "/api/v1/tasks/export?gzip=true")
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert gzip.decompress(body) == plain.content
+        assert "content-encoding" not in gzipped.headers
+        assert gzip.decompress(gzipped_body) == plain.content
+
+
+class TestCompressedCache:
+    """Tests for reusing compressed list bodies."""
+
+    def test_unchanged_list_is_compressed_once(self, client: TestClient, many_tasks: List[Task]):
+        """Repeated reads reuse the compressed body until a write changes the list."""
+        raw_get(client, "/api/v1/tasks/")
+        hits, misses = cache_lookups("hit"), cache_lookups("miss")
+
+        first = raw_get(client, "/api/v1/tasks/")[1]
+        client.patch(f"/api/v1/tasks/{many_tasks[0].id}", json={"title": "Changed"})
+        changed = raw_get(client, "/api/v1/tasks/")[1]
+
+        assert cache_lookups("hit") == hits + 1
+        assert cache_lookups("miss") == misses + 1
+        assert json.loads(gzip.decompress(changed))[0]["title"] == "Changed"
+        assert first != changed
+
+    def test_least_recently_used_are_evicted(self):
+        """The cache holds at most max_entries bodies."""
+        cache = CompressedCache(max_entries=2)
+        codec = compression.CODECS["gzip"]
+        for key in ("a", "b", "a", "c"):
+            cache.compress(key, codec, key.encode() * 100)
+
+        assert [key for key, _ in cache.entries] == ["a", "c"]
@@ -0,0 +1,130 @@
+"""API tests for the due tasks view, GET /api/v1/tasks/due."""
+
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.models import Task, TaskList
+from app.owners import owner_id_for
+from app.routers.tasks import DUE_TASKS, UPCOMING_TASKS
+
+
+def now() -> datetime:
+    """The current time as stored: naive UTC."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+@pytest.fixture
+def dated_tasks(db_session: Session) -> Dict[str, Task]:
+    """Tasks due at various times, plus ones the view must leave out."""
+    other_list = TaskList(name="Errands")
+    db_session.add(other_list)
+    db_session.flush()
+    current = now()
+    tasks = {
+        "overdue": Task(title="overdue", position=1, deadline=current - timedelta(days=2)),
+        "today": Task(title="today", position=2, deadline=current + timedelta(hours=3)),
+        "next_week": Task(title="next_week", position=3, deadline=current + timedelta(days=9)),
+        "undated": Task(title="undated", position=4),
+        "done": Task(
+            title="done", position=5, is_complete=True, deadline=current + timedelta(hours=1)
+        ),
+        "other_owner": Task(
+            title="other_owner",
+            position=1,
+            owner_id=owner_id_for("Bearer alice"),
+            deadline=current + timedelta(hours=1),
+        ),
+        "other_list": Task(
+            title="other_list",
+            position=1,
+            list_id=other_list.id,
+            deadline=current + timedelta(days=1),
+        ),
+    }
+    db_session.add_all(tasks.values())
+    db_session.commit()
+    return tasks
+
+
+def titles(response) -> List[str]:
+    """Titles in a list response, in order."""
+    assert response.status_code == 200
+    return [task["title"] for task in response.json()]
+
+
+class TestDueTasks:
+    """Tests for filtering and ordering due tasks."""
+
+    def test_default_is_overdue_and_next_seven_days(
+        self, client: TestClient, dated_tasks: Dict[str, Task]
+    ):
+        """Incomplete, dated tasks of the owner in any list, earliest deadline first."""
+        response = client.get("/api/v1/tasks/due")
+
+        assert titles(response) == ["overdue", "today", "other_list"]
+
+    def test_without_overdue(self, client: TestClient, dated_tasks: Dict[str, Task]):
+        """include_overdue=false starts the window now."""
+        response = client.get("/api/v1/tasks/due?within=2w&include_overdue=false")
+
+        assert titles(response) == ["today", "other_list", "next_week"]
+
+    @pytest.mark.parametrize(
+        "within, expected",
+        [
+            ("90s", ["overdue"]),
+            ("240m", ["overdue", "today"]),
+            ("10d", ["overdue", "today", "other_list", "next_week"]),
+        ],
+    )
+    def test_within_units(
+        self, client: TestClient, dated_tasks: Dict[str, Task], within, expected
+    ):
+        """Durations take s, m, h, d and w units."""
+        assert titles(client.get(f"/api/v1/tasks/due?within={within}")) == expected
+
+    def test_limit(self, client: TestClient, dated_tasks: Dict[str, Task]):
+        """At most limit tasks are returned, the earliest first."""
+        assert titles(client.get("/api/v1/tasks/due?within=2w&limit=2")) == ["overdue", "today"]
+
+    @pytest.mark.parametrize("query", ["within=7", "within=7y", "within=-1d", "limit=0"])
+    def test_invalid_parameters_are_422(self, client: TestClient, query: str):
+        """Malformed durations and limits are rejected."""
+        assert client.get(f"/api/v1/tasks/due?{query}").status_code == 422
+
+    def test_deadlines_with_offsets_compare_in_utc(self, client: TestClient):
+        """A deadline sent with an offset is stored and compared as UTC."""
+        due = datetime.now(timezone(timedelta(hours=-10))) + timedelta(minutes=30)
+        created = client.post(
+            "/api/v1/tasks/", json={"title": "Soon", "deadline": due.isoformat()}
+        ).json()
+
+        assert created["deadline"] == due.astimezone(timezone.utc).replace(tzinfo=None).isoformat()
+        assert titles(client.get("/api/v1/tasks/due?within=1h")) == ["Soon"]
+        assert titles(client.get("/api/v1/tasks/due?within=20m")) == []
+
+
+class TestDueTasksIndex:
+    """Tests that the view is served from its partial index."""
+
+    @pytest.mark.parametrize("statement", [DUE_TASKS, UPCOMING_TASKS])
+    def test_query_plan_uses_index_in_order(self, db_session: Session, statement):
+        """The index is searched and no sort is needed."""
+        engine = db_session.get_bind()
+        compiled = statement.compile(engine)
+        values = compiled.construct_params(
+            {"owner_id": "o", "now": "2026-01-01", "until": "2026-02-01", "limit": 10}
+        )
+        with engine.connect() as conn:
+            plan = conn.exec_driver_sql(
+                f"EXPLAIN QUERY PLAN {compiled}",
+                tuple(values[name] for name in compiled.positiontup),
+            ).all()
+
+        details = " ".join(row[-1] for row in plan)
+        assert "USING INDEX ix_tasks_owner_id_deadline_id" in details
+        assert "TEMP B-TREE" not in details
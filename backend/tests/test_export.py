@@ -0,0 +1,133 @@
+"""API tests for streaming task export.
+
+Covers:
+- CSV, NDJSON and JSON export formats
+- Optional gzip compression
+- Memory stays bounded regardless of the number of exported rows
+"""
+
+import csv
+import gzip
+import io
+import json
+import tracemalloc
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from app.models import ANONYMOUS_OWNER, Task
+from app.routers.tasks import export_chunks
+
+
+def _seed(db_session: Session, count: int) -> None:
+    """Bulk insert count tasks."""
+    db_session.execute(
+        insert(Task),
+        [
+            {
+                "id": str(uuid.uuid4()),
+                "title": f"Task {i}",
+                "description": "d" * 100,
+                "position": i + 1,
+            }
+            for i in range(count)
+        ],
+    )
+    db_session.commit()
+
+
+def _peak_export_memory(db_session: Session) -> int:
+    """Return the peak traced allocation while consuming a CSV export."""
+    tracemalloc.start()
+    try:
+        for _ in export_chunks(db_session, ANONYMOUS_OWNER, "csv", compress=True):
+            pass
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+class TestExportFormats:
+    """Tests for GET /api/v1/tasks/export formats."""
+
+    def test_export_ndjson(self, client: TestClient, multiple_tasks: list[Task]):
+        """NDJSON export returns one task per line in position order."""
+        response = client.get("/api/v1/tasks/export?format=ndjson")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [t["title"] for t in lines] == ["Task 1", "Task 2", "Task 3"]
+
+    def test_export_ndjson_matches_list_endpoint(
+        self, client: TestClient, task_with_deadline: Task
+    ):
+        """Exported records use the same representation as the API."""
+        exported = json.loads(client.get("/api/v1/tasks/export").text)
+        listed = client.get("/api/v1/tasks/").json()
+
+        assert [exported] == listed
+
+    def test_export_csv(self, client: TestClient, multiple_tasks: list[Task]):
+        """CSV export has a header row and one row per task."""
+        response = client.get("/api/v1/tasks/export?format=csv")
+
+        assert response.headers["content-type"].startswith("text/csv")
+        assert 'filename="tasks.csv"' in response.headers["content-disposition"]
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert [r["title"] for r in rows] == ["Task 1", "Task 2", "Task 3"]
+        assert [r["is_complete"] for r in rows] == ["false", "true", "false"]
+        assert rows[0]["description"] == ""
+
+    def test_export_csv_empty_has_header(self, client: TestClient):
+        """An empty CSV export still contains the header row."""
+        response = client.get("/api/v1/tasks/export?format=csv")
+
+        assert response.text.splitlines() == [
+            "id,list_id,title,description,is_complete,position,deadline,created_at,updated_at"
+        ]
+
+    def test_export_json(self, client: TestClient, multiple_tasks: list[Task]):
+        """JSON export is a single array."""
+        response = client.get("/api/v1/tasks/export?format=json")
+
+        assert [t["position"] for t in response.json()] == [1, 2, 3]
+
+    def test_export_json_empty(self, client: TestClient):
+        """An empty JSON export is an empty array."""
+        response = client.get("/api/v1/tasks/export?format=json")
+
+        assert response.json() == []
+
+    def test_export_gzip(self, client: TestClient, multiple_tasks: list[Task]):
+        """gzip=true returns a gzip-compressed attachment."""
+        response = client.get("/api/v1/tasks/export?format=ndjson&gzip=true")
+
+        assert response.headers["content-type"] == "application/gzip"
+        assert 'filename="tasks.ndjson.gz"' in response.headers["content-disposition"]
+        lines = gzip.decompress(response.content).decode().splitlines()
+        assert len(lines) == 3
+
+    def test_export_invalid_format_returns_422(self, client: TestClient):
+        """Unknown formats are rejected."""
+        response = client.get("/api/v1/tasks/export?format=xml")
+
+        assert response.status_code == 422
+
+
+class TestExportMemory:
+    """Export memory use does not grow with the number of rows."""
+
+    def test_export_memory_is_bounded(self, db_session: Session):
+        """Exporting 10x more rows does not need proportionally more memory."""
+        _seed(db_session, 2_000)
+        small_peak = _peak_export_memory(db_session)
+
+        db_session.execute(delete(Task))
+        _seed(db_session, 20_000)
+        large_peak = _peak_export_memory(db_session)
+
+        assert large_peak < 4 * 1024 * 1024
+        assert large_peak < small_peak * 2
@@ -0,0 +1,147 @@
+"""Tests for pre-encoded task fragments in list responses."""
+
+from datetime import datetime
+from typing import List
+
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+from sqlalchemy import event, select, text
+from sqlalchemy.orm import Session
+
+from app.fragments import FragmentCache
+from app.metrics import TASK_FRAGMENTS
+from app.models import Task
+from app.responses import encode_json
+from app.schemas import TaskResponse
+
+
+def misses() -> float:
+    """Fragments re-encoded so far."""
+    return TASK_FRAGMENTS.labels("miss").get()
+
+
+class TestListAssembly:
+    """Tests for building list responses from fragments."""
+
+    def test_body_matches_response_model_encoding(
+        self, client: TestClient, db_session: Session, multiple_tasks: List[Task]
+    ):
+        """Joined fragments are byte for byte the encoded response model."""
+        client.patch(f"/api/v1/tasks/{multiple_tasks[0].id}", json={"title": "Über ✓"})
+        db_session.expire_all()
+        tasks = db_session.scalars(select(Task).order_by(Task.position)).all()
+
+        response = client.get("/api/v1/tasks/")
+
+        assert response.content == encode_json(TypeAdapter(List[TaskResponse]), tasks)
+
+    def test_writes_store_their_fragments(self, client: TestClient, multiple_tasks: List[Task]):
+        """After an update through the API, the next list read encodes nothing."""
+        client.get("/api/v1/tasks/")
+        client.patch(f"/api/v1/tasks/{multiple_tasks[1].id}", json={"is_complete": False})
+        before = misses()
+
+        tasks = client.get("/api/v1/tasks/").json()
+
+        assert misses() == before
+        assert [t["is_complete"] for t in tasks] == [False, False, False]
+
+    def test_changes_by_other_writers_are_reencoded(
+        self, client: TestClient, db_session: Session, multiple_tasks: List[Task]
+    ):
+        """A row changed outside this process is re-encoded, and only that row."""
+        client.get("/api/v1/tasks/")
+        db_session.execute(
+            text("UPDATE tasks SET title = 'Elsewhere', updated_at = :now WHERE id = :id"),
+            {"now": datetime(2030, 1, 1), "id": multiple_tasks[2].id},
+        )
+        db_session.commit()
+        before = misses()
+
+        titles = [t["title"] for t in client.get("/api/v1/tasks/").json()]
+
+        assert misses() == before + 1
+        assert titles == ["Task 1", "Task 2", "Elsewhere"]
+
+    def test_unchanged_list_reads_only_the_revision(
+        self, client: TestClient, db_session: Session, multiple_tasks: List[Task]
+    ):
+        """While the owner's revision is unchanged, no task rows are queried."""
+        client.get("/api/v1/tasks/")
+        statements = []
+        engine = db_session.get_bind()
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)  # noqa: E731
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            client.get("/api/v1/tasks/")
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+
+        selects = [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+        assert len(selects) == 1
+        assert "owner_revisions" in selects[0]
+
+    def test_task_deleted_between_reads_is_left_out(
+        self, client: TestClient, db_session: Session, multiple_tasks: List[Task]
+    ):
+        """A row deleted after the stamps are read, before it is loaded, is skipped."""
+        engine = db_session.get_bind()
+        pending = [multiple_tasks[1].id]
+
+        def delete_first(conn, cursor, statement, *args):
+            if "tasks.id IN" in statement and pending:
+                other = conn.connection.dbapi_connection
+                other.execute("DELETE FROM tasks WHERE id = ?", (pending.pop(),))
+                other.commit()
+
+        event.listen(engine, "before_cursor_execute", delete_first)
+        try:
+            response = client.get("/api/v1/tasks/")
+        finally:
+            event.remove(engine, "before_cursor_execute", delete_first)
+
+        assert response.status_code == 200
+        assert [t["title"] for t in response.json()] == ["Task 1", "Task 3"]
+
+    def test_rolled_back_batch_leaves_no_trace(
+        self, client: TestClient, multiple_tasks: List[Task]
+    ):
+        """Reads inside a failed atomic batch do not leak into later responses."""
+        client.post(
+            "/api/v1/batch",
+            json={
+                "atomic": True,
+                "operations": [
+                    {"method": "POST", "path": "/api/v1/tasks/", "body": {"title": "Phantom"}},
+                    {"method": "GET", "path": "/api/v1/tasks/"},
+                    {"method": "GET", "path": "/api/v1/tasks/missing"},
+                ],
+            },
+        )
+
+        titles = [t["title"] for t in client.get("/api/v1/tasks/").json()]
+
+        assert titles == ["Task 1", "Task 2", "Task 3"]
+
+
+class TestFragmentCache:
+    """Tests for the cache in isolation."""
+
+    def test_stale_stamps_miss_and_old_entries_are_evicted(self):
+        """Fragments match only their stamp; the least recently used go first."""
+        cache = FragmentCache(max_fragments=2)
+        tasks = [
+            Task(id=f"t{i}", title="T", position=i, updated_at=datetime(2026, 1, 1))
+            for i in range(3)
+        ]
+        for task in tasks:
+            task.owner_id, task.list_id, task.is_complete = "o", "l", False
+            task.created_at = datetime(2026, 1, 1)
+        cache.store(tasks[:2])
+
+        current = (datetime(2026, 1, 1), 0)
+        assert cache.lookup([("t0", current), ("t0", (datetime(2026, 1, 2), 0))])[1] is None
+        cache.store(tasks[2:])
+
+        assert len(cache) == 2
+        assert cache.lookup([("t1", (datetime(2026, 1, 1), 1))]) == [None]
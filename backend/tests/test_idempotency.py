@@ -0,0 +1,186 @@
+"""Tests for Idempotency-Key handling."""
+
+import asyncio
+import uuid
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.idempotency import IdempotencyMiddleware, IdempotencyStore
+from app.models import Task
+
+
+def new_key() -> dict:
+    """Headers carrying a fresh idempotency key."""
+    return {"Idempotency-Key": str(uuid.uuid4())}
+
+
+class TestIdempotentCreate:
+    """Tests for retried task creation."""
+
+    def test_retry_replays_without_creating_again(self, client: TestClient, db_session: Session):
+        """A repeated key returns the first response and creates one task."""
+        headers = new_key()
+
+        first = client.post("/api/v1/tasks/", json={"title": "Once"}, headers=headers)
+        second = client.post("/api/v1/tasks/", json={"title": "Once"}, headers=headers)
+
+        assert first.status_code == second.status_code == 201
+        assert second.json() == first.json()
+        assert second.headers["idempotent-replayed"] == "true"
+        assert "idempotent-replayed" not in first.headers
+        assert db_session.query(Task).count() == 1
+
+    def test_without_key_each_request_runs(self, client: TestClient, db_session: Session):
+        """Requests without the header are not deduplicated."""
+        client.post("/api/v1/tasks/", json={"title": "Twice"})
+        client.post("/api/v1/tasks/", json={"title": "Twice"})
+
+        assert db_session.query(Task).count() == 2
+
+    def test_different_body_is_rejected(self, client: TestClient):
+        """Reusing a key for a different request is a client error."""
+        headers = new_key()
+        client.post("/api/v1/tasks/", json={"title": "First"}, headers=headers)
+
+        response = client.post("/api/v1/tasks/", json={"title": "Second"}, headers=headers)
+
+        assert response.status_code == 422
+        assert "different request body" in response.json()["detail"]
+
+    def test_keys_are_per_owner(self, client: TestClient, db_session: Session):
+        """The same key from two owners creates two tasks."""
+        key = new_key()
+
+        for token in ("alice", "bob"):
+            client.post(
+                "/api/v1/tasks/",
+                json={"title": "Mine"},
+                headers={**key, "Authorization": f"Bearer {token}"},
+            )
+
+        assert db_session.query(Task).count() == 2
+
+    def test_replay_keeps_the_negotiated_encoding(self, client: TestClient, db_session: Session):
+        """A retry asking for another encoding is rejected, never answered in the stored one."""
+        msgpack = pytest.importorskip("msgpack")
+        headers = new_key()
+        packed = {**headers, "Accept": "application/msgpack"}
+
+        first = client.post("/api/v1/tasks/", json={"title": "Packed"}, headers=packed)
+        as_json = client.post("/api/v1/tasks/", json={"title": "Packed"}, headers=headers)
+        retried = client.post("/api/v1/tasks/", json={"title": "Packed"}, headers=packed)
+
+        assert first.headers["content-type"] == "application/msgpack"
+        assert as_json.status_code == 422
+        assert "different Accept header" in as_json.json()["detail"]
+        assert retried.headers["idempotent-replayed"] == "true"
+        assert msgpack.unpackb(retried.content) == msgpack.unpackb(first.content)
+        assert db_session.query(Task).count() == 1
+
+    def test_validation_errors_are_replayed(self, client: TestClient):
+        """A final 4xx outcome is stored like a success."""
+        headers = new_key()
+
+        first = client.post("/api/v1/tasks/", json={"title": ""}, headers=headers)
+        second = client.post("/api/v1/tasks/", json={"title": ""}, headers=headers)
+
+        assert first.status_code == second.status_code == 422
+        assert second.headers["idempotent-replayed"] == "true"
+
+
+class TestIdempotentReorderAndBatch:
+    """Tests for retried reorder and batch requests."""
+
+    def test_reorder_replayed(self, client: TestClient, multiple_tasks: list[Task]):
+        """A replayed reorder returns the stored order."""
+        headers = new_key()
+        order = {"task_ids": [t.id for t in reversed(multiple_tasks)]}
+
+        first = client.put("/api/v1/tasks/reorder", json=order, headers=headers)
+        second = client.put("/api/v1/tasks/reorder", json=order, headers=headers)
+
+        assert second.json() == first.json()
+        assert second.headers["idempotent-replayed"] == "true"
+
+    def test_batch_replayed(self, client: TestClient, db_session: Session):
+        """A replayed batch does not run its operations again."""
+        headers = new_key()
+        operation = {"method": "POST", "path": "/api/v1/tasks/", "body": {"title": "B"}}
+        batch = {"operations": [operation]}
+
+        client.post("/api/v1/batch", json=batch, headers=headers)
+        client.post("/api/v1/batch", json=batch, headers=headers)
+
+        assert db_session.query(Task).count() == 1
+
+
+def _asgi_app(statuses: list, started: asyncio.Event = None, release: asyncio.Event = None):
+    """A minimal app answering POST /api/v1/tasks/ with the next status in statuses."""
+    calls = []
+
+    async def app(scope, receive, send):
+        calls.append(scope["path"])
+        await receive()
+        if started is not None:
+            started.set()
+            await release.wait()
+        await send({"type": "http.response.start", "status": statuses.pop(0), "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    return app, calls
+
+
+async def _post(app, key: str = "k", body: bytes = b"{}") -> httpx.Response:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.post("/api/v1/tasks/", content=body, headers={"Idempotency-Key": key})
+
+
+class TestIdempotencyMiddleware:
+    """Tests for the middleware and store in isolation."""
+
+    def test_conflicts_and_server_errors_are_not_stored(self):
+        """Retryable outcomes release the key so the retry runs."""
+        app, calls = _asgi_app([409, 500, 201])
+        middleware = IdempotencyMiddleware(app, IdempotencyStore())
+
+        async def scenario():
+            return [(await _post(middleware)).status_code for _ in range(4)]
+
+        assert asyncio.run(scenario()) == [409, 500, 201, 201]
+        assert len(calls) == 3
+
+    def test_in_flight_duplicate_gets_409(self):
+        """A duplicate arriving while the first request runs is told to retry."""
+
+        async def scenario():
+            started, release = asyncio.Event(), asyncio.Event()
+            app, _ = _asgi_app([201], started, release)
+            middleware = IdempotencyMiddleware(app, IdempotencyStore())
+            first = asyncio.create_task(_post(middleware))
+            await started.wait()
+            duplicate = await _post(middleware)
+            release.set()
+            return duplicate, await first
+
+        duplicate, first = asyncio.run(scenario())
+
+        assert duplicate.status_code == 409
+        assert duplicate.headers["retry-after"] == "1"
+        assert first.status_code == 201
+
+    def test_store_expires_and_evicts(self):
+        """Entries expire after the TTL and the least recently used are evicted."""
+        store = IdempotencyStore(max_keys=2, ttl=60)
+        for key in ("a", "b", "c"):
+            store.reserve(("owner", "POST", "/", key, "json"), "fingerprint")
+
+        assert store.get(("owner", "POST", "/", "a", "json")) is None
+        assert store.get(("owner", "POST", "/", "c", "json")) is not None
+
+        expired = IdempotencyStore(ttl=0)
+        expired.reserve(("owner", "POST", "/", "a", "json"), "fingerprint")
+        assert expired.get(("owner", "POST", "/", "a", "json")) is None
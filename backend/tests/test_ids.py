@@ -0,0 +1,92 @@
+"""Tests for task ID generation and binary storage."""
+
+import uuid
+
+from sqlalchemy import Column, MetaData, Table, create_engine, select, text
+
+from app.ids import BinaryUUID, new_id, uuid7
+
+
+class TestUuid7:
+    """Tests for UUIDv7 generation."""
+
+    def test_version_and_variant(self):
+        """Generated values are RFC 9562 version 7 UUIDs."""
+        value = uuid7()
+
+        assert value.version == 7
+        assert value.variant == uuid.RFC_4122
+
+    def test_time_ordered(self):
+        """IDs generated in later milliseconds sort after earlier ones."""
+        first = uuid7()
+        later = [uuid7() for _ in range(1000)]
+
+        assert all(first.int >> 80 <= value.int >> 80 for value in later)
+
+    def test_new_id_is_canonical_string(self):
+        """New IDs are in the 36 character API form."""
+        value = new_id()
+
+        assert len(value) == 36
+        assert str(uuid.UUID(value)) == value
+
+
+class TestBinaryUUID:
+    """Tests for the 16-byte UUID column type."""
+
+    def make_table(self):
+        """Create an in-memory table keyed by a binary UUID."""
+        metadata = MetaData()
+        table = Table("items", metadata, Column("id", BinaryUUID(), primary_key=True))
+        engine = create_engine("sqlite://")
+        metadata.create_all(engine)
+        return engine, table
+
+    def test_stores_16_bytes_and_returns_string(self):
+        """Strings are stored as raw bytes and read back in canonical form."""
+        engine, table = self.make_table()
+        value = str(uuid.uuid4())
+
+        with engine.begin() as conn:
+            conn.execute(table.insert(), {"id": value})
+            stored = conn.execute(text("SELECT typeof(id), length(id) FROM items")).one()
+            loaded = conn.execute(select(table.c.id)).scalar()
+
+        assert tuple(stored) == ("blob", 16)
+        assert loaded == value
+
+    def test_lookup_by_string_and_in_list(self):
+        """Equality and IN filters accept canonical strings."""
+        engine, table = self.make_table()
+        values = [str(uuid.uuid4()) for _ in range(3)]
+
+        with engine.begin() as conn:
+            conn.execute(table.insert(), [{"id": v} for v in values])
+            found = conn.execute(select(table.c.id).where(table.c.id == values[1])).scalar()
+            matched = conn.execute(select(table.c.id).where(table.c.id.in_(values[:2]))).all()
+
+        assert found == values[1]
+        assert len(matched) == 2
+
+    def test_invalid_id_matches_nothing(self):
+        """A malformed ID is a miss rather than an error."""
+        engine, table = self.make_table()
+
+        with engine.begin() as conn:
+            conn.execute(table.insert(), {"id": str(uuid.uuid4())})
+            found = conn.execute(select(table.c.id).where(table.c.id == "not-a-uuid")).all()
+
+        assert found == []
+
+    def test_sixteen_character_id_matches_nothing(self):
+        """A 16-character non-UUID ID never equals a stored ID with the same bytes."""
+        engine, table = self.make_table()
+        value = "AAAAAAAAAAAAAAAA"
+
+        with engine.begin() as conn:
+            conn.execute(table.insert(), {"id": value.encode()})
+            found = conn.execute(select(table.c.id).where(table.c.id == value)).all()
+            listed = conn.execute(select(table.c.id).where(table.c.id.in_([value]))).all()
+
+        assert found == listed == []
@@ -0,0 +1,112 @@
+"""API tests for streaming task import.
+
+Covers:
+- NDJSON and CSV import
+- Per-line validation errors
+- Chunked inserts with positions appended after existing tasks
+- Round trip from the export endpoint
+"""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.models import Task
+from app.routers import tasks as tasks_router
+
+
+def _ndjson(records: list) -> str:
+    """Encode records as NDJSON."""
+    return "".join(json.dumps(record) + "\n" for record in records)
+
+
+class TestImportNdjson:
+    """Tests for POST /api/v1/tasks/import with NDJSON bodies."""
+
+    def test_import_ndjson_creates_tasks(self, client: TestClient):
+        """Each line becomes a task, in order."""
+        body = _ndjson([{"title": "One"}, {"title": "Two", "description": "Second"}])
+
+        response = client.post("/api/v1/tasks/import", content=body)
+
+        assert response.status_code == 200
+        assert response.json() == {"imported": 2, "failed": 0, "errors": []}
+        listed = client.get("/api/v1/tasks/").json()
+        assert [(t["title"], t["position"]) for t in listed] == [("One", 1), ("Two", 2)]
+        assert listed[1]["description"] == "Second"
+
+    def test_import_appends_after_existing_tasks(
+        self, client: TestClient, multiple_tasks: list[Task]
+    ):
+        """Imported tasks are positioned after the current last task."""
+        client.post("/api/v1/tasks/import", content=_ndjson([{"title": "Four"}]))
+
+        listed = client.get("/api/v1/tasks/").json()
+        assert listed[-1]["title"] == "Four"
+        assert listed[-1]["position"] == 4
+
+    def test_import_reports_invalid_lines(self, client: TestClient):
+        """Invalid lines are skipped and reported with their line number."""
+        body = '{"title": "Good"}\nnot json\n{"title": "  "}\n\n{"title": "Also good"}\n'
+
+        data = client.post("/api/v1/tasks/import", content=body).json()
+
+        assert data["imported"] == 2
+        assert data["failed"] == 2
+        assert [e["line"] for e in data["errors"]] == [2, 3]
+        assert data["errors"][1]["detail"][0]["loc"] == ["title"]
+
+    def test_import_inserts_in_chunks(
+        self, client: TestClient, db_session: Session, monkeypatch: pytest.MonkeyPatch
+    ):
+        """Records are committed in chunks with sequential positions."""
+        monkeypatch.setattr(tasks_router, "IMPORT_CHUNK_SIZE", 3)
+        body = _ndjson([{"title": f"Task {i}"} for i in range(10)])
+
+        data = client.post("/api/v1/tasks/import", content=body).json()
+
+        assert data["imported"] == 10
+        positions = [t.position for t in db_session.query(Task).order_by(Task.position)]
+        assert positions == list(range(1, 11))
+
+    def test_import_line_too_long_returns_413(
+        self, client: TestClient, monkeypatch: pytest.MonkeyPatch
+    ):
+        """A line over the length limit aborts the import."""
+        monkeypatch.setattr(tasks_router, "IMPORT_MAX_LINE_CHARS", 10)
+
+        response = client.post("/api/v1/tasks/import", content="x" * 50)
+
+        assert response.status_code == 413
+
+
+class TestImportCsv:
+    """Tests for POST /api/v1/tasks/import with CSV bodies."""
+
+    def test_import_csv_creates_tasks(self, client: TestClient):
+        """CSV rows are imported using the header for field names."""
+        body = (
+            "title,description,deadline\n"
+            'One,,\n"Two, quoted","multi\nline",2026-01-25T17:00:00\n'
+        )
+
+        data = client.post("/api/v1/tasks/import?format=csv", content=body).json()
+
+        assert data == {"imported": 2, "failed": 0, "errors": []}
+        listed = client.get("/api/v1/tasks/").json()
+        assert listed[0]["description"] is None
+        assert listed[1]["title"] == "Two, quoted"
+        assert listed[1]["description"] == "multi\nline"
+        assert listed[1]["deadline"] == "2026-01-25T17:00:00"
+
+    def test_export_csv_round_trips(self, client: TestClient, multiple_tasks: list[Task]):
+        """A CSV export can be imported back."""
+        exported = client.get("/api/v1/tasks/export?format=csv").text
+
+        data = client.post("/api/v1/tasks/import?format=csv", content=exported).json()
+
+        assert data["imported"] == 3
+        titles = [t["title"] for t in client.get("/api/v1/tasks/").json()]
+        assert titles == ["Task 1", "Task 2", "Task 3"] * 2
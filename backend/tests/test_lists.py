@@ -0,0 +1,170 @@
+"""Tests for task lists and per-list ordering."""
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models import DEFAULT_LIST_ID, Task
+
+from .conftest import engine
+
+
+def create_list(client: TestClient, name: str = "Groceries") -> str:
+    """Create a list through the API and return its ID."""
+    response = client.post("/api/v1/lists/", json={"name": name})
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def add_tasks(client: TestClient, list_id: str, *titles: str) -> list:
+    """Append tasks to a list through the API and return their IDs."""
+    return [
+        client.post(f"/api/v1/lists/{list_id}/tasks", json={"title": title}).json()["id"]
+        for title in titles
+    ]
+
+
+class TestListCrud:
+    """Tests for creating, renaming and deleting lists."""
+
+    def test_default_list_exists(self, client: TestClient):
+        """Every database starts with the default list."""
+        response = client.get("/api/v1/lists/")
+
+        assert [item["id"] for item in response.json()] == [DEFAULT_LIST_ID]
+
+    def test_create_and_rename(self, client: TestClient):
+        """A list can be created and renamed."""
+        list_id = create_list(client)
+
+        response = client.patch(f"/api/v1/lists/{list_id}", json={"name": "Errands"})
+
+        assert response.status_code == 200
+        assert client.get(f"/api/v1/lists/{list_id}").json()["name"] == "Errands"
+
+    def test_blank_name_rejected(self, client: TestClient):
+        """Whitespace-only names fail validation."""
+        response = client.post("/api/v1/lists/", json={"name": "   "})
+
+        assert response.status_code == 422
+
+    def test_unknown_list_returns_404(self, client: TestClient):
+        """Routes under an unknown list ID return 404."""
+        assert client.get("/api/v1/lists/missing").status_code == 404
+        assert client.get("/api/v1/lists/missing/tasks").status_code == 404
+        response = client.post("/api/v1/lists/missing/tasks", json={"title": "Lost"})
+        assert response.status_code == 404
+
+    def test_delete_removes_its_tasks_only(self, client: TestClient):
+        """Deleting a list deletes its tasks and leaves other lists alone."""
+        list_id = create_list(client)
+        add_tasks(client, list_id, "Milk")
+        client.post("/api/v1/tasks/", json={"title": "Kept"})
+
+        response = client.delete(f"/api/v1/lists/{list_id}")
+
+        assert response.status_code == 204
+        assert client.get(f"/api/v1/lists/{list_id}").status_code == 404
+        assert [t["title"] for t in client.get("/api/v1/tasks/").json()] == ["Kept"]
+
+    def test_default_list_cannot_be_deleted(self, client: TestClient):
+        """The list behind /api/v1/tasks is permanent."""
+        response = client.delete(f"/api/v1/lists/{DEFAULT_LIST_ID}")
+
+        assert response.status_code == 400
+
+
+class TestListTasks:
+    """Tests for per-list task routes."""
+
+    def test_positions_are_per_list(self, client: TestClient):
+        """Each list numbers its tasks from 1."""
+        first = create_list(client, "First")
+        second = create_list(client, "Second")
+        add_tasks(client, first, "A", "B")
+        add_tasks(client, second, "C")
+
+        listed = client.get(f"/api/v1/lists/{first}/tasks").json()
+        other = client.get(f"/api/v1/lists/{second}/tasks").json()
+
+        assert [(t["title"], t["position"]) for t in listed] == [("A", 1), ("B", 2)]
+        assert [(t["title"], t["position"], t["list_id"]) for t in other] == [
+            ("C", 1, second)
+        ]
+
+    def test_tasks_endpoint_serves_default_list(self, client: TestClient):
+        """/api/v1/tasks only lists and creates tasks in the default list."""
+        list_id = create_list(client)
+        add_tasks(client, list_id, "Elsewhere")
+
+        created = client.post("/api/v1/tasks/", json={"title": "Here"}).json()
+
+        assert created["list_id"] == DEFAULT_LIST_ID
+        assert created["position"] == 1
+        assert [t["title"] for t in client.get("/api/v1/tasks/").json()] == ["Here"]
+
+    def test_reorder_within_list(self, client: TestClient):
+        """Reordering a list renumbers only that list."""
+        list_id = create_list(client)
+        ids = add_tasks(client, list_id, "A", "B", "C")
+        default_ids = [client.post("/api/v1/tasks/", json={"title": "D"}).json()["id"]]
+
+        response = client.put(
+            f"/api/v1/lists/{list_id}/tasks/reorder", json={"task_ids": ids[::-1]}
+        )
+
+        assert response.status_code == 200
+        assert [t["title"] for t in response.json()] == ["C", "B", "A"]
+        assert [t["id"] for t in client.get("/api/v1/tasks/").json()] == default_ids
+
+    def test_reorder_rejects_tasks_from_another_list(self, client: TestClient):
+        """Task IDs from a different list do not count towards this one."""
+        list_id = create_list(client)
+        add_tasks(client, list_id, "A")
+        other = client.post("/api/v1/tasks/", json={"title": "B"}).json()["id"]
+
+        response = client.put(
+            f"/api/v1/lists/{list_id}/tasks/reorder", json={"task_ids": [other]}
+        )
+
+        assert response.status_code == 400
+
+    def test_list_queries_are_scoped_to_the_list(
+        self, client: TestClient, db_session: Session
+    ):
+        """List, append and reorder never read outside the list."""
+        list_id = create_list(client)
+        ids = add_tasks(client, list_id, "A", "B")
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            if "FROM tasks" in statement:
+                statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            client.get(f"/api/v1/lists/{list_id}/tasks")
+            ids += add_tasks(client, list_id, "C")
+            response = client.put(
+                f"/api/v1/lists/{list_id}/tasks/reorder", json={"task_ids": ids[::-1]}
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        assert response.status_code == 200
+        # Other than primary key lookups, every read is bounded by the list
+        scans = [s for s in statements if not s.rstrip().endswith("WHERE tasks.id = ?")]
+        assert scans
+        assert all("tasks.list_id = ?" in s for s in scans)
+
+    def test_unique_position_is_per_list(self, db_session: Session):
+        """The same position may be used once in each list."""
+        db_session.add_all(
+            [
+                Task(title="Default", position=1),
+                Task(title="Other", position=1, list_id="11111111-1111-1111-1111-111111111111"),
+            ]
+        )
+        db_session.commit()
+
+        assert db_session.query(Task).count() == 2
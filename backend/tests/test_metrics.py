@@ -0,0 +1,119 @@
+"""Tests for the Prometheus metrics endpoint and primitives.
+
+Covers:
+- Histogram buckets are cumulative and include +Inf, sum and count
+- Requests are recorded by route template, not raw path
+- Statement counts, compiled cache lookups and pool gauges are published
+"""
+
+from fastapi.testclient import TestClient
+
+from app.metrics import (
+    DB_COMPILED_CACHE,
+    Counter,
+    Gauge,
+    Histogram,
+    Registry,
+    instrument_engine,
+)
+from app.models import Task
+
+from .conftest import engine as test_engine
+
+
+class TestPrimitives:
+    """Tests for counters, gauges and histograms."""
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Bucket counts accumulate up to +Inf."""
+        registry = Registry()
+        histogram = Histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0), registry=registry)
+        for value in (0.05, 0.1, 0.5, 5.0):
+            histogram.observe(value)
+
+        text = registry.render()
+
+        assert 'latency_seconds_bucket{le="0.1"} 2' in text
+        assert 'latency_seconds_bucket{le="1"} 3' in text
+        assert 'latency_seconds_bucket{le="+Inf"} 4' in text
+        assert "latency_seconds_sum 5.65" in text
+        assert "latency_seconds_count 4" in text
+
+    def test_counter_and_gauge_render(self):
+        """Counters get a _total suffix and gauges can read from a callback."""
+        registry = Registry()
+        counter = Counter("jobs", "Jobs.", ("kind",), registry=registry)
+        gauge = Gauge("depth", "Depth.", registry=registry)
+        counter.labels('say "hi"').inc(2)
+        gauge.set_function(lambda: 7)
+
+        text = registry.render()
+
+        assert "# TYPE jobs counter" in text
+        assert 'jobs_total{kind="say \\"hi\\""} 2' in text
+        assert "depth 7" in text
+
+    def test_unlabelled_metrics_start_at_zero(self):
+        """Unlabelled metrics are rendered before any observation."""
+        registry = Registry()
+        Counter("events", "Events.", registry=registry)
+
+        assert "events_total 0" in registry.render()
+
+
+class TestMetricsEndpoint:
+    """Tests for GET /metrics."""
+
+    def test_metrics_endpoint_returns_text_format(self, client: TestClient):
+        """The endpoint serves the Prometheus text format."""
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert "# TYPE http_request_duration_seconds histogram" in response.text
+        assert "http_requests_in_flight" in response.text
+        assert "db_pool_checked_out" in response.text
+
+    def test_requests_labelled_by_route_template(self, client: TestClient, sample_task: Task):
+        """Requests for different IDs share the route template label."""
+        client.get(f"/api/v1/tasks/{sample_task.id}")
+        client.get("/api/v1/tasks/missing")
+
+        text = client.get("/metrics").text
+
+        assert (
+            'http_requests_total{method="GET",route="/api/v1/tasks/{task_id}",status="200"}'
+            in text
+        )
+        assert (
+            'http_requests_total{method="GET",route="/api/v1/tasks/{task_id}",status="404"}'
+            in text
+        )
+        assert sample_task.id not in text
+        assert (
+            'http_request_duration_seconds_count{method="GET",route="/api/v1/tasks/{task_id}"}'
+            in text
+        )
+
+    def test_statements_counted(self, client: TestClient):
+        """SQL statements on an instrumented engine are counted by type."""
+        instrument_engine(test_engine)
+
+        client.get("/api/v1/tasks/")
+
+        assert 'db_statements_total{type="SELECT"}' in client.get("/metrics").text
+
+    def test_compiled_cache_hits_counted(self, client: TestClient, sample_task: Task):
+        """Repeating a request reuses the compiled SQL of its statements."""
+        instrument_engine(test_engine)
+        client.get(f"/api/v1/tasks/{sample_task.id}")
+        hits = DB_COMPILED_CACHE.labels("hit").get()
+        misses = DB_COMPILED_CACHE.labels("miss").get()
+
+        client.get(f"/api/v1/tasks/{sample_task.id}")
+
+        assert DB_COMPILED_CACHE.labels("hit").get() > hits
+        assert DB_COMPILED_CACHE.labels("miss").get() == misses
+        text = client.get("/metrics").text
+        assert 'db_compiled_cache_lookups_total{result="hit"}' in text
+        assert "db_compiled_cache_entries" in text
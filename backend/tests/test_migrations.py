@@ -0,0 +1,272 @@
+"""Tests for schema versioning and migrations."""
+
+import threading
+
+import pytest
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.orm import Session
+
+from app import migrations
+from app.database import Base, enable_sqlite_transactions
+from app.migrations import (
+    HEAD_VERSION,
+    convert_ids,
+    current_version,
+    ensure_schema,
+    stored_id_storage,
+    upgrade,
+)
+from app.archive import archive_completed
+from app.models import ANONYMOUS_OWNER, DEFAULT_LIST_ID, Task
+
+# The tasks table as created before schema versioning
+LEGACY_TASKS_DDL = """
+CREATE TABLE tasks (
+    id VARCHAR(36) NOT NULL PRIMARY KEY,
+    title VARCHAR(200) NOT NULL,
+    description VARCHAR(2000),
+    is_complete BOOLEAN,
+    position INTEGER NOT NULL UNIQUE,
+    deadline DATETIME,
+    created_at DATETIME,
+    updated_at DATETIME
+)
+"""
+
+
+def trigger_names(engine) -> set:
+    """Names of the triggers in the database."""
+    with engine.connect() as conn:
+        return set(
+            conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'trigger'")).scalars()
+        )
+
+
+@pytest.fixture
+def file_engine(tmp_path):
+    """A file-backed SQLite engine configured like the application's."""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'schema.db'}", connect_args={"check_same_thread": False}
+    )
+    enable_sqlite_transactions(engine)
+    yield engine
+    engine.dispose()
+
+
+def version_of(engine):
+    """Read the recorded schema version of an engine's database."""
+    with engine.connect() as conn:
+        return current_version(conn)
+
+
+class TestEnsureSchema:
+    """Tests for startup schema checks."""
+
+    def test_new_database_is_created_at_head(self, file_engine):
+        """An empty database gets every table and the head version."""
+        ensure_schema(file_engine)
+
+        assert version_of(file_engine) == HEAD_VERSION
+        assert inspect(file_engine).has_table("tasks")
+
+    def test_current_schema_runs_no_ddl(self, file_engine):
+        """Startup against an up to date schema only reads the version."""
+        ensure_schema(file_engine)
+        statements = []
+        event.listen(
+            file_engine,
+            "before_cursor_execute",
+            lambda conn, cursor, statement, *args: statements.append(statement),
+        )
+
+        ensure_schema(file_engine)
+
+        assert f"SELECT version FROM {migrations.VERSION_TABLE}" in statements
+        ddl = ("CREATE", "ALTER", "DROP", "INSERT", "UPDATE", "DELETE")
+        assert not [s for s in statements if s.lstrip().upper().startswith(ddl)]
+
+    def test_unversioned_database_is_stamped_and_keeps_data(self, file_engine):
+        """A database created before versioning is upgraded in place."""
+        with file_engine.begin() as conn:
+            conn.execute(text(LEGACY_TASKS_DDL))
+            conn.execute(
+                text(
+                    "INSERT INTO tasks (id, title, is_complete, position, created_at, updated_at)"
+                    " VALUES ('a', 'Kept', 0, 1, '2026-01-01', '2026-01-01')"
+                )
+            )
+
+        ensure_schema(file_engine)
+
+        assert version_of(file_engine) == HEAD_VERSION
+        assert inspect(file_engine).has_table("archived_tasks")
+        with file_engine.connect() as conn:
+            row = conn.execute(text("SELECT title, list_id, owner_id FROM tasks")).one()
+            lists = conn.execute(text("SELECT id FROM task_lists")).scalars().all()
+            revisions = conn.execute(text("SELECT owner_id, revision FROM owner_revisions")).all()
+        assert row == ("Kept", DEFAULT_LIST_ID, ANONYMOUS_OWNER)
+        assert revisions == [(ANONYMOUS_OWNER, 1)]
+        assert lists == [DEFAULT_LIST_ID]
+        task_indexes = {index["name"] for index in inspect(file_engine).get_indexes("tasks")}
+        assert "ix_tasks_owner_id_deadline_id" in task_indexes
+        assert trigger_names(file_engine) == {
+            f"{table}_revision_{event_name}"
+            for table in ("tasks", "task_lists")
+            for event_name in ("insert", "update", "delete")
+        }
+
+    def test_refuses_out_of_date_schema_without_auto_migrate(self, file_engine):
+        """With AUTO_MIGRATE off, startup fails instead of running DDL."""
+        with pytest.raises(RuntimeError, match="app.migrations upgrade"):
+            ensure_schema(file_engine, auto_migrate=False)
+
+        assert not inspect(file_engine).has_table("tasks")
+
+    def test_refuses_newer_schema(self, file_engine):
+        """A schema from a newer release is not touched."""
+        ensure_schema(file_engine)
+        with file_engine.begin() as conn:
+            conn.execute(text("UPDATE schema_version SET version = :v"), {"v": HEAD_VERSION + 1})
+
+        with pytest.raises(RuntimeError, match="newer"):
+            ensure_schema(file_engine)
+
+
+class TestUpgrade:
+    """Tests for applying migrations."""
+
+    def test_pending_migrations_applied_in_order(self, file_engine, monkeypatch):
+        """Migrations newer than the recorded version run once, in order."""
+        applied = []
+        steps = [
+            migrations.Migration(1, "baseline", lambda conn: applied.append(1)),
+            migrations.Migration(
+                2,
+                "add column",
+                lambda conn: migrations.add_column(conn, "tasks", "notes", "VARCHAR(100)"),
+            ),
+            migrations.Migration(
+                3,
+                "add index",
+                lambda conn: migrations.create_index(conn, "ix_tasks_notes", "tasks", "notes"),
+            ),
+        ]
+        Base.metadata.create_all(file_engine)
+        monkeypatch.setattr(migrations, "MIGRATIONS", steps)
+        monkeypatch.setattr(migrations, "HEAD_VERSION", 3)
+
+        upgrade(file_engine)
+        upgrade(file_engine)
+
+        assert applied == []
+        assert version_of(file_engine) == 3
+        inspector = inspect(file_engine)
+        assert "notes" in {c["name"] for c in inspector.get_columns("tasks")}
+        assert "ix_tasks_notes" in {i["name"] for i in inspector.get_indexes("tasks")}
+
+    def test_concurrent_upgrades_serialise(self, file_engine):
+        """Workers booting together leave one version row and one schema."""
+        errors = []
+
+        def boot():
+            try:
+                upgrade(file_engine)
+            except Exception as exc:  # pragma: no cover - reported below
+                errors.append(exc)
+
+        threads = [threading.Thread(target=boot) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        with file_engine.connect() as conn:
+            assert conn.execute(text("SELECT count(*) FROM schema_version")).scalar() == 1
+        assert version_of(file_engine) == HEAD_VERSION
+
+
+class TestCommand:
+    """Tests for the command line interface."""
+
+    def test_upgrade_and_current(self, file_engine, monkeypatch, capsys):
+        """upgrade migrates the configured database and current reports it."""
+        monkeypatch.setattr(migrations, "engine", file_engine)
+
+        assert migrations.main(["upgrade"]) == 0
+        assert migrations.main(["current"]) == 0
+
+        assert capsys.readouterr().out.splitlines()[-1] == str(HEAD_VERSION)
+
+
+class TestConvertIds:
+    """Tests for converting task ID storage."""
+
+    def test_round_trip_preserves_ids_and_rows(self, file_engine):
+        """IDs survive conversion to binary and back, and so do the rows."""
+        ensure_schema(file_engine)
+        with Session(file_engine) as session:
+            session.add_all(Task(title=f"Task {i}", position=i) for i in range(1, 4))
+            session.add(Task(title="Done", position=4, is_complete=True))
+            session.commit()
+            archive_completed(session)
+        with file_engine.connect() as conn:
+            original = conn.execute(text("SELECT id, title FROM tasks ORDER BY position")).all()
+
+        # Three active tasks, one archived task and the default list
+        assert convert_ids(file_engine, "binary") == 5
+
+        with file_engine.connect() as conn:
+            for table in ("task_lists", "tasks", "archived_tasks"):
+                assert stored_id_storage(conn, table) == "binary"
+                types = conn.execute(
+                    text(f"SELECT DISTINCT typeof(id), length(id) FROM {table}")
+                ).all()
+                assert types == [("blob", 16)]
+            list_ids = conn.execute(text("SELECT DISTINCT typeof(list_id) FROM tasks")).all()
+            assert list_ids == [("blob",)]
+
+        assert convert_ids(file_engine, "text") == 5
+
+        with file_engine.connect() as conn:
+            restored = conn.execute(text("SELECT id, title FROM tasks ORDER BY position")).all()
+            indexes = {i["name"] for i in inspect(conn).get_indexes("archived_tasks")}
+        assert restored == original
+        assert "ix_archived_tasks_owner_id_archived_at_id" in indexes
+
+    def test_rebuild_keeps_revision_triggers(self, file_engine):
+        """Converted tables still bump owner revisions when written."""
+        ensure_schema(file_engine)
+        triggers = trigger_names(file_engine)
+
+        convert_ids(file_engine, "binary")
+        with Session(file_engine) as session:
+            session.add(Task(title="After", position=1))
+            session.commit()
+
+        assert trigger_names(file_engine) == triggers
+        with file_engine.connect() as conn:
+            revision = conn.execute(text("SELECT revision FROM owner_revisions")).scalar()
+        assert revision > 0
+
+    def test_already_converted_is_a_no_op(self, file_engine):
+        """Converting to the current storage does nothing."""
+        ensure_schema(file_engine)
+
+        assert convert_ids(file_engine, "text") == 0
+
+    def test_refuses_out_of_date_schema(self, file_engine):
+        """Tables are rebuilt from the current models, so upgrade must run first."""
+        with file_engine.begin() as conn:
+            conn.execute(text(LEGACY_TASKS_DDL))
+
+        with pytest.raises(RuntimeError, match="upgrade"):
+            convert_ids(file_engine, "binary")
+
+    def test_startup_refuses_mismatched_storage(self, file_engine):
+        """Startup fails when stored IDs do not match ID_STORAGE."""
+        ensure_schema(file_engine)
+        convert_ids(file_engine, "binary")
+
+        with pytest.raises(RuntimeError, match="convert-ids text"):
+            ensure_schema(file_engine)
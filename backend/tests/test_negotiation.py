@@ -0,0 +1,144 @@
+"""Tests for MessagePack content negotiation on the tasks API."""
+
+from datetime import datetime, timezone
+from typing import List
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models import Task
+from app.negotiation import accepted_encoding
+from app.responses import JSON, MSGPACK
+
+msgpack = pytest.importorskip("msgpack")
+
+MSGPACK_HEADERS = {"Accept": "application/msgpack"}
+MSGPACK_BODY = {"Content-Type": "application/msgpack"}
+
+
+def unpack(body: bytes):
+    """Decode a response body with timestamps as aware datetimes."""
+    return msgpack.unpackb(body, timestamp=3)
+
+
+class TestAcceptedEncoding:
+    """Tests for choosing a response encoding from the Accept header."""
+
+    @pytest.mark.parametrize(
+        "accept, expected",
+        [
+            (None, JSON),
+            ("*/*", JSON),
+            ("application/json", JSON),
+            ("application/msgpack", MSGPACK),
+            ("application/x-msgpack", MSGPACK),
+            ("application/msgpack, application/json", MSGPACK),
+            ("application/json, application/msgpack;q=0.5", JSON),
+            ("application/msgpack;q=0", JSON),
+        ],
+    )
+    def test_msgpack_only_when_preferred(self, accept, expected):
+        """MessagePack must be named and at least as preferred as JSON."""
+        assert accepted_encoding(accept) is expected
+
+
+class TestMsgpackResponses:
+    """Tests for MessagePack responses from the tasks router."""
+
+    def test_list_matches_json(self, client: TestClient, multiple_tasks: List[Task]):
+        """The list decodes to the JSON body, with datetimes as timestamps."""
+        as_json = client.get("/api/v1/tasks/").json()
+
+        response = client.get("/api/v1/tasks/", headers=MSGPACK_HEADERS)
+
+        assert response.headers["content-type"] == "application/msgpack"
+        assert "Accept" in response.headers["vary"]
+        tasks = unpack(response.content)
+        assert [t["id"] for t in tasks] == [t["id"] for t in as_json]
+        created = tasks[0]["created_at"]
+        assert isinstance(created, datetime) and created.tzinfo == timezone.utc
+        assert created.replace(tzinfo=None).isoformat() == as_json[0]["created_at"]
+
+    def test_single_task_routes(self, client: TestClient):
+        """Create and get answer in MessagePack; errors stay JSON."""
+        created = client.post(
+            "/api/v1/tasks/", json={"title": "Packed"}, headers=MSGPACK_HEADERS
+        )
+        task = unpack(created.content)
+        fetched = client.get(f"/api/v1/tasks/{task['id']}", headers=MSGPACK_HEADERS)
+        missing = client.get("/api/v1/tasks/missing", headers=MSGPACK_HEADERS)
+
+        assert created.status_code == 201
+        assert unpack(fetched.content) == task
+        assert missing.status_code == 404
+        assert missing.json() == {"detail": "Task not found"}
+
+    def test_default_stays_json(self, client: TestClient, multiple_tasks: List[Task]):
+        """Clients that do not ask for MessagePack get the same JSON as before."""
+        response = client.get("/api/v1/tasks/", headers={"Accept": "*/*"})
+
+        assert response.headers["content-type"] == "application/json"
+        assert response.headers["vary"] == "Accept"
+
+    def test_archive_pages(self, client: TestClient, multiple_tasks: List[Task]):
+        """Archive pages, cursors included, are encoded in MessagePack."""
+        client.patch(f"/api/v1/tasks/{multiple_tasks[0].id}", json={"is_complete": True})
+        archived = client.post("/api/v1/tasks/archive", json={}, headers=MSGPACK_HEADERS)
+        first = client.get("/api/v1/tasks/archive?limit=1", headers=MSGPACK_HEADERS)
+
+        page = unpack(first.content)
+
+        assert unpack(archived.content) == {"archived": 2}
+        assert len(page["items"]) == 1
+        assert isinstance(page["items"][0]["archived_at"], datetime)
+        after = client.get(
+            "/api/v1/tasks/archive",
+            params={"limit": 1, "cursor": page["next_cursor"]},
+            headers=MSGPACK_HEADERS,
+        )
+        assert len(unpack(after.content)["items"]) == 1
+
+    def test_export_stream(self, client: TestClient, multiple_tasks: List[Task]):
+        """The msgpack export is a stream of one map per task."""
+        response = client.get("/api/v1/tasks/export?format=msgpack")
+
+        unpacker = msgpack.Unpacker(timestamp=3)
+        unpacker.feed(response.content)
+        rows = list(unpacker)
+        assert response.headers["content-type"] == "application/msgpack"
+        assert [r["title"] for r in rows] == ["Task 1", "Task 2", "Task 3"]
+        assert isinstance(rows[0]["created_at"], datetime)
+
+
+class TestMsgpackRequests:
+    """Tests for MessagePack request bodies."""
+
+    def test_create_with_deadline(self, client: TestClient):
+        """Packed bodies are accepted; timestamps become naive UTC deadlines."""
+        deadline = datetime(2026, 5, 1, 12, 30, tzinfo=timezone.utc)
+        body = msgpack.packb({"title": "Packed", "deadline": deadline}, datetime=True)
+
+        response = client.post("/api/v1/tasks/", content=body, headers=MSGPACK_BODY)
+
+        assert response.status_code == 201
+        assert response.json()["deadline"] == "2026-05-01T12:30:00"
+
+    def test_import_stream_round_trip(self, client: TestClient, multiple_tasks: List[Task]):
+        """An exported msgpack stream imports back as new tasks."""
+        exported = client.get("/api/v1/tasks/export?format=msgpack").content
+
+        response = client.post(
+            "/api/v1/tasks/import", content=iter([exported[:7], exported[7:]]),
+            headers={**MSGPACK_BODY, **MSGPACK_HEADERS},
+        )
+
+        assert unpack(response.content) == {"imported": 3, "failed": 0, "errors": []}
+        titles = [t["title"] for t in client.get("/api/v1/tasks/").json()]
+        assert titles == ["Task 1", "Task 2", "Task 3"] * 2
+
+    @pytest.mark.parametrize("body", [b"\xc1", msgpack.packb({"title": "Cut off"})[:-2]])
+    def test_invalid_body_is_400(self, client: TestClient, body: bytes):
+        """Malformed and truncated bodies are rejected."""
+        response = client.post("/api/v1/tasks/", content=body, headers=MSGPACK_BODY)
+
+        assert response.status_code == 400
@@ -0,0 +1,146 @@
+"""Tests for per-owner task scoping."""
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.models import ANONYMOUS_OWNER, OWNER_ID_LENGTH, Task
+from app.owners import owner_id_for
+
+ALICE = {"Authorization": "Bearer alice-token"}
+BOB = {"Authorization": "Bearer bob-token"}
+
+
+def create_tasks(client: TestClient, headers: dict, *titles: str) -> list:
+    """Create tasks as one owner and return their IDs."""
+    return [
+        client.post("/api/v1/tasks/", json={"title": title}, headers=headers).json()["id"]
+        for title in titles
+    ]
+
+
+class TestOwnerId:
+    """Tests for deriving owner IDs from the Authorization header."""
+
+    def test_missing_header_is_anonymous(self):
+        """Requests without credentials share the anonymous owner."""
+        assert owner_id_for(None) == ANONYMOUS_OWNER
+        assert owner_id_for("  ") == ANONYMOUS_OWNER
+
+    def test_token_is_hashed_to_fixed_length(self):
+        """The credential itself is never stored."""
+        owner_id = owner_id_for("Bearer secret")
+
+        assert len(owner_id) == OWNER_ID_LENGTH
+        assert "secret" not in owner_id
+        assert owner_id == owner_id_for("Bearer secret")
+        assert owner_id != owner_id_for("Bearer other")
+
+
+class TestTaskScoping:
+    """Tests that owners only see and change their own tasks."""
+
+    def test_lists_and_positions_are_per_owner(self, client: TestClient):
+        """Each owner has their own list, numbered from 1."""
+        create_tasks(client, ALICE, "A1", "A2")
+        create_tasks(client, BOB, "B1")
+
+        alice = client.get("/api/v1/tasks/", headers=ALICE).json()
+        bob = client.get("/api/v1/tasks/", headers=BOB).json()
+
+        assert [(t["title"], t["position"]) for t in alice] == [("A1", 1), ("A2", 2)]
+        assert [(t["title"], t["position"]) for t in bob] == [("B1", 1)]
+        assert client.get("/api/v1/tasks/").json() == []
+
+    def test_other_owners_tasks_are_not_found(self, client: TestClient):
+        """Get, update and delete return 404 for another owner's task."""
+        (task_id,) = create_tasks(client, ALICE, "Private")
+
+        assert client.get(f"/api/v1/tasks/{task_id}", headers=BOB).status_code == 404
+        response = client.patch(
+            f"/api/v1/tasks/{task_id}", json={"title": "Taken"}, headers=BOB
+        )
+        assert response.status_code == 404
+        assert client.delete(f"/api/v1/tasks/{task_id}", headers=BOB).status_code == 404
+        assert client.get(f"/api/v1/tasks/{task_id}", headers=ALICE).json()["title"] == "Private"
+
+    def test_reorder_counts_only_own_tasks(self, client: TestClient):
+        """Reorder validates against the owner's tasks alone."""
+        alice_ids = create_tasks(client, ALICE, "A1", "A2")
+        bob_ids = create_tasks(client, BOB, "B1")
+
+        response = client.put(
+            "/api/v1/tasks/reorder", json={"task_ids": alice_ids[::-1]}, headers=ALICE
+        )
+        rejected = client.put(
+            "/api/v1/tasks/reorder", json={"task_ids": bob_ids}, headers=ALICE
+        )
+
+        assert response.status_code == 200
+        assert [t["title"] for t in response.json()] == ["A2", "A1"]
+        assert rejected.status_code == 400
+
+    def test_lists_are_private(self, client: TestClient):
+        """Another owner's lists are invisible; the default list is shared."""
+        list_id = client.post("/api/v1/lists/", json={"name": "Mine"}, headers=ALICE).json()["id"]
+
+        bob_lists = client.get("/api/v1/lists/", headers=BOB).json()
+
+        assert list_id not in [item["id"] for item in bob_lists]
+        assert len(bob_lists) == 1
+        assert client.get(f"/api/v1/lists/{list_id}/tasks", headers=BOB).status_code == 404
+
+    def test_batch_runs_as_request_owner(self, client: TestClient):
+        """Batch operations are scoped to the batch request's owner."""
+        (task_id,) = create_tasks(client, ALICE, "Private")
+
+        response = client.post(
+            "/api/v1/batch",
+            json={
+                "operations": [
+                    {"method": "POST", "path": "/api/v1/tasks/", "body": {"title": "Bob's"}},
+                    {"method": "GET", "path": f"/api/v1/tasks/{task_id}"},
+                ]
+            },
+            headers=BOB,
+        )
+
+        assert [r["status"] for r in response.json()["results"]] == [201, 404]
+        assert [t["title"] for t in client.get("/api/v1/tasks/", headers=BOB).json()] == [
+            "Bob's"
+        ]
+
+    def test_archive_is_per_owner(self, client: TestClient):
+        """Owners archive and page through only their own completed tasks."""
+        (alice_id,) = create_tasks(client, ALICE, "A")
+        (bob_id,) = create_tasks(client, BOB, "B")
+        for task_id, headers in ((alice_id, ALICE), (bob_id, BOB)):
+            client.patch(f"/api/v1/tasks/{task_id}", json={"is_complete": True}, headers=headers)
+
+        archived = client.post("/api/v1/tasks/archive", json={}, headers=ALICE).json()
+        page = client.get("/api/v1/tasks/archive", headers=ALICE).json()
+
+        assert archived == {"archived": 1}
+        assert [item["id"] for item in page["items"]] == [alice_id]
+        assert client.get("/api/v1/tasks/archive", headers=BOB).json()["items"] == []
+
+
+class TestOwnerIndexes:
+    """Tests that owner-scoped queries use the composite indexes."""
+
+    def test_list_query_searches_owner_index(self, db_session: Session):
+        """Listing an owner's tasks is an index range scan, not a table scan."""
+        db_session.add(Task(title="Task", position=1))
+        db_session.commit()
+
+        plan = db_session.execute(
+            text(
+                "EXPLAIN QUERY PLAN SELECT * FROM tasks "
+                "WHERE owner_id = :owner AND list_id = :list ORDER BY position"
+            ),
+            {"owner": ANONYMOUS_OWNER, "list": "x"},
+        ).all()
+        details = " ".join(row[-1] for row in plan)
+
+        assert "SEARCH tasks USING INDEX" in details
+        assert "TEMP B-TREE" not in details
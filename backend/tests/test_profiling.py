@@ -0,0 +1,115 @@
+"""Tests for on-demand request profiling.
+
+Covers:
+- Profiles are only taken with the trigger and a valid token
+- pstats and speedscope output, as a download or written to a directory
+- Sync endpoints running in worker threads are included
+"""
+
+import json
+import marshal
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.models import Task
+from app.profiling import ProfilingMiddleware
+from app.routers import tasks
+
+TOKEN = "s3cret"
+
+
+def _make_client(db_session: Session, directory: str = "") -> TestClient:
+    """Client for an app with profiling enabled."""
+    app = FastAPI()
+    app.include_router(tasks.router)
+    app.add_middleware(ProfilingMiddleware, token=TOKEN, directory=directory)
+    app.dependency_overrides[get_db] = lambda: db_session
+    return TestClient(app)
+
+
+@pytest.fixture
+def profiled_client(db_session: Session):
+    """Client returning profiles as downloads."""
+    with _make_client(db_session) as client:
+        yield client
+
+
+class TestProfilingTrigger:
+    """Tests for when a request is profiled."""
+
+    def test_untriggered_request_passes_through(
+        self, profiled_client: TestClient, sample_task: Task
+    ):
+        """Requests without the trigger are served normally."""
+        response = profiled_client.get("/api/v1/tasks/")
+
+        assert response.json()[0]["id"] == sample_task.id
+        assert "x-profile-status" not in response.headers
+
+    @pytest.mark.parametrize("token", [None, "wrong"])
+    def test_trigger_without_valid_token_is_ignored(
+        self, profiled_client: TestClient, token
+    ):
+        """The trigger alone, or with a wrong token, does not profile."""
+        headers = {"X-Profile": "1"}
+        if token:
+            headers["X-Profile-Token"] = token
+
+        response = profiled_client.get("/api/v1/tasks/", headers=headers)
+
+        assert response.json() == []
+
+
+class TestProfileOutput:
+    """Tests for the profile formats and destinations."""
+
+    def test_pstats_download_includes_sync_endpoint(
+        self, profiled_client: TestClient, sample_task: Task
+    ):
+        """The pstats download covers the endpoint run in the worker thread."""
+        response = profiled_client.get(
+            "/api/v1/tasks/?profile=1", headers={"X-Profile-Token": TOKEN}
+        )
+
+        assert response.status_code == 200
+        assert response.headers["x-profile-status"] == "200"
+        assert response.headers["content-disposition"].endswith('.pstats"')
+        stats = marshal.loads(response.content)
+        assert any(name == "list_tasks" for _, _, name in stats)
+
+    def test_speedscope_download(self, profiled_client: TestClient, sample_task: Task):
+        """The speedscope format is a sampled profile with frames."""
+        response = profiled_client.get(
+            "/api/v1/tasks/missing",
+            headers={
+                "X-Profile": "1",
+                "X-Profile-Token": TOKEN,
+                "X-Profile-Format": "speedscope",
+            },
+        )
+
+        assert response.headers["x-profile-status"] == "404"
+        data = json.loads(response.content)
+        profile = data["profiles"][0]
+        assert profile["type"] == "sampled"
+        assert len(profile["samples"]) == len(profile["weights"])
+        assert any(frame["name"] == "get_task" for frame in data["shared"]["frames"])
+
+    def test_profile_written_to_directory(
+        self, db_session: Session, sample_task: Task, tmp_path: Path
+    ):
+        """With a directory configured the normal response is returned."""
+        with _make_client(db_session, directory=str(tmp_path)) as client:
+            response = client.get(
+                "/api/v1/tasks/", headers={"X-Profile": "1", "X-Profile-Token": TOKEN}
+            )
+
+        assert response.json()[0]["id"] == sample_task.id
+        written = tmp_path / response.headers["x-profile-file"]
+        assert written.exists()
+        assert written.name.startswith("profile-")
@@ -0,0 +1,138 @@
+"""Tests for the readiness probe and /ready endpoint."""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool
+
+from app import main
+from app.database import enable_sqlite_transactions
+from app.migrations import VERSION_TABLE, upgrade
+from app.readiness import ReadinessProbe, pool_status
+
+from .conftest import engine as test_engine
+
+
+@pytest.fixture
+def file_engine(tmp_path):
+    """A migrated file-backed SQLite engine with a small fixed-size pool."""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'ready.db'}",
+        poolclass=QueuePool,
+        pool_size=2,
+        max_overflow=0,
+    )
+    enable_sqlite_transactions(engine)
+    upgrade(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def versioned_test_engine(db_session):
+    """The shared test database with the version table migrations would create."""
+    with test_engine.begin() as conn:
+        conn.execute(text(f"CREATE TABLE {VERSION_TABLE} (version INTEGER NOT NULL)"))
+        conn.execute(text(f"INSERT INTO {VERSION_TABLE} (version) VALUES (1)"))
+    yield test_engine
+    with test_engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE {VERSION_TABLE}"))
+
+
+class TestReadinessProbe:
+    """Tests for ReadinessProbe."""
+
+    def test_ready_when_query_is_fast(self, file_engine):
+        """A healthy database is ready and reports its latency and pool."""
+        result = ReadinessProbe(file_engine, max_latency_ms=1000).check()
+
+        assert result.ready
+        assert result.latency_ms is not None
+        assert result.pool == {"size": 2, "checked_out": 0, "overflow": 0, "capacity": 2}
+
+    def test_unavailable_when_latency_over_threshold(self, file_engine):
+        """A query slower than the threshold makes the service unavailable."""
+        result = ReadinessProbe(file_engine, max_latency_ms=-1).check()
+
+        assert not result.ready
+        assert "latency" in result.reasons[0]
+
+    def test_unavailable_when_pool_saturated(self, file_engine):
+        """A saturated pool fails without waiting for a connection."""
+        probe = ReadinessProbe(file_engine, max_latency_ms=1000, max_pool_usage=1.0)
+        held = [file_engine.connect(), file_engine.connect()]
+        try:
+            result = probe.check()
+        finally:
+            for conn in held:
+                conn.close()
+
+        assert not result.ready
+        assert result.latency_ms is None
+        assert result.pool["checked_out"] == 2
+        assert "pool" in result.reasons[0]
+
+    def test_unavailable_when_database_locked(self, tmp_path):
+        """A database another connection holds exclusively is not ready, without a long wait."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'locked.db'}")
+        enable_sqlite_transactions(engine)
+        upgrade(engine)
+        locker = create_engine(f"sqlite:///{tmp_path / 'locked.db'}", isolation_level=None)
+        try:
+            with locker.connect() as held:
+                held.exec_driver_sql("BEGIN EXCLUSIVE")
+                result = ReadinessProbe(engine, max_latency_ms=50, ttl=0).check()
+                held.exec_driver_sql("ROLLBACK")
+            after = ReadinessProbe(engine, max_latency_ms=1000, ttl=0).check()
+            with engine.connect() as conn:
+                busy_timeout = conn.exec_driver_sql("PRAGMA busy_timeout").scalar()
+        finally:
+            locker.dispose()
+            engine.dispose()
+
+        assert not result.ready
+        assert result.latency_ms is None
+        assert "OperationalError" in result.reasons[0]
+        assert after.ready
+        assert busy_timeout == 5000
+
+    def test_result_is_cached_for_ttl(self, file_engine):
+        """Checks within the TTL reuse the previous result."""
+        probe = ReadinessProbe(file_engine, ttl=60)
+
+        assert probe.cached() is None
+        first = probe.check()
+
+        assert probe.check() is first
+        assert probe.cached() is first
+
+    def test_pool_without_fixed_size(self):
+        """Pools that do not track capacity report None for it."""
+        assert pool_status(test_engine)["capacity"] is None
+
+
+class TestReadyEndpoint:
+    """Tests for GET /ready."""
+
+    def test_ready_returns_200(self, client: TestClient, monkeypatch, versioned_test_engine):
+        """/ready returns 200 when the database responds."""
+        monkeypatch.setattr(main, "readiness_probe", ReadinessProbe(versioned_test_engine, ttl=0))
+
+        response = client.get("/ready")
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "ready"
+
+    def test_unavailable_returns_503(
+        self, client: TestClient, monkeypatch, versioned_test_engine
+    ):
+        """/ready returns 503 with reasons when a threshold is crossed."""
+        probe = ReadinessProbe(versioned_test_engine, max_latency_ms=-1, ttl=0)
+        monkeypatch.setattr(main, "readiness_probe", probe)
+
+        response = client.get("/ready")
+
+        assert response.status_code == 503
+        body = response.json()
+        assert body["status"] == "unavailable"
+        assert body["reasons"]
@@ -0,0 +1,99 @@
+"""Tests for the fast JSON response paths."""
+
+from datetime import datetime
+from typing import List
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+
+from app import responses
+from app.models import Task
+from app.responses import FastJSONResponse, encode_json
+from app.schemas import TaskResponse
+
+ADAPTER = TypeAdapter(List[TaskResponse])
+
+# Strings that JSON encoders are most likely to escape differently
+AWKWARD_TEXT = [
+    'quote " backslash \\ slash /',
+    "newline \n tab \t control \x01 \x1f delete \x7f",
+    "Über naïve ✓ 日本 😀",
+    "separators    ",
+]
+
+
+def fastapi_encoding(value) -> bytes:
+    """How FastAPI encodes a response_model result by default."""
+    return JSONResponse(jsonable_encoder(ADAPTER.validate_python(value, from_attributes=True))).body
+
+
+def awkward_tasks() -> List[Task]:
+    """Tasks covering every field type and edge case in the response model."""
+    return [
+        Task(
+            id=f"{i:08d}-0000-4000-8000-000000000000",
+            owner_id="anonymous",
+            list_id="00000000-0000-0000-0000-000000000000",
+            title=text,
+            description=None if i % 2 else text,
+            is_complete=bool(i % 2),
+            position=i,
+            deadline=datetime(2026, 3, 1, 9, 30, 0, 123456) if i % 2 else None,
+            created_at=datetime(2026, 1, 1),
+            updated_at=datetime(2026, 1, 1, 0, 0, 0, 5),
+        )
+        for i, text in enumerate(AWKWARD_TEXT, start=1)
+    ]
+
+
+class TestEncodeJson:
+    """Tests that the adapter path matches FastAPI's default encoding."""
+
+    def test_byte_identical_to_default_path(self):
+        """Escapes, non-ASCII text, nulls and datetimes all match exactly."""
+        tasks = awkward_tasks()
+
+        assert encode_json(ADAPTER, tasks) == fastapi_encoding(tasks)
+
+    @pytest.mark.parametrize("orjson_available", [True, False])
+    def test_fast_response_matches_json_response(self, monkeypatch, orjson_available):
+        """The response class renders the same bytes with or without orjson."""
+        if not orjson_available:
+            monkeypatch.setattr(responses, "orjson", None)
+        content = jsonable_encoder(ADAPTER.validate_python(awkward_tasks(), from_attributes=True))
+
+        assert FastJSONResponse(content).body == JSONResponse(content).body
+
+
+class TestRoutes:
+    """Tests that routes answer with the same bodies and statuses as before."""
+
+    def test_single_task_routes(self, client: TestClient, db_session: Session):
+        """Create, get and update return their task as FastAPI would."""
+        created = client.post("/api/v1/tasks/", json={"title": AWKWARD_TEXT[2]})
+        task_id = created.json()["id"]
+        fetched = client.get(f"/api/v1/tasks/{task_id}")
+        updated = client.patch(f"/api/v1/tasks/{task_id}", json={"title": AWKWARD_TEXT[1]})
+
+        task = db_session.get(Task, task_id)
+        db_session.refresh(task)
+        assert created.status_code == 201
+        assert created.headers["content-type"] == "application/json"
+        assert fetched.content == created.content
+        assert updated.content == fastapi_encoding([task])[1:-1]
+
+    def test_reorder_returns_reordered_tasks(
+        self, client: TestClient, db_session: Session, multiple_tasks: List[Task]
+    ):
+        """The reorder body is the encoded tasks in their new order."""
+        order = [t.id for t in reversed(multiple_tasks)]
+
+        response = client.put("/api/v1/tasks/reorder", json={"task_ids": order})
+
+        db_session.expire_all()
+        tasks = [db_session.get(Task, task_id) for task_id in order]
+        assert response.content == fastapi_encoding(tasks)
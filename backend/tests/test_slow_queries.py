@@ -0,0 +1,121 @@
+"""Tests for the slow statement log.
+
+Covers:
+- Slow statements are logged as JSON with parameter shapes, not values
+- The originating route is recorded
+- EXPLAIN QUERY PLAN is captured once per distinct statement
+- Failed statements leave nothing behind on the connection
+"""
+
+import json
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import StaticPool, create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app import slow_queries
+from app.database import Base, get_db
+from app.models import Task
+from app.routers import tasks
+
+
+@pytest.fixture
+def slow_engine():
+    """A SQLite engine on which every statement counts as slow."""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    slow_queries.instrument_engine(engine, threshold_ms=0)
+    yield engine
+    engine.dispose()
+
+
+def _records(caplog: pytest.LogCaptureFixture) -> list:
+    """Parse the JSON records captured from the slow query logger."""
+    return [
+        json.loads(r.getMessage()) for r in caplog.records if r.name == "app.slow_queries"
+    ]
+
+
+class TestSlowQueryLog:
+    """Tests for slow statement records."""
+
+    def test_record_has_shape_not_values(
+        self, slow_engine, caplog: pytest.LogCaptureFixture
+    ):
+        """Parameters are logged by type so values never reach the log."""
+        with caplog.at_level(logging.WARNING, logger="app.slow_queries"):
+            with slow_engine.connect() as conn:
+                conn.execute(
+                    text("SELECT * FROM tasks WHERE title = :title AND position > :position"),
+                    {"title": "secret title", "position": 3},
+                )
+
+        record = _records(caplog)[-1]
+        assert record["statement"].startswith("SELECT * FROM tasks")
+        assert record["parameters"] == ["str", "int"]
+        assert record["duration_ms"] >= 0
+        assert record["route"] is None
+        assert "secret title" not in caplog.text
+
+    def test_plan_captured_once_per_statement(
+        self, slow_engine, caplog: pytest.LogCaptureFixture
+    ):
+        """EXPLAIN QUERY PLAN is attached only to the first occurrence."""
+        statement = text("SELECT id FROM tasks WHERE deadline < :cutoff")
+        with caplog.at_level(logging.WARNING, logger="app.slow_queries"):
+            with slow_engine.connect() as conn:
+                conn.execute(statement, {"cutoff": "2026-01-01"})
+                conn.execute(statement, {"cutoff": "2026-02-01"})
+
+        records = [r for r in _records(caplog) if "deadline <" in r["statement"]]
+        assert len(records) == 2
+        assert any("SCAN tasks" in step for step in records[0]["plan"])
+        assert "plan" not in records[1]
+
+    def test_failed_statements_leave_no_state(
+        self, slow_engine, caplog: pytest.LogCaptureFixture
+    ):
+        """Statements that raise are not logged and keep nothing on the connection."""
+        with caplog.at_level(logging.WARNING, logger="app.slow_queries"):
+            with slow_engine.connect() as conn:
+                for _ in range(3):
+                    with pytest.raises(OperationalError):
+                        conn.execute(text("SELECT * FROM missing_table"))
+                    conn.rollback()
+                conn.execute(text("SELECT count(*) FROM tasks"))
+                info = dict(conn.info)
+
+        assert [r["statement"] for r in _records(caplog)] == ["SELECT count(*) FROM tasks"]
+        assert info == {}
+
+    def test_executemany_shape(self):
+        """executemany parameters report the row count and first row shape."""
+        shape = slow_queries.parameter_shape([("a", 1), ("b", 2)], executemany=True)
+
+        assert shape == {"rows": 2, "shape": ["str", "int"]}
+
+    def test_route_recorded_for_requests(
+        self, slow_engine, caplog: pytest.LogCaptureFixture
+    ):
+        """Statements issued while serving a request carry its route template."""
+        app = FastAPI()
+        app.include_router(tasks.router)
+        app.add_middleware(slow_queries.SlowQueryMiddleware)
+        session = Session(slow_engine)
+        session.add(Task(title="Task", position=1))
+        session.commit()
+        app.dependency_overrides[get_db] = lambda: session
+
+        with caplog.at_level(logging.WARNING, logger="app.slow_queries"):
+            with TestClient(app) as client:
+                client.get("/api/v1/tasks/")
+
+        routes = {r["route"] for r in _records(caplog)}
+        assert "GET /api/v1/tasks/" in routes
+        session.close()
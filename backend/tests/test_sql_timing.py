@@ -0,0 +1,153 @@
+"""Tests for per-request SQL instrumentation.
+
+Covers:
+- Server-Timing header with db, db-count and serialize metrics
+- Budget and repeated-statement (N+1) warnings
+- Reorder loads its result without a query per task
+"""
+
+import logging
+import time
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel, TypeAdapter, field_serializer
+from sqlalchemy.orm import Session
+
+from app import sql_timing
+from app.database import get_db
+from app.models import Task
+from app.responses import respond
+from app.routers import tasks
+from app.routing import InstrumentedRoute
+
+from .conftest import engine as test_engine
+
+
+@pytest.fixture
+def timed_client(db_session: Session):
+    """Client for an app with the Server-Timing middleware enabled."""
+    timed_app = FastAPI()
+    timed_app.include_router(tasks.router)
+    timed_app.add_middleware(sql_timing.ServerTimingMiddleware)
+    timed_app.dependency_overrides[get_db] = lambda: db_session
+    sql_timing.instrument_engine(test_engine)
+    with TestClient(timed_app) as test_client:
+        yield test_client
+
+
+def _timing(response) -> dict:
+    """Parse a Server-Timing header into {name: value}."""
+    metrics = {}
+    for entry in response.headers["server-timing"].split(", "):
+        name, param = entry.split(";", 1)
+        metrics[name] = float(param.split("=", 1)[1])
+    return metrics
+
+
+class TestServerTiming:
+    """Tests for the Server-Timing header."""
+
+    def test_header_reports_db_and_serialize(
+        self, timed_client: TestClient, multiple_tasks: list[Task]
+    ):
+        """Responses carry DB time, statement count and serialisation time."""
+        response = timed_client.get("/api/v1/tasks/")
+
+        timing = _timing(response)
+        assert timing["db-count"] >= 1
+        assert timing["db"] >= 0
+        assert timing["serialize"] >= 0
+
+    def test_serialize_includes_encoding_inside_the_endpoint(self):
+        """Bodies encoded by the handler itself are counted as serialisation."""
+
+        class Slow(BaseModel):
+            value: int
+
+            @field_serializer("value")
+            def slowly(self, value: int) -> int:
+                time.sleep(0.02)
+                return value
+
+        adapter = TypeAdapter(Slow)
+        router = APIRouter(route_class=InstrumentedRoute)
+        router.add_api_route("/slow", lambda: respond(adapter, Slow(value=1)))
+        encoded_app = FastAPI()
+        encoded_app.include_router(router)
+        encoded_app.add_middleware(sql_timing.ServerTimingMiddleware)
+
+        with TestClient(encoded_app) as test_client:
+            response = test_client.get("/slow")
+
+        assert response.json() == {"value": 1}
+        assert _timing(response)["serialize"] >= 20
+
+    def test_statements_outside_requests_not_counted(
+        self, timed_client: TestClient, db_session: Session
+    ):
+        """Only statements run while serving the request are counted."""
+        for _ in range(5):
+            db_session.query(Task).count()
+
+        response = timed_client.get("/api/v1/tasks/missing")
+
+        assert _timing(response)["db-count"] <= 2
+
+    def test_reorder_does_not_query_per_task(
+        self, timed_client: TestClient, db_session: Session
+    ):
+        """Reordering many tasks uses a constant number of statements."""
+        for position in range(1, 21):
+            db_session.add(Task(title=f"Task {position}", position=position))
+        db_session.commit()
+        ids = [t.id for t in db_session.query(Task).order_by(Task.position.desc())]
+
+        response = timed_client.put("/api/v1/tasks/reorder", json={"task_ids": ids})
+
+        assert response.status_code == 200
+        assert [t["id"] for t in response.json()] == ids
+        assert _timing(response)["db-count"] < 10
+
+
+class TestBudgetWarnings:
+    """Tests for statement budget and N+1 warnings."""
+
+    def test_over_budget_logs_warning(
+        self,
+        timed_client: TestClient,
+        monkeypatch: pytest.MonkeyPatch,
+        caplog: pytest.LogCaptureFixture,
+    ):
+        """Requests above the statement budget are logged with their route."""
+        monkeypatch.setattr(sql_timing, "SQL_STATEMENT_BUDGET", 0)
+
+        with caplog.at_level(logging.WARNING, logger="app.sql_timing"):
+            timed_client.get("/api/v1/tasks/some-id")
+
+        assert "GET /api/v1/tasks/{task_id} executed" in caplog.text
+        assert "(budget 0)" in caplog.text
+
+    def test_repeated_statement_logs_n_plus_one(
+        self, monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+    ):
+        """A statement repeated past the threshold is reported."""
+        monkeypatch.setattr(sql_timing, "SQL_REPEAT_THRESHOLD", 3)
+        stats = sql_timing.RequestStats()
+        stats.statements["SELECT * FROM tasks WHERE id = ?"] = 3
+        stats.count = 3
+
+        with caplog.at_level(logging.WARNING, logger="app.sql_timing"):
+            sql_timing._check_budget({"method": "PUT", "path": "/x"}, stats)
+
+        assert "Possible N+1 query in PUT /x: statement executed 3 times" in caplog.text
+
+    def test_within_budget_is_quiet(
+        self, timed_client: TestClient, caplog: pytest.LogCaptureFixture
+    ):
+        """Cheap requests log nothing."""
+        with caplog.at_level(logging.WARNING, logger="app.sql_timing"):
+            timed_client.get("/api/v1/tasks/")
+
+        assert caplog.text == ""
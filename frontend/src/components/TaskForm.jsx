@@ -11,6 +11,10 @@ function TaskForm({ onTaskCreated }) {
   const [error, setError] = useState("");
   const [isSubmitting, setIsSubmitting] = useState(false);
   const titleInputRef = useRef(null);
+  // Idempotency key reused while the same task is resubmitted after a
+  // failure, so retrying a request that did reach the server cannot create
+  // a duplicate task
+  const pendingRef = useRef({ body: null, key: null });
 
   // Auto-focus title input on mount
   useEffect(() => {
@@ -42,15 +46,24 @@ function TaskForm({ onTaskCreated }) {
 
     setIsSubmitting(true);
 
+    const body = JSON.stringify({
+      title: trimmedTitle,
+      description: description.trim() || null,
+      deadline: deadline || null,
+    });
+    if (pendingRef.current.body !== body) {
+      pendingRef.current = { body, key: globalThis.crypto?.randomUUID?.() ?? null };
+    }
+    const headers = { "Content-Type": "application/json" };
+    if (pendingRef.current.key) {
+      headers["Idempotency-Key"] = pendingRef.current.key;
+    }
+
     try {
       const response = await fetch("/api/v1/tasks/", {
         method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({
-          title: trimmedTitle,
-          description: description.trim() || null,
-          deadline: deadline || null,
-        }),
+        headers,
+        body,
       });
 
       if (!response.ok) {
@@ -65,6 +78,7 @@ function TaskForm({ onTaskCreated }) {
       }
 
       const task = await response.json();
+      pendingRef.current = { body: null, key: null };
 
       // Clear form
       setTitle("");